@@ -0,0 +1,44 @@
+from functools import wraps
+from quart import g, request
+from jwt.exceptions import ExpiredSignatureError
+
+from app.aio.responses import json_response
+from app.utils.principal import Principal
+from app.utils.token_verifier import token_verifier, read_token
+
+
+def async_token_req(role):
+    """
+    The asyncio counterpart of tokenReq, with the same status codes and messages.
+    Args:
+        role (str): Role required to call the endpoint, empty for any authenticated user.
+    Returns:
+        The decorator.
+    """
+    def decorator(f):
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            try:
+                token = read_token(request.headers, request.cookies)
+                payload = token_verifier.verify(token) if token else None
+            except ExpiredSignatureError:
+                return json_response({"status": "fail", "message": "Expired token"}, 403)
+            except Exception:
+                return json_response({"status": "fail", "message": "Invalid token"}, 401)
+            if payload is None:
+                return json_response({"status": "fail", "message": "Unauthorized"}, 403)
+
+            principal = Principal.from_claims(payload.get("user"))
+            if principal:
+                if role and principal.role != role:
+                    return json_response({"status": 'fail', "message": "Unauthorized user"}, 401)
+            else:
+                return json_response({"status": 'fail', "message": "Invalid token"}, 401)
+            g.principal = principal
+            return await f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def get_async_principal():
+    return g.get("principal")
@@ -0,0 +1,57 @@
+from flask_pymongo import ObjectId
+
+from app.aio.db import collection_versions, record_counts, user_collection
+from app.db.counts import sum_counters, COUNTS_REBUILT
+from app.utils.user_cache import user_profile_cache, USER_PROFILE_PROJECTION
+
+
+async def get_versions(collection_names):
+    """
+    Reads the version counters of collections in one query, as app.db.versions.get_versions.
+    Args:
+        collection_names (list): Names of the collections.
+    Returns:
+        A dict mapping every collection name to its version, 0 for collections never written to.
+    """
+    versions = {name: 0 for name in collection_names}
+    async for counter in collection_versions.find({"_id": {"$in": list(collection_names)}}):
+        versions[counter["_id"]] = counter["version"]
+    return versions
+
+
+async def get_total(collection, query, counters, exact=False):
+    """
+    Returns the total number of records matching a list filter, as app.db.counts.get_total.
+    Args:
+        collection: The listed motor collection.
+        query (dict): The list filter.
+        counters (dict): Counter keys, mapped to the filter each counts, whose sum equals the number of records
+            matching the query. None when the filter has no counters.
+        exact (bool): Whether to count the matching records instead of reading the counters.
+    Returns:
+        The total number of matching records.
+    """
+    if exact or counters is None:
+        return await collection.count_documents(query)
+    stored = {counter["_id"]: counter["count"]
+              async for counter in record_counts.find({"_id": {"$in": [COUNTS_REBUILT, *counters]}})}
+    total = sum_counters(stored, counters)
+    if total is None:
+        return await collection.count_documents(query) if query else await collection.estimated_document_count()
+    return total
+
+
+async def get_user_profile(user_id):
+    """
+    Returns the user document through the process-wide profile cache shared with the synchronous endpoints.
+    Args:
+        user_id (str): Id of the user.
+    Returns:
+        The user document, or None when the user does not exist.
+    """
+    user = user_profile_cache.cached(user_id)
+    if user is None:
+        user = await user_collection.find_one({"_id": ObjectId(user_id)}, USER_PROFILE_PROJECTION)
+        if user:
+            user_profile_cache.store(user_id, user)
+    return user
@@ -0,0 +1,60 @@
+import os
+import threading
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import MONGO_URI, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_CONNECT_TIMEOUT_MS, \
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS, MONGO_COMPRESSORS
+from app.db import DB_NAME
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_async_client():
+    """
+    Returns the motor client of the current process, creating it on first use. Like the pymongo client, a client
+    inherited through fork() is never reused.
+    Returns:
+        The AsyncIOMotorClient of the current process.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                options = {
+                    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+                    "minPoolSize": MONGO_MIN_POOL_SIZE,
+                    "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+                    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+                }
+                if MONGO_COMPRESSORS:
+                    options["compressors"] = MONGO_COMPRESSORS
+                _client = AsyncIOMotorClient(MONGO_URI, **options)
+                _client_pid = pid
+    return _client
+
+
+def get_async_db():
+    return get_async_client()[DB_NAME]
+
+
+class AsyncLazyCollection:
+    """
+    The motor counterpart of LazyCollection: resolves the collection of the current process on every access.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attribute):
+        return getattr(get_async_db()[self.name], attribute)
+
+
+user_collection = AsyncLazyCollection("users")
+route_collection = AsyncLazyCollection("routes")
+vehicle_collection = AsyncLazyCollection("vehicles")
+collection_versions = AsyncLazyCollection("collection_versions")
+record_counts = AsyncLazyCollection("record_counts")
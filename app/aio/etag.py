@@ -0,0 +1,36 @@
+from functools import wraps
+from quart import request, Response
+
+from app.aio.auth import get_async_principal
+from app.aio.data import get_versions
+from app.utils.etag import build_etag, set_cache_headers
+
+
+def async_conditional_get(*collection_names, per_user=False):
+    """
+    The asyncio counterpart of conditional_get, producing the same ETags. Must be applied below async_token_req.
+    Args:
+        *collection_names (str): Collections the response is built from.
+        per_user (bool): Whether the response depends on the caller.
+    Returns:
+        The decorator.
+    """
+    def decorator(f):
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            versions = await get_versions(collection_names)
+            scope = ""
+            if per_user:
+                principal = get_async_principal()
+                scope = f"{principal.id}:{principal.role}" if principal else ""
+            etag = build_etag(request.full_path, request.headers.get('Accept', ''), scope, versions, collection_names)
+
+            if request.if_none_match.contains(etag):
+                return set_cache_headers(Response("", status=304), etag)
+
+            response = await f(*args, **kwargs)
+            if response.status_code == 200:
+                set_cache_headers(response, etag)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,286 @@
+from quart import request
+from flask_pymongo import ObjectId
+from pymongo import ASCENDING
+import logging
+
+from app.aio.auth import async_token_req, get_async_principal
+from app.aio.data import get_total, get_user_profile
+from app.aio.db import vehicle_collection, route_collection, user_collection
+from app.aio.etag import async_conditional_get
+from app.aio.responses import json_response, ndjson_response
+from app.api.vehicle import build_vehicle_filters
+from app.db.counts import ROUTES_COUNTER
+from app.db.versions import VEHICLES, ROUTES, USERS
+from app.enums.record_count import RecordCount
+from app.enums.roles import Roles
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from app.schemas.managers import manager_roster_pipeline, route_status_query, team_route_status_pipeline, \
+    MANAGER_FIELDS
+from app.schemas.routes import route_entity, route_list_entity, ROUTE_SORT_KEY, ROUTE_FIELDS
+from app.schemas.users import user_entity, USER_FIELDS
+from app.schemas.vehicles import vehicle_entity, vehicle_list_pipeline, VEHICLE_SORT_KEY, VEHICLE_FIELDS, \
+    VEHICLE_JOINED_FIELDS
+from app.utils.fields import parse_requested_fields, find_projection, select_fields, with_cursor_fields
+from app.utils.pagination import keyset_query, next_page_cursor
+from app.utils.search import normalize_name, prefix_query
+from app.utils.streaming import prefers_ndjson, STREAM_BATCH_SIZE
+from app.utils.validity_checks import is_valid_object_id
+
+ROUTE_SORT = [(ROUTE_SORT_KEY, ASCENDING), ("_id", ASCENDING)]
+
+
+def get_async_userid():
+    principal = get_async_principal()
+    return principal.id if principal else None
+
+
+@async_token_req('')
+@async_conditional_get(VEHICLES, ROUTES, USERS, per_user=True)
+async def get_vehicles():
+    """
+    The asyncio counterpart of VehicleResource.get.
+    Returns:
+        A JSON response containing information about the retrieved vehicle(s).
+    """
+    status = 'fail'
+    code = 500
+    data = {}
+    user_id = get_async_userid()
+    try:
+        vehicle_id = request.args.get("vehicle")
+        fields = parse_requested_fields(request.args.get("fields"), VEHICLE_FIELDS)
+        if vehicle_id:
+            if is_valid_object_id(vehicle_id):
+                if fields and any(field in VEHICLE_JOINED_FIELDS for field in fields):
+                    found_vehicles = await vehicle_collection.aggregate(
+                        vehicle_list_pipeline({"_id": ObjectId(vehicle_id)}, 0, 1, fields)).to_list(length=1)
+                    found_vehicle = found_vehicles[0] if found_vehicles else None
+                else:
+                    found_vehicle = await vehicle_collection.find_one({"_id": ObjectId(vehicle_id)},
+                                                                      find_projection(fields))
+                    found_vehicle = found_vehicle and vehicle_entity(found_vehicle, fields)
+                if found_vehicle:
+                    data = found_vehicle
+                    message = 'Successfully fetched vehicle.'
+                    status = 'success'
+                    code = 200
+                    logging.info("User %s successfully fetched the vehicle %s", user_id, vehicle_id)
+                else:
+                    code = 404
+                    message = 'Vehicle not found'
+                    logging.warning("User %s requested vehicle that does not exist", user_id)
+            else:
+                message = 'Invalid vehicle id'
+                code = 400
+                logging.warning("User %s provided invalid vehicle id", user_id)
+        else:
+            page_number = request.args.get("page")
+            cursor = request.args.get("cursor")
+            exact = request.args.get("exact") == "true"
+            if not page_number:
+                page_number = 1
+            else:
+                page_number = int(page_number)
+            record_count = RecordCount.VEHICLE.value
+            vehicle_query, counters = build_vehicle_filters(request.args, get_async_principal())
+            if prefers_ndjson(request.args, request.accept_mimetypes):
+                logging.info("User %s streamed the vehicles list", user_id)
+                return ndjson_response(vehicle_collection.aggregate(
+                    vehicle_list_pipeline(vehicle_query, 0, None, fields), batchSize=STREAM_BATCH_SIZE))
+            total_vehicle_records = await get_total(vehicle_collection, vehicle_query, counters, exact)
+            if cursor is not None:
+                vehicle_list = await vehicle_collection.aggregate(vehicle_list_pipeline(
+                    keyset_query(vehicle_query, VEHICLE_SORT_KEY, cursor), 0, record_count + 1,
+                    with_cursor_fields(fields, VEHICLE_SORT_KEY))).to_list(length=None)
+                data = {"vehicles": [select_fields(vehicle, fields) for vehicle in vehicle_list[:record_count]],
+                        'total_records': total_vehicle_records,
+                        "next_cursor": next_page_cursor(vehicle_list, VEHICLE_SORT_KEY, record_count)}
+            else:
+                vehicle_list = await vehicle_collection.aggregate(vehicle_list_pipeline(
+                    vehicle_query, record_count * (page_number - 1), record_count, fields)).to_list(length=None)
+                data = {"vehicles": vehicle_list, 'total_records': total_vehicle_records}
+            message = 'Successfully fetched all vehicles.'
+            status = 'success'
+            code = 200
+            logging.info("User %s successfully fetched the vehicles list", user_id)
+    except ValueError as ex:
+        message = f"{ex}"
+        code = 400
+        logging.warning("User %s provided invalid page, cursor, fields or filters", user_id)
+    except Exception as ex:
+        message = f"{ex}"
+        logging.warning("User failed to fetch vehicles due to %s", ex)
+    return json_response({"message": message, 'data': data, "status": status}, code)
+
+
+@async_token_req('')
+@async_conditional_get(ROUTES)
+async def get_routes():
+    """
+    The asyncio counterpart of RouteResource.get.
+    Returns:
+        A JSON response containing the retrieved route or a list of routes.
+    """
+    status = 'fail'
+    data = None
+    code = 500
+    user_id = get_async_userid()
+    try:
+        route_id = request.args.get("route")
+        fields = parse_requested_fields(request.args.get("fields"), ROUTE_FIELDS)
+        projection = find_projection(fields)
+        if route_id and is_valid_object_id(route_id):
+            found_route = await route_collection.find_one({"_id": ObjectId(route_id)}, projection)
+            if found_route:
+                message = 'Successfully fetched the route.'
+                code = 200
+                data = route_entity(found_route, fields)
+                status = 'success'
+                logging.info("User %s fetched the route %s", user_id, route_id)
+            else:
+                message = 'Route not found'
+                code = 404
+                logging.warning("USER %s provided route id that does not exist", user_id)
+        else:
+            page_number = request.args.get("page")
+            cursor = request.args.get("cursor")
+            exact = request.args.get("exact") == "true"
+            is_fetch_all = request.args.get("all")
+            if not page_number:
+                page_number = 1
+            else:
+                page_number = int(page_number)
+            record_count = RecordCount.ROUTE.value
+            route_query = {}
+            counters = {ROUTES_COUNTER: {}}
+            name_prefix = request.args.get("name")
+            if name_prefix is not None:
+                if not normalize_name(name_prefix):
+                    raise ValueError("Invalid name")
+                route_query = {"name_key": prefix_query(normalize_name(name_prefix))}
+                counters = None
+            if prefers_ndjson(request.args, request.accept_mimetypes):
+                logging.info("User %s streamed the routes", user_id)
+                return ndjson_response(route_collection.find(route_query, projection).sort(ROUTE_SORT).
+                                       batch_size(STREAM_BATCH_SIZE), lambda route: route_entity(route, fields))
+            count_routes = await get_total(route_collection, route_query, counters, exact)
+            if is_fetch_all:
+                found_routes = await route_collection.find(route_query, projection).to_list(length=None)
+                data = {"routes": route_list_entity(found_routes, fields), "total_records": count_routes}
+            elif cursor is not None:
+                cursor_fields = with_cursor_fields(fields, ROUTE_SORT_KEY)
+                found_routes = route_list_entity(await route_collection.find(
+                    keyset_query(route_query, ROUTE_SORT_KEY, cursor), find_projection(cursor_fields)).
+                    sort(ROUTE_SORT).limit(record_count + 1).to_list(length=None), cursor_fields)
+                data = {"routes": [select_fields(route, fields) for route in found_routes[:record_count]],
+                        "total_records": count_routes,
+                        "next_cursor": next_page_cursor(found_routes, ROUTE_SORT_KEY, record_count)}
+            else:
+                found_routes = await route_collection.find(route_query, projection).sort(ROUTE_SORT).\
+                    skip(record_count * (page_number - 1)).limit(record_count).to_list(length=None)
+                data = {"routes": route_list_entity(found_routes, fields), "total_records": count_routes}
+            message = 'Successfully fetched all routes.'
+            code = 200
+            status = 'success'
+            logging.info("User %s fetched the routes", user_id)
+    except ValueError as ex:
+        message = f"{ex}"
+        code = 400
+        logging.warning("User %s provided invalid page, cursor, fields or name", user_id)
+    except Exception as ex:
+        message = f"{ex}"
+        logging.info("User %s tried to fetch the routes and failed due to %s", user_id, ex)
+    return json_response({'status': status, "data": data, "message": message}, code)
+
+
+@async_token_req(Roles.ADMIN.value)
+@async_conditional_get(USERS, VEHICLES)
+async def get_managers():
+    """
+    The asyncio counterpart of ManagerResource.get.
+    Returns:
+        A JSON response containing the managers of the page and the total number of matching managers.
+    """
+    status = 'fail'
+    code = 500
+    data = {}
+    user_id = get_async_userid()
+    try:
+        page_number = request.args.get("page")
+        route_status = request.args.get("route_status")
+        fields = parse_requested_fields(request.args.get("fields"), MANAGER_FIELDS)
+        if not page_number:
+            page_number = 1
+        else:
+            page_number = int(page_number)
+        if route_status and route_status not in VehicleRouteStatus.__members__:
+            message = 'Invalid route status'
+            code = 400
+            logging.warning("ADMIN %s tried to filter managers by invalid route status", user_id)
+        else:
+            record_count = RecordCount.MANAGERS.value
+            manager_query = {"role": Roles.MANAGER.value}
+            if route_status:
+                team_statuses = await vehicle_collection.aggregate(team_route_status_pipeline()).to_list(length=None)
+                manager_query = route_status_query(manager_query, route_status, team_statuses)
+            if prefers_ndjson(request.args, request.accept_mimetypes):
+                logging.info("ADMIN %s streamed all managers in system", user_id)
+                return ndjson_response(user_collection.aggregate(
+                    manager_roster_pipeline(manager_query, 0, None, fields), batchSize=STREAM_BATCH_SIZE))
+            managers = await user_collection.aggregate(manager_roster_pipeline(
+                manager_query, record_count * (page_number - 1), record_count, fields)).to_list(length=None)
+            total_managers = await user_collection.count_documents(manager_query)
+            data = {"managers": managers, "total_records": total_managers}
+            message = 'Successfully fetched all managers.'
+            code = 200
+            status = 'success'
+            logging.info("ADMIN %s fetched all managers in system", user_id)
+    except ValueError as ex:
+        message = f"{ex}"
+        code = 400
+        logging.warning("ADMIN %s provided invalid page or fields", user_id)
+    except Exception as ex:
+        message = f"{ex}"
+        logging.info("ADMIN %s tried to fetch all managers and failed %s", user_id, ex)
+    return json_response({"message": message, "status": status, "data": data}, code)
+
+
+@async_token_req("")
+@async_conditional_get(USERS, per_user=True)
+async def get_user():
+    """
+    The asyncio counterpart of UserResource.get.
+    Returns:
+        A JSON response containing the details of the caller.
+    """
+    data = {}
+    status = 'fail'
+    try:
+        user_id = get_async_userid()
+        if user_id:
+            fields = parse_requested_fields(request.args.get("fields"), USER_FIELDS)
+            user = await get_user_profile(user_id)
+            if user:
+                data = user_entity(user, fields)
+                message = 'Successfully fetch user details'
+                status = 'success'
+                code = 200
+                logging.info("User %s fetched details successfully", user_id)
+            else:
+                message = 'User not found'
+                code = 404
+                logging.warning("User %s does not exist", user_id)
+        else:
+            message = 'Invalid user id'
+            code = 400
+            logging.warning("User %s provided invalid id", user_id)
+    except ValueError as ex:
+        message = f"{ex}"
+        code = 400
+        logging.warning("User provided invalid fields")
+    except Exception as ex:
+        message = f"{ex}"
+        status = 'fail'
+        code = 500
+        logging.debug("User failed to fetch their details %s", ex)
+    return json_response({"message": message, "status": status, "data": data}, code)
@@ -0,0 +1,32 @@
+from quart import Response
+
+from app.utils.json_provider import dumps_json
+from app.utils.streaming import NDJSON_MIMETYPE
+
+
+def json_response(body, code):
+    """
+    Builds a JSON response encoded like the responses of the Flask app.
+    Args:
+        body: The response body.
+        code (int): The HTTP status code.
+    Returns:
+        A Quart response.
+    """
+    return Response(dumps_json(body) + b"\n", status=code, mimetype="application/json")
+
+
+def ndjson_response(records, serializer=None):
+    """
+    Streams records from an async cursor as newline delimited JSON.
+    Args:
+        records: An async iterable of records, usually a motor cursor.
+        serializer: Optional function formatting each record before it is encoded.
+    Returns:
+        A streamed Quart response.
+    """
+    async def generate():
+        async for record in records:
+            yield dumps_json(serializer(record) if serializer else record) + b"\n"
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
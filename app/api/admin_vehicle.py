@@ -2,12 +2,117 @@ from flask_restful import Resource
 import logging
 from flask import request, jsonify, make_response
 from flask_pymongo import ObjectId
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
 
 from app.enums.roles import Roles
-from app.schemas.vehicles import vehicle_entity
+from app.schemas.vehicles import vehicle_entity, vehicle_version_query, BULK_WRITES_FIELD
 from app.utils.validity_checks import is_valid_object_id
 from app.utils.token_req import tokenReq
 from app.utils.get_userid_token import get_userid_token
+from app.db.versions import bump_versions, VEHICLES
+from app.db.counts import increment_counts, team_vehicles_counter
+from app.db.summary import summary_changes, update_fleet_summary
+
+BULK_ASSIGNMENT_MAX_ITEMS = 1000
+BULK_WRITE_MARKERS = 10
+
+
+def remove_bulk_write_marker(vehicle_collection, vehicle_ids, write_marker):
+    """
+    Removes the marker of a bulk assignment from the vehicles it was applied to. The field is dropped from the
+    vehicles where it was the only marker, and the marker is pulled where other bulk assignments are pending.
+    Args:
+        vehicle_collection: The vehicles collection.
+        vehicle_ids (set): Ids of the vehicles the assignment was applied to.
+        write_marker (ObjectId): Marker of the assignment.
+    Returns:
+        None
+    """
+    vehicle_ids = list(vehicle_ids)
+    vehicle_collection.bulk_write([
+        UpdateMany({"_id": {"$in": vehicle_ids}, BULK_WRITES_FIELD: [write_marker]},
+                   {"$unset": {BULK_WRITES_FIELD: ""}}),
+        UpdateMany({"_id": {"$in": vehicle_ids}, BULK_WRITES_FIELD: write_marker},
+                   {"$pull": {BULK_WRITES_FIELD: write_marker}}),
+    ])
+
+
+def assignment_reference_ids(assignments):
+    """
+    Collects the route and manager ids referenced by vehicle assignments.
+    Args:
+        assignments (list): Assignment payloads with `current_route` and `current_team`.
+    Returns:
+        A tuple of the set of valid route ids and the set of valid manager ids.
+    """
+    route_ids = set()
+    manager_ids = set()
+    for assignment in assignments:
+        if not isinstance(assignment, dict):
+            continue
+        if assignment.get("current_route") and is_valid_object_id(assignment["current_route"]):
+            route_ids.add(assignment["current_route"])
+        if assignment.get("current_team") and is_valid_object_id(assignment["current_team"]):
+            manager_ids.add(assignment["current_team"])
+    return route_ids, manager_ids
+
+
+def find_existing_ids(collection, ids):
+    """
+    Looks up which of the given ids exist in a collection with a single query.
+    Args:
+        collection: The collection to search.
+        ids (set): String ids to look up.
+    Returns:
+        The set of ids that exist.
+    """
+    if not ids:
+        return set()
+    return {str(document["_id"]) for document in
+            collection.find({"_id": {"$in": [ObjectId(object_id) for object_id in ids]}}, {"_id": 1})}
+
+
+def validate_assignment(payload, existing_routes, existing_managers):
+    """
+    Validates the route and team of a vehicle assignment.
+    The route and the team are checked independently: a valid one is applied even when the other one is rejected.
+    An empty `current_team` unassigns the vehicle.
+    Args:
+        payload (dict): The assignment with `current_route` and `current_team`.
+        existing_routes (set): Ids of the referenced routes that exist.
+        existing_managers (set): Ids of the referenced users that exist.
+    Returns:
+        A tuple of the fields to set, and the message and status code of the last rejected field.
+    """
+    update_payload = {}
+    message = ''
+    code = 500
+    if payload.get("current_route") and is_valid_object_id(payload["current_route"]):
+        if payload["current_route"] in existing_routes:
+            update_payload.update({"current_route": payload["current_route"]})
+        else:
+            message = 'Route not found'
+            code = 404
+    else:
+        message = 'Invalid route id.'
+        code = 400
+
+    if "current_team" in payload:
+        if payload["current_team"] and is_valid_object_id(payload["current_team"]):
+            if payload["current_team"] in existing_managers:
+                update_payload.update({"current_team": payload["current_team"]})
+            else:
+                message = 'Manager not found'
+                code = 404
+        elif payload["current_team"] == '':
+            update_payload.update({"current_team": payload["current_team"]})
+        else:
+            message = "Invalid current team"
+            code = 400
+    else:
+        message = 'Current team not provided'
+        code = 400
+    return update_payload, message, code
 
 
 class AdminVehicleResource(Resource):
@@ -39,73 +144,188 @@ class AdminVehicleResource(Resource):
             vehicle_id = request.args.get("vehicle")
 
             if vehicle_id and is_valid_object_id(vehicle_id):
-                existing_vehicle = self.vehicle_collection.find_one({'_id': ObjectId(vehicle_id)})
-                if existing_vehicle:
-                    update_payload = {}
-                    if "current_route" in payload and payload["current_route"]\
-                            and is_valid_object_id(payload["current_route"]):
-                        existing_route = self.route_collection.find_one({"_id": ObjectId(payload["current_route"])})
-                        if existing_route:
-                            update_payload.update({"current_route": payload["current_route"]})
-                            logging.info(f"ADMIN {user_id} send request with route id that to update {vehicle_id}")
-                        else:
-                            message = 'Route not found'
-                            code = 404
-                            logging.warning(f"ADMIN {user_id} send request with route id that does not exist")
-                    else:
-                        message = 'Invalid route id.'
-                        code = 400
-                        logging.warning(f"ADMIN {user_id} send request without route id")
-
-                    if "current_team" in payload:
-                        if payload["current_team"] and is_valid_object_id(payload["current_team"]):
-                            existing_manager = self.user_collection.find_one({"_id": ObjectId(payload["current_team"])})
-                            if existing_manager:
-                                update_payload.update({"current_team": payload["current_team"]})
-                                logging.info(f"ADMIN {user_id} send request to assign different user from vehicle")
-                            else:
-                                message = 'Manager not found'
-                                code = 404
-                                logging.warning(f"ADMIN {user_id} send request with user that does not exist")
-                        elif payload["current_team"] == '':
-                            update_payload.update({"current_team": payload["current_team"]})
-                            logging.warning(f"ADMIN {user_id} send request to unassign user from vehicle")
-                        else:
-                            message = "Invalid current team"
-                            code = 400
-                            logging.warning(f"ADMIN {user_id} send request with invalid team user id")
+                route_ids, manager_ids = assignment_reference_ids([payload])
+                update_payload, message, code = validate_assignment(
+                    payload, find_existing_ids(self.route_collection, route_ids),
+                    find_existing_ids(self.user_collection, manager_ids))
+
+                if len(update_payload) > 0:
+                    vehicle_query = {"_id": ObjectId(vehicle_id)}
+                    if "version" in payload:
+                        vehicle_query.update(vehicle_version_query(payload["version"]))
+                    previous_vehicle = self.vehicle_collection.find_one_and_update(
+                        vehicle_query, {"$set": update_payload, "$inc": {"version": 1}},
+                        return_document=ReturnDocument.BEFORE)
+
+                    if previous_vehicle:
+                        updated_vehicle = dict(previous_vehicle, version=previous_vehicle.get("version", 0) + 1,
+                                               **update_payload)
+                        bump_versions(VEHICLES)
+                        update_fleet_summary(summary_changes(previous_vehicle, updated_vehicle))
+                        if updated_vehicle["current_team"] != previous_vehicle["current_team"]:
+                            increment_counts({team_vehicles_counter(previous_vehicle["current_team"]): -1,
+                                              team_vehicles_counter(updated_vehicle["current_team"]): 1})
+                        message = 'Successfully updated the vehicle'
+                        code = 200
+                        status = 'success'
+                        data = vehicle_entity(updated_vehicle)
+                        logging.info("ADMIN %s updated vehicle %s successfully", user_id, vehicle_id)
+                    elif "version" in payload and \
+                            self.vehicle_collection.count_documents({"_id": ObjectId(vehicle_id)}):
+                        message = 'Vehicle was modified by another request.'
+                        code = 409
+                        logging.warning("ADMIN %s send request for outdated version of vehicle %s", user_id, vehicle_id)
                     else:
-                        message = 'Current team not provided'
-                        code = 400
-                        logging.warning(f"ADMIN {user_id} send request without team user id")
-
-                    if len(update_payload) > 0:
-                        req_payload = vehicle_entity(update_payload)
-                        result_doc = self.vehicle_collection.update_one({"_id": ObjectId(vehicle_id)},
-                                                                        {"$set": req_payload})
-
-                        if result_doc.matched_count == result_doc.modified_count:
-                            message = 'Successfully updated the vehicle'
-                            code = 200
-                            status = 'success'
-                            data = vehicle_entity(self.vehicle_collection.find_one({'_id': vehicle_id}))
-                            logging.info(f"ADMIN {user_id} updated vehicle {vehicle_id} successfully")
-                        else:
-                            message = 'Vehicle details were not updated.'
-                            code = 200
-                            status = 'success'
-                            data = vehicle_entity(existing_vehicle)
-                            logging.info(f"ADMIN {user_id} updated vehicle {vehicle_id} with existing details")
+                        message = 'Vehicle not found'
+                        code = 404
+                        logging.warning("ADMIN %s send request for vehicle that does not exist", user_id)
                 else:
-                    message = 'Vehicle not found'
-                    code = 404
-                    logging.warning(f"ADMIN {user_id} send request for vehicle that does not exist")
+                    logging.warning("ADMIN %s send invalid assignment for vehicle %s: %s", user_id, vehicle_id, message)
             else:
                 message = 'Bad request'
                 code = 400
-                logging.warning(f"ADMIN {user_id} send request for vehicle with invalid id")
+                logging.warning("ADMIN %s send request for vehicle with invalid id", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.debug("ADMIN %s send request to unassign user from vehicle", user_id)
+
+        return make_response(jsonify({'message': message, "status": status, "data": data}), code)
+
+
+class AdminVehicleBulkResource(Resource):
+    """
+    A class representing a RESTful API resource for assigning routes and teams to many vehicles at once.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the AdminVehicleBulkResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle, route and user collections.
+        Returns:
+            None
+        """
+        self.vehicle_collection = kwargs["vehicle"]
+        self.route_collection = kwargs['route']
+        self.user_collection = kwargs["user"]
+
+    def check_assignments(self, assignments):
+        """
+        Validates a list of assignments with one query per referenced collection.
+        Args:
+            assignments (list): Assignment payloads with `vehicle`, `current_route`, `current_team` and
+                optionally `version`.
+        Returns:
+            A list with the result of each assignment, and a list of (index, vehicle before the update, fields
+            to set) tuples for the assignments to apply.
+        """
+        vehicle_ids = {assignment["vehicle"] for assignment in assignments if isinstance(assignment, dict)
+                       and isinstance(assignment.get("vehicle"), str) and is_valid_object_id(assignment["vehicle"])}
+        vehicles = {str(vehicle["_id"]): vehicle for vehicle in self.vehicle_collection.find(
+            {"_id": {"$in": [ObjectId(vehicle_id) for vehicle_id in vehicle_ids]}},
+            {"current_team": 1, "current_route": 1, "status": 1, "version": 1})} if vehicle_ids else {}
+        route_ids, manager_ids = assignment_reference_ids(assignments)
+        existing_routes = find_existing_ids(self.route_collection, route_ids)
+        existing_managers = find_existing_ids(self.user_collection, manager_ids)
+
+        results = []
+        updates = []
+        seen = set()
+        for index, assignment in enumerate(assignments):
+            vehicle_id = assignment.get("vehicle") if isinstance(assignment, dict) else None
+            if not isinstance(vehicle_id, str):
+                vehicle_id = None
+            result = {"index": index, "vehicle": vehicle_id, "status": 'fail'}
+            results.append(result)
+            if vehicle_id not in vehicle_ids:
+                result.update({"code": 400, "message": 'Bad request'})
+            elif vehicle_id in seen:
+                result.update({"code": 400, "message": 'Vehicle is assigned more than once'})
+            elif vehicle_id not in vehicles:
+                result.update({"code": 404, "message": 'Vehicle not found'})
+            elif "version" in assignment and assignment["version"] != vehicles[vehicle_id].get("version", 0):
+                result.update({"code": 409, "message": 'Vehicle was modified by another request.'})
+            else:
+                update_payload, message, code = validate_assignment(assignment, existing_routes, existing_managers)
+                if update_payload:
+                    updates.append((index, vehicles[vehicle_id], update_payload))
+                else:
+                    result.update({"code": code, "message": message})
+            seen.add(vehicle_id)
+        return results, updates
+
+    @tokenReq(Roles.ADMIN.value)
+    def put(self):
+        """
+        Assigns routes and teams to a list of vehicles, applying the same rules as a single assignment.
+        Every valid assignment is written in one unordered bulk write, guarded by the version of the vehicle
+        that was validated and tagged with a marker of the request, removed again once the assignments that were
+        applied have been read back.
+        Returns:
+            A JSON response with the result of each assignment and the number of vehicles updated.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            assignments = request.get_json()
+            if not isinstance(assignments, list) or not assignments:
+                message = 'Bad request'
+                code = 400
+                logging.warning("ADMIN %s send bulk assignment without a list of assignments", user_id)
+            elif len(assignments) > BULK_ASSIGNMENT_MAX_ITEMS:
+                message = f'Cannot assign more than {BULK_ASSIGNMENT_MAX_ITEMS} vehicles at once'
+                code = 413
+                logging.warning("ADMIN %s send bulk assignment of %s vehicles", user_id, len(assignments))
+            else:
+                results, updates = self.check_assignments(assignments)
+                updated = 0
+                if updates:
+                    # Every update of this request records the same marker, so the vehicles it was applied to can
+                    # be told apart from the ones another request modified first, even when a later write bumped
+                    # their version again. The markers are removed once the vehicles were read back.
+                    write_marker = ObjectId()
+                    write_result = self.vehicle_collection.bulk_write([
+                        UpdateOne(dict({"_id": vehicle["_id"]}, **vehicle_version_query(vehicle.get("version", 0))),
+                                  {"$set": update_payload, "$inc": {"version": 1},
+                                   "$push": {BULK_WRITES_FIELD: {"$each": [write_marker],
+                                                                 "$slice": -BULK_WRITE_MARKERS}}})
+                        for index, vehicle, update_payload in updates], ordered=False)
+                    applied = {vehicle["_id"] for index, vehicle, update_payload in updates}
+                    if write_result.matched_count < len(updates):
+                        applied = {vehicle["_id"] for vehicle in self.vehicle_collection.find(
+                            {"_id": {"$in": list(applied)}, BULK_WRITES_FIELD: write_marker}, {"_id": 1})}
+                    if applied:
+                        remove_bulk_write_marker(self.vehicle_collection, applied, write_marker)
+                    team_changes = {}
+                    summary_updates = []
+                    for index, vehicle, update_payload in updates:
+                        if vehicle["_id"] not in applied:
+                            results[index].update({"code": 409, "message": 'Vehicle was modified by another request.'})
+                            continue
+                        updated += 1
+                        results[index].update({"status": 'success', "code": 200,
+                                               "message": 'Successfully updated the vehicle'})
+                        summary_updates.append(summary_changes(vehicle, dict(vehicle, **update_payload)))
+                        new_team = update_payload.get("current_team", vehicle.get("current_team"))
+                        if new_team != vehicle.get("current_team"):
+                            previous_counter = team_vehicles_counter(vehicle.get("current_team"))
+                            new_counter = team_vehicles_counter(new_team)
+                            team_changes[previous_counter] = team_changes.get(previous_counter, 0) - 1
+                            team_changes[new_counter] = team_changes.get(new_counter, 0) + 1
+                    if updated:
+                        bump_versions(VEHICLES)
+                        update_fleet_summary(*summary_updates)
+                    if team_changes:
+                        increment_counts(team_changes)
+                data = {"vehicles": results, "updated": updated}
+                message = f'Successfully updated {updated} of {len(assignments)} vehicles'
+                code = 200
+                status = 'success'
+                logging.info("ADMIN %s assigned %s vehicles in bulk", user_id, updated)
         except Exception as ex:
             message = f"{ex}"
-            logging.debug(f"ADMIN {user_id} send request to unassign user from vehicle")
+            logging.warning("ADMIN %s failed to assign vehicles in bulk due to %s", user_id, ex)
 
         return make_response(jsonify({'message': message, "status": status, "data": data}), code)
@@ -0,0 +1,49 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+import logging
+
+from app.enums.roles import Roles
+from app.utils.token_req import tokenReq
+from app.utils.get_userid_token import get_userid_token
+from app.utils.etag import conditional_get
+from app.db.summary import get_fleet_summary
+from app.db.versions import VEHICLES
+
+
+def fleet_summary_entity(summary):
+    return {
+        "total": summary.get("total", 0),
+        "by_status": {status: count for status, count in summary.get("by_status", {}).items() if count},
+        "by_team": {team: count for team, count in summary.get("by_team", {}).items() if count},
+        "by_route": {route: count for route, count in summary.get("by_route", {}).items() if count}
+    }
+
+
+class FleetSummaryResource(Resource):
+    """
+    A class representing a RESTful API resource for the vehicle breakdowns of the ops screen.
+    """
+
+    @tokenReq(Roles.ADMIN.value)
+    @conditional_get(VEHICLES)
+    def get(self):
+        """
+        Retrieves the number of vehicles per route status, per manager and per route, read from the summary
+        snapshot once it was rebuilt. With `exact=true` the summary is recomputed from the vehicles.
+        Returns:
+            A JSON response containing the fleet summary.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            data = fleet_summary_entity(get_fleet_summary(request.args.get("exact") == "true"))
+            message = 'Successfully fetched fleet summary.'
+            status = 'success'
+            code = 200
+            logging.info("ADMIN %s fetched the fleet summary", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("ADMIN %s failed to fetch the fleet summary due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
@@ -1,43 +1,25 @@
 from datetime import timedelta, datetime
 from flask_restful import Resource
 from flask import request, make_response, jsonify
-from flask_bcrypt import Bcrypt
 import logging
 import jwt
 
 from app.utils.validity_checks import is_valid_email
 from app.schemas.users import user_entity
+from app.utils.password_hasher import password_hasher, HasherBusyError
+from app.utils.user_cache import user_profile_cache
 
-bcrypt = Bcrypt()
 
-failed_attempts = {}
-lockout_time = 60 * 30
-
-
-def handle_invalid_login(email):
-    if email in failed_attempts:
-        failed_attempts[email]['count'] += 1
-        failed_attempts[email]['timestamp'] = datetime.now()
-    else:
-        failed_attempts[email] = {'count': 1, 'timestamp': datetime.now()}
-
-
-def check_user_failed_attempt(email):
-    print(email, failed_attempts)
-    if email in failed_attempts and failed_attempts[email]['count'] >= 3:
-        time_elapsed = datetime.now() - failed_attempts[email]['timestamp']
-        time_left = timedelta(seconds=lockout_time) - time_elapsed
-        minutes, seconds = divmod(time_left.seconds, 60)
-        formatted_time_left = f"{minutes:02d}:{seconds:02d}"
-        return True, formatted_time_left
-    else:
-        return False, None
+def format_lockout_time(seconds_left):
+    minutes, seconds = divmod(max(int(seconds_left), 0), 60)
+    return f"{minutes:02d}:{seconds:02d}"
 
 
 class LoginResource(Resource):
     def __init__(self, **kwargs):
         self.user_collection = kwargs["user"]
         self.secret_key = kwargs["secret_key"]
+        self.lockout_store = kwargs["lockout_store"]
 
     def post(self):
         """
@@ -62,19 +44,24 @@ class LoginResource(Resource):
 
             if "email" in request_payload and is_valid_email(request_payload["email"]):
                 email = request_payload['email']
-                user = self.user_collection.find_one({"email": request_payload["email"]})
-                print(user)
-                invalid_attempt, lockout_time_user = check_user_failed_attempt(email)
-                print(invalid_attempt)
-                if invalid_attempt:
+                lockout_time_left = self.lockout_store.get_lockout(email)
+                if lockout_time_left is not None:
+                    lockout_time_user = format_lockout_time(lockout_time_left)
                     message = f'Account locked out. Please try again in {lockout_time_user} seconds.'
                     status = 'fail'
                     code = 401
-                    logging.warning(f"User {email} is locked out from logging in.")
+                    logging.warning("User %s is locked out from logging in.", email)
                 else:
+                    user = self.user_collection.find_one({"email": request_payload["email"]})
                     if user:
                         user["_id"] = str(user["_id"])
-                        if user and bcrypt.check_password_hash(user['password'], request_payload['password']):
+                        if user and password_hasher.check_password_hash(user['password'], request_payload['password']):
+                            if password_hasher.needs_rehash(user['password']):
+                                self.user_collection.update_one(
+                                    {"email": user["email"]},
+                                    {"$set": {"password": password_hasher.generate_password_hash(
+                                        request_payload['password'])}})
+                                user_profile_cache.invalidate(user["_id"])
                             time = datetime.utcnow() + timedelta(hours=5)
                             token = jwt.encode({
                                 "user": {
@@ -89,32 +76,35 @@ class LoginResource(Resource):
                             code = 200
                             status = "successful"
                             res_data['user'] = user_entity(user)
-                            if email in failed_attempts:
-                                del failed_attempts[email]
-                            logging.info(f"User {email} successfully logged in")
+                            self.lockout_store.reset(email)
+                            logging.info("User %s successfully logged in", email)
                         else:
-                            handle_invalid_login(email)
+                            self.lockout_store.register_failure(email)
                             message = "Invalid credentials."
                             code = 401
                             status = "fail"
-                            logging.warning(f"User {email} send login request with incorrect credentials")
+                            logging.warning("User %s send login request with incorrect credentials", email)
                     else:
-                        handle_invalid_login(email)
+                        self.lockout_store.register_failure(email)
                         message = "Invalid credentials."
                         code = 401
                         status = "fail"
-                        logging.warning(f"User {email} send login request with incorrect credentials")
+                        logging.warning("User %s send login request with incorrect credentials", email)
             else:
                 message = 'Invalid credentials provided.'
                 code = 400
-                logging.warning(f"User send login request with invalid credentials")
+                logging.warning("User send login request with invalid credentials")
 
+        except HasherBusyError:
+            message = 'Server is busy. Please try again.'
+            code = 503
+            status = 'fail'
+            logging.warning("User login rejected as password hashing queue is full")
         except Exception as ex:
-            print(ex)
             message = f"{ex}"
             code = 500
             status = 'fail'
-            logging.debug(f"User login exception {ex}")
+            logging.warning("User login exception %s", ex)
 
         response_entity = make_response(jsonify({"status": status, "data": res_data, "message": message}), code)
         if code == 200:
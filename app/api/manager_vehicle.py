@@ -2,14 +2,19 @@ from flask_restful import Resource
 from app.utils.token_req import tokenReq
 from flask import request, jsonify, make_response
 from flask_pymongo import ObjectId
+from pymongo import ReturnDocument
 import logging
 
 from app.enums.roles import Roles
 from app.enums.vehicle_route_status import VehicleRouteStatus
 from app.enums.vehicle_status_change import VehicleStatusChange
-from app.schemas.vehicles import vehicle_entity
+from app.schemas.vehicles import vehicle_entity, vehicle_version_query
 from app.utils.get_userid_token import get_userid_token
 from app.utils.validity_checks import is_valid_object_id
+from app.db.versions import bump_versions, VEHICLES
+from app.db.counts import increment_counts, team_vehicles_counter
+from app.db.history import record_trip
+from app.db.summary import summary_changes, update_fleet_summary
 
 
 def is_user_valid_to_update(user, req, existing_user):
@@ -26,11 +31,60 @@ def is_vehicle_allowed_to_update_team(vehicle_status):
         return True
 
 
-def is_vehicle_status_allowed_to_update(status, route, req_status):
-    if not route:
-        if status == VehicleRouteStatus.ON_DESTINATION.name and req_status == VehicleRouteStatus.NOT_STARTED.name:
-            return True
-    return False
+def get_statuses_allowed_to_change(req_status):
+    """
+    Returns the statuses a vehicle can move to the requested status from, following VehicleStatusChange.
+    Args:
+        req_status (str): Requested VehicleRouteStatus name.
+    Returns:
+        A list of VehicleRouteStatus names.
+    """
+    return [status for status, next_statuses in VehicleStatusChange.status_flow.items() if req_status in next_statuses]
+
+
+def is_route_required_for_status(status, req_status):
+    # Only a vehicle back from its destination, whose route was released, may move without a route.
+    return not (status == VehicleRouteStatus.ON_DESTINATION.name and req_status == VehicleRouteStatus.NOT_STARTED.name)
+
+
+def build_vehicle_update(user_id, req_current_team, req_status, version):
+    """
+    Builds a conditional update applying a manager's request in a single find_one_and_update.
+    The filter holds every rule the request has to satisfy, so a vehicle modified concurrently no longer matches
+    instead of being overwritten.
+    Args:
+        user_id (str): Id of the manager making the request.
+        req_current_team (str): Requested team, None when the team is not changed.
+        req_status (str): Requested VehicleRouteStatus name, None when the status is not changed.
+        version (int): Version of the vehicle the manager last read, None to skip the version check.
+    Returns:
+        A tuple of the filter conditions and the update.
+    """
+    conditions = []
+    if req_current_team == user_id:
+        conditions.append({"current_team": {"$in": [user_id, ""]}})
+    else:
+        conditions.append({"current_team": user_id})
+    if version is not None:
+        conditions.append(vehicle_version_query(version))
+
+    update_fields = {}
+    if req_current_team is not None:
+        conditions.append({"$or": [{"current_team": req_current_team},
+                                   {"status": VehicleRouteStatus.NOT_STARTED.name}]})
+        update_fields["current_team"] = req_current_team
+    if req_status is not None:
+        conditions.append({"status": {"$in": get_statuses_allowed_to_change(req_status)}})
+        route_assigned = {"current_route": {"$nin": ["", None]}}
+        if req_status == VehicleRouteStatus.NOT_STARTED.name:
+            conditions.append({"$or": [{"status": VehicleRouteStatus.ON_DESTINATION.name}, route_assigned]})
+        else:
+            conditions.append(route_assigned)
+        update_fields["status"] = req_status
+
+    if req_status == VehicleRouteStatus.ON_DESTINATION.name:
+        update_fields["current_route"] = ''
+    return conditions, {"$set": update_fields, "$inc": {"version": 1}}
 
 
 class ManagerVehicleResource(Resource):
@@ -48,6 +102,31 @@ class ManagerVehicleResource(Resource):
         """
         self.vehicle_collection = kwargs["vehicle"]
 
+    def get_rejection(self, vehicle_id, user_id, req_current_team, req_status, version):
+        """
+        Finds out why a conditional update did not match the vehicle. Only runs when the update was rejected.
+        Returns:
+            A tuple of the error message and the status code.
+        """
+        existing_vehicle = self.vehicle_collection.find_one({'_id': ObjectId(vehicle_id)})
+        if not existing_vehicle:
+            return 'Vehicle not found', 404
+        if not is_user_valid_to_update(user=user_id, req=req_current_team,
+                                       existing_user=existing_vehicle["current_team"]):
+            return 'Unauthorised attempt to update vehicle.', 401
+        if version is not None and existing_vehicle.get("version", 0) != version:
+            return 'Vehicle was modified by another request.', 409
+        if req_current_team is not None and req_current_team != existing_vehicle["current_team"] and \
+                not is_vehicle_allowed_to_update_team(existing_vehicle["status"]):
+            return 'Invalid attempt to change team.', 401
+        if req_status is not None:
+            if existing_vehicle["status"] not in get_statuses_allowed_to_change(req_status):
+                return 'Invalid status transition', 400
+            if is_route_required_for_status(existing_vehicle["status"], req_status) and \
+                    not existing_vehicle.get("current_route"):
+                return 'No route is assigned to vehicle', 400
+        return 'Vehicle was modified by another request.', 409
+
     @tokenReq(Roles.MANAGER.value)
     def put(self):
         status = 'fail'
@@ -58,88 +137,56 @@ class ManagerVehicleResource(Resource):
             try:
                 payload = request.get_json()
                 vehicle_id = request.args.get("vehicle")
-                req_current_team = ''
-                req_status = ''
-                if "current_team" in payload and is_valid_object_id(payload["current_team"]):
-                    req_current_team = payload["current_team"]
-                if "status" in payload:
-                    req_status = payload["status"]
-                if vehicle_id and is_valid_object_id(vehicle_id):
-                    existing_vehicle = self.vehicle_collection.find_one({'_id': ObjectId(vehicle_id)})
-                    if existing_vehicle:
-                        update_payload = {}
-                        # Check if current user is allowed to modify the details of vehicle
-                        if is_user_valid_to_update(
-                                user=user_id, req=req_current_team, existing_user=existing_vehicle["current_team"]):
-                            if not is_vehicle_allowed_to_update_team(existing_vehicle["status"]):
-                                message = 'Invalid attempt to change team.'
-                                code = 401
-                                logging.warning(f"MANAGER {user_id} tried to change team for vehicle on route")
-                            else:
-                                update_payload.update({"current_team": req_current_team})
-                                logging.info(f"MANAGER {user_id} updated team for vehicle on route")
-
-                            if req_status not in VehicleStatusChange.status_flow[existing_vehicle["status"]]:
-                                message = 'Invalid status transition'
-                                code = 400
-                                logging.warning(f"MANAGER {user_id} tried to update status incorrectly")
-                            elif not is_vehicle_status_allowed_to_update(
-                                    status=existing_vehicle["status"], route=existing_vehicle["route"],
-                                    req_status=req_status):
-                                message = 'No route is assigned to vehicle'
-                                code = 400
-                                logging.warning(f"MANAGER {user_id} tried to update status of vehicle with no route")
-                            else:
-                                update_payload.update({"status_name": req_status})
-                                if req_status == VehicleRouteStatus.ON_DESTINATION.name:
-                                    existing_routes = existing_vehicle["former_routes"]
-                                    existing_routes.append(existing_vehicle["current_route"])
-                                    update_payload.update({"former_routes": existing_routes})
-                                    update_payload.update({"current_route": ''})
-                                    existing_managers = existing_vehicle["former_teams"]
-                                    existing_managers.append(existing_vehicle["current_team"])
-                                    update_payload.update({"former_teams": existing_managers})
-                                logging.info(f"MANAGER {user_id} update status {req_status} of vehicle")
-
-                            if len(update_payload) > 0 and code == 0:
-                                req_payload = vehicle_entity(update_payload)
-                                result_doc = self.vehicle_collection.update_one({"_id": ObjectId(vehicle_id)},
-                                                                                {"$set": req_payload})
-                                if result_doc.matched_count == result_doc.modified_count:
-                                    message = 'Successfully updated the vehicle'
-                                    code = 200
-                                    status = 'success'
-                                    data = vehicle_entity(
-                                        self.vehicle_collection.find_one({'_id': ObjectId(vehicle_id)}))
-                                    logging.info(f"MANAGER {user_id} update document of vehicle {vehicle_id}")
-                                else:
-                                    message = 'Vehicle details were not updated.'
-                                    code = 200
-                                    status = 'success'
-                                    data = vehicle_entity(existing_vehicle)
-                                    logging.info(f"MANAGER {user_id} updated document with existing values")
-
-                        else:
-                            message = 'Unauthorised attempt to update vehicle.'
-                            code = 401
-                            status = 'fail'
-                            logging.warning(f"MANAGER {user_id} made unauthorised attempt to update vehicle")
-                    else:
-                        message = 'Vehicle not found'
-                        code = 404
-                        logging.warning(f"MANAGER {user_id} made request for vehicle that does not exist")
-                else:
+                req_current_team = None
+                req_status = payload.get("status")
+                version = payload.get("version")
+                if "current_team" in payload:
+                    req_current_team = payload["current_team"] if is_valid_object_id(payload["current_team"]) else ''
+                if not vehicle_id or not is_valid_object_id(vehicle_id) or \
+                        (req_current_team is None and req_status is None):
                     message = 'Bad request'
                     code = 400
-                    logging.warning(f"MANAGER {user_id} made bad request to update vehicle")
+                    logging.warning("MANAGER %s made bad request to update vehicle", user_id)
+                elif req_status is not None and not get_statuses_allowed_to_change(req_status):
+                    message = 'Invalid status transition'
+                    code = 400
+                    logging.warning("MANAGER %s tried to update status incorrectly", user_id)
+                else:
+                    conditions, update = build_vehicle_update(user_id, req_current_team, req_status, version)
+                    previous_vehicle = self.vehicle_collection.find_one_and_update(
+                        {"$and": [{"_id": ObjectId(vehicle_id)}] + conditions}, update,
+                        return_document=ReturnDocument.BEFORE)
+                    if previous_vehicle:
+                        updated_vehicle = dict(previous_vehicle, version=previous_vehicle.get("version", 0) + 1)
+                        if req_current_team is not None:
+                            updated_vehicle["current_team"] = req_current_team
+                        if req_status is not None:
+                            updated_vehicle["status"] = req_status
+                        if req_status == VehicleRouteStatus.ON_DESTINATION.name:
+                            updated_vehicle["current_route"] = ''
+                            record_trip(vehicle_id, previous_vehicle["current_route"], previous_vehicle["current_team"])
+
+                        bump_versions(VEHICLES)
+                        update_fleet_summary(summary_changes(previous_vehicle, updated_vehicle))
+                        if updated_vehicle["current_team"] != previous_vehicle["current_team"]:
+                            increment_counts({team_vehicles_counter(previous_vehicle["current_team"]): -1,
+                                              team_vehicles_counter(updated_vehicle["current_team"]): 1})
+                        message = 'Successfully updated the vehicle'
+                        code = 200
+                        status = 'success'
+                        data = vehicle_entity(updated_vehicle)
+                        logging.info("MANAGER %s update document of vehicle %s", user_id, vehicle_id)
+                    else:
+                        message, code = self.get_rejection(vehicle_id, user_id, req_current_team, req_status, version)
+                        logging.warning("MANAGER %s made rejected request to update vehicle %s", user_id, vehicle_id)
 
             except Exception as ex:
                 message = f"{ex}"
                 code = 500
-                logging.debug(f"MANAGER {user_id} made request and failed with error {ex}")
+                logging.debug("MANAGER %s made request and failed with error %s", user_id, ex)
         else:
             message = 'Unauthorised attempt to update vehicle'
             code = 401
-            logging.warning(f"MANAGER {user_id} made unauthorised request to update vehicle")
+            logging.warning("MANAGER %s made unauthorised request to update vehicle", user_id)
 
         return make_response(jsonify({'message': message, "status": status, "data": data}), code)
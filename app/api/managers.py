@@ -1,13 +1,18 @@
 from flask_restful import Resource
-from flask import jsonify, make_response
+from flask import jsonify, make_response, request
 import logging
 
 from app.utils.token_req import tokenReq
-from app.schemas.managers import manager_list_entity
-from app.schemas.vehicles import vehicle_entity
+from app.schemas.managers import manager_roster_pipeline, route_status_query, team_route_status_pipeline, \
+    MANAGER_FIELDS
 from app.enums.roles import Roles
+from app.enums.record_count import RecordCount
 from app.enums.vehicle_route_status import VehicleRouteStatus
 from app.utils.get_userid_token import get_userid_token
+from app.utils.etag import conditional_get
+from app.utils.streaming import wants_ndjson, ndjson_response, STREAM_BATCH_SIZE
+from app.utils.fields import get_requested_fields
+from app.db.versions import USERS, VEHICLES
 
 
 class ManagerResource(Resource):
@@ -17,35 +22,54 @@ class ManagerResource(Resource):
         self.vehicle_collection = kwargs["vehicle"]
 
     @tokenReq(Roles.ADMIN.value)
+    @conditional_get(USERS, VEHICLES)
     def get(self):
+        """
+        Retrieves a page of managers with their assigned vehicles, optionally filtered by the status of the
+        route they are currently on. `fields` restricts the returned manager fields.
+        Returns:
+            A JSON response containing the managers of the page and the total number of matching managers.
+        """
         status = 'fail'
         code = 500
         data = {}
         user_id = get_userid_token()
         try:
-            existing_managers = list(self.user_collection.find({"role": Roles.MANAGER.value}))
-            manager_ids = [str(manager["_id"]) for manager in existing_managers]
-            all_manager_vehicles = list(self.vehicle_collection.find({"current_team": {"$in": manager_ids}}))
-            manager_with_vehicle_list = []
-            for manager in existing_managers:
-                manager_info = manager
-                assigned_vehicles = []
-                for vehicle in all_manager_vehicles:
-                    if vehicle["current_team"] == str(manager["_id"]):
-                        assigned_vehicles.append(vehicle_entity(vehicle))
-                        if vehicle["status"] != VehicleRouteStatus.NOT_STARTED.name:
-                            manager_info.update({"current_route": vehicle["current_route"],
-                                                 "route_status": vehicle["status"], 'vehicle': str(vehicle["_id"])})
-
-                manager_info.update({"assigned_vehicles": assigned_vehicles})
-                manager_with_vehicle_list.append(manager_info)
-            data = manager_list_entity(manager_with_vehicle_list)
-            message = 'Successfully fetched all managers.'
-            code = 200
-            status = 'success'
-            logging.info(f"ADMIN {user_id} fetched all managers in system")
+            page_number = request.args.get("page")
+            route_status = request.args.get("route_status")
+            fields = get_requested_fields(MANAGER_FIELDS)
+            if not page_number:
+                page_number = 1
+            else:
+                page_number = int(page_number)
+            if route_status and route_status not in VehicleRouteStatus.__members__:
+                message = 'Invalid route status'
+                code = 400
+                logging.warning("ADMIN %s tried to filter managers by invalid route status", user_id)
+            else:
+                record_count = RecordCount.MANAGERS.value
+                manager_query = {"role": Roles.MANAGER.value}
+                if route_status:
+                    manager_query = route_status_query(
+                        manager_query, route_status, self.vehicle_collection.aggregate(team_route_status_pipeline()))
+                if wants_ndjson():
+                    logging.info("ADMIN %s streamed all managers in system", user_id)
+                    return ndjson_response(self.user_collection.aggregate(
+                        manager_roster_pipeline(manager_query, 0, None, fields), batchSize=STREAM_BATCH_SIZE))
+                managers = list(self.user_collection.aggregate(manager_roster_pipeline(
+                    manager_query, record_count * (page_number - 1), record_count, fields)))
+                total_managers = self.user_collection.count_documents(manager_query)
+                data = {"managers": managers, "total_records": total_managers}
+                message = 'Successfully fetched all managers.'
+                code = 200
+                status = 'success'
+                logging.info("ADMIN %s fetched all managers in system", user_id)
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("ADMIN %s provided invalid page or fields", user_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.info(f"ADMIN {user_id} tried to fetch all managers and failed {ex}")
+            logging.info("ADMIN %s tried to fetch all managers and failed %s", user_id, ex)
 
         return make_response(jsonify({"message": message, "status": status, "data": data}), code)
@@ -1,14 +1,12 @@
 from flask_restful import Resource
 from flask import jsonify, request, make_response
-from flask_bcrypt import Bcrypt
 from datetime import datetime, timedelta
 import logging
 import secrets
 
 from app.utils.validity_checks import is_valid_email
 from app.utils.get_userid_token import get_userid_token
-
-bcrypt = Bcrypt()
+from app.utils.password_hasher import password_hasher, HasherBusyError
 
 
 class RegisterTokenResource(Resource):
@@ -32,22 +30,22 @@ class RegisterTokenResource(Resource):
             if 'email' not in payload:
                 message = 'No email was provided'
                 code = 400
-                logging.warning(f"Admin {user_id} sent empty email")
+                logging.warning("Admin %s sent empty email", user_id)
             else:
                 email = payload["email"]
                 if not email or not is_valid_email(email):
                     message = 'Invalid email provided'
                     code = 400
-                    logging.warning(f"Admin {user_id} sent invalid email {email}")
+                    logging.warning("Admin %s sent invalid email %s", user_id, email)
                 else:
                     existing_user = self.user_collection.find_one({"email": email})
                     if existing_user:
                         message = 'User already exists'
                         code = 409
-                        logging.warning(f"Admin {user_id} sent request to generate token for existing user")
+                        logging.warning("Admin %s sent request to generate token for existing user", user_id)
                     else:
                         secret_token = secrets.token_hex(10)
-                        token = bcrypt.generate_password_hash(secret_token).decode('utf-8')
+                        token = password_hasher.generate_password_hash(secret_token)
                         existing_token = self.register_codes_collection.find_one({"email": email})
                         expiry_time = datetime.now() + timedelta(hours=24)
                         if existing_token:
@@ -61,9 +59,14 @@ class RegisterTokenResource(Resource):
                         status = 'success'
                         data = {"token": secret_token}
 
+        except HasherBusyError:
+            message = 'Server is busy. Please try again.'
+            status = "fail"
+            code = 503
+            logging.warning("Admin token generation rejected as password hashing queue is full")
         except Exception as ex:
             message = f"{ex}"
             status = "fail"
             code = 500
-            logging.debug(f"Admin could not generate token due to {ex}")
+            logging.debug("Admin could not generate token due to %s", ex)
         return make_response(jsonify({'status': status, "message": message, "data": data}), code)
@@ -1,6 +1,7 @@
 from flask_restful import Resource
 from flask import request, jsonify, make_response
 from flask_pymongo import ObjectId
+from pymongo import ASCENDING
 import logging
 
 from app.utils.get_userid_token import get_userid_token
@@ -9,7 +10,16 @@ from app.utils.validity_checks import is_valid_input_value, is_valid_object_id
 from app.enums.record_count import RecordCount
 from datetime import datetime
 from app.enums.roles import Roles
-from app.schemas.routes import route_entity, route_list_entity, create_route_entity
+from app.schemas.routes import route_entity, route_list_entity, create_route_entity, ROUTE_SORT_KEY, ROUTE_FIELDS, \
+    ROUTE_POINT_FIELDS
+from app.utils.pagination import keyset_query, next_page_cursor
+from app.utils.etag import conditional_get
+from app.utils.streaming import wants_ndjson, ndjson_response, STREAM_BATCH_SIZE
+from app.utils.fields import get_requested_fields, find_projection, select_fields, with_cursor_fields
+from app.db.versions import bump_versions, ROUTES
+from app.db.counts import get_total, increment_counts, ROUTES_COUNTER
+from app.utils.geo import parse_geo_point
+from app.utils.search import normalize_name, prefix_query
 
 
 def validate_route_values(data):
@@ -55,25 +65,37 @@ class RouteResource(Resource):
             if validate_route_values(payload):
                 message = 'Incorrect request'
                 code = 400
-                logging.warning(f"ADMIN {user_id} provided incorrect/invalid route details")
+                logging.warning("ADMIN %s provided incorrect/invalid route details", user_id)
             else:
+                for key in ROUTE_POINT_FIELDS:
+                    if payload.get(key) is not None:
+                        payload[key] = parse_geo_point(payload[key])
+                payload["name_key"] = normalize_name(payload["name"])
                 payload["created_on"] = datetime.now()
                 route_created = self.route_collection.insert_one(create_route_entity(payload))
+                bump_versions(ROUTES)
+                increment_counts({ROUTES_COUNTER: 1})
                 message = 'Successfully added a route'
                 code = 200
                 data = {"id": str(route_created.inserted_id)}
                 status = 'success'
-                logging.info(f"ADMIN {user_id} added a route {str(route_created.inserted_id)}")
+                logging.info("ADMIN %s added a route %s", user_id, route_created.inserted_id)
+        except ValueError as ex:
+            message = f'{ex}'
+            code = 400
+            logging.warning("ADMIN %s provided invalid route start or end point", user_id)
         except Exception as ex:
             message = f'{ex}'
-            logging.debug(f"ADMIN {user_id} failed to create route due to {ex}")
+            logging.debug("ADMIN %s failed to create route due to %s", user_id, ex)
         return make_response(jsonify({'status': status, "data": data, "message": message}), code)
 
     @tokenReq('')
+    @conditional_get(ROUTES)
     def get(self):
         """
         Method for handling GET requests to retrieve a single route by ID or a list
-        of all routes paginated.
+        of all routes paginated. `name` filters the routes by name prefix, ignoring case, and `fields` restricts
+        the returned route fields.
         Args:
             None
         Returns:
@@ -86,20 +108,24 @@ class RouteResource(Resource):
         user_id = get_userid_token()
         try:
             route_id = request.args.get("route")
+            fields = get_requested_fields(ROUTE_FIELDS)
+            projection = find_projection(fields)
             if route_id and is_valid_object_id(route_id):
-                found_route = self.route_collection.find_one({"_id": ObjectId(id)})
+                found_route = self.route_collection.find_one({"_id": ObjectId(route_id)}, projection)
                 if found_route:
                     message = 'Successfully fetched the route.'
                     code = 200
-                    data = route_entity(found_route)
+                    data = route_entity(found_route, fields)
                     status = 'success'
-                    logging.info(f"User {user_id} fetched the route {route_id}")
+                    logging.info("User %s fetched the route %s", user_id, route_id)
                 else:
                     message = 'Route not found'
                     code = 404
-                    logging.warning(f"USER {user_id} provided route id that does not exist")
+                    logging.warning("USER %s provided route id that does not exist", user_id)
             else:
                 page_number = request.args.get("page")
+                cursor = request.args.get("cursor")
+                exact = request.args.get("exact") == "true"
                 is_fetch_all = request.args.get("all")
 
                 if not page_number:
@@ -107,22 +133,50 @@ class RouteResource(Resource):
                 else:
                     page_number = int(page_number)
                 record_count = RecordCount.ROUTE.value
+                route_query = {}
+                counters = {ROUTES_COUNTER: {}}
+                name_prefix = request.args.get("name")
+                if name_prefix is not None:
+                    if not normalize_name(name_prefix):
+                        raise ValueError("Invalid name")
+                    route_query = {"name_key": prefix_query(normalize_name(name_prefix))}
+                    counters = None
+                if wants_ndjson():
+                    logging.info("User %s streamed the routes", user_id)
+                    return ndjson_response(self.route_collection.find(route_query, projection).
+                                           sort([(ROUTE_SORT_KEY, ASCENDING), ("_id", ASCENDING)]).
+                                           batch_size(STREAM_BATCH_SIZE), lambda route: route_entity(route, fields))
+                count_routes = get_total(self.route_collection, route_query, counters, exact)
                 if is_fetch_all:
-                    found_routes = self.route_collection.find()
+                    found_routes = self.route_collection.find(route_query, projection)
+                    data = {"routes": route_list_entity(found_routes, fields), "total_records": count_routes}
+                elif cursor is not None:
+                    cursor_fields = with_cursor_fields(fields, ROUTE_SORT_KEY)
+                    found_routes = route_list_entity(
+                        self.route_collection.find(keyset_query(route_query, ROUTE_SORT_KEY, cursor),
+                                                   find_projection(cursor_fields)).
+                        sort([(ROUTE_SORT_KEY, ASCENDING), ("_id", ASCENDING)]).limit(record_count + 1), cursor_fields)
+                    data = {"routes": [select_fields(route, fields) for route in found_routes[:record_count]],
+                            "total_records": count_routes,
+                            "next_cursor": next_page_cursor(found_routes, ROUTE_SORT_KEY, record_count)}
                 else:
-                    found_routes = self.route_collection.find().sort("name"). \
+                    found_routes = self.route_collection.find(route_query, projection).\
+                        sort([(ROUTE_SORT_KEY, ASCENDING), ("_id", ASCENDING)]). \
                         skip(record_count * (page_number - 1)).limit(record_count)
-                count_routes = self.route_collection.count_documents({})
+                    data = {"routes": route_list_entity(found_routes, fields), "total_records": count_routes}
 
-                data = {"routes": route_list_entity(found_routes), "total_records": count_routes}
                 message = 'Successfully fetched all routes.'
                 code = 200
                 status = 'success'
-                logging.info(f"User {user_id} fetched the routes")
+                logging.info("User %s fetched the routes", user_id)
 
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User %s provided invalid page, cursor, fields or name", user_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.info(f"User {user_id} tried to fetch the routes and failed due to {ex}")
+            logging.info("User %s tried to fetch the routes and failed due to %s", user_id, ex)
         return make_response(jsonify({'status': status, "data": data, "message": message}), code)
 
     @tokenReq(Roles.ADMIN.value)
@@ -138,27 +192,29 @@ class RouteResource(Resource):
                 if existing_route and len(ongoing_route_vehicles) > 0:
                     message = 'Cannot remove route. Vehicle is currently on this route.'
                     code = 400
-                    logging.warning(f"ADMIN {user_id} tried to delete the route {route_id} that is on route")
+                    logging.warning("ADMIN %s tried to delete the route %s that is on route", user_id, route_id)
                 elif existing_route:
                     deleted_doc = self.route_collection.delete_one({"_id": ObjectId(route_id)})
                     if deleted_doc.deleted_count == 1:
+                        bump_versions(ROUTES)
+                        increment_counts({ROUTES_COUNTER: -1})
                         message = f'Successfully removed route {existing_route["name"]}'
                         status = 'success'
                         code = 200
-                        logging.info(f"ADMIN {user_id} deleted the route {route_id}")
+                        logging.info("ADMIN %s deleted the route %s", user_id, route_id)
                     else:
                         message = 'Failed to remove route'
-                        logging.warning(f"ADMIN {user_id} failed to delete the route")
+                        logging.warning("ADMIN %s failed to delete the route", user_id)
                 else:
                     message = 'Route not found.'
                     code = 404
-                    logging.warning(f"ADMIN {user_id} provided route id that does not exist")
+                    logging.warning("ADMIN %s provided route id that does not exist", user_id)
             else:
                 message = 'Bad request'
                 code = 400
-                logging.warning(f"ADMIN {user_id} provided invalid route id to delete")
+                logging.warning("ADMIN %s provided invalid route id to delete", user_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.debug(f"ADMIN {user_id} tried to delete route {route_id} and failed {ex}")
+            logging.debug("ADMIN %s tried to delete route %s and failed %s", user_id, route_id, ex)
 
         return make_response(jsonify({"message": message, "status": status}), code)
@@ -0,0 +1,61 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+import logging
+
+from app.schemas.routes import nearby_routes_pipeline
+from app.utils.token_req import tokenReq
+from app.utils.get_userid_token import get_userid_token
+from app.utils.geo import parse_near_args
+from app.utils.etag import conditional_get
+from app.db.versions import ROUTES
+
+ROUTE_POINT_KEYS = {"start": "start_point", "end": "end_point"}
+
+
+class RouteNearbyResource(Resource):
+    """
+    A class representing a RESTful API resource for finding the routes close to a location.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the RouteNearbyResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the route collection.
+        Returns:
+            None
+        """
+        self.route_collection = kwargs["route"]
+
+    @tokenReq('')
+    @conditional_get(ROUTES)
+    def get(self):
+        """
+        Retrieves the routes starting, or with `point=end` ending, closest to `lng`/`lat`, nearest first.
+        Returns:
+            A JSON response containing the routes with their distance in meters.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            point, max_distance, limit = parse_near_args(request.args)
+            point_key = ROUTE_POINT_KEYS.get(request.args.get("point") or "start")
+            if point_key is None:
+                raise ValueError("point must be start or end")
+            routes = list(self.route_collection.aggregate(
+                nearby_routes_pipeline(point, point_key, limit, max_distance)))
+            data = {"routes": routes}
+            message = 'Successfully fetched nearby routes.'
+            status = 'success'
+            code = 200
+            logging.info("User %s fetched routes near %s", user_id, point['coordinates'])
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User %s provided invalid location for nearby routes", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("User %s failed to fetch nearby routes due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
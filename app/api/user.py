@@ -1,12 +1,15 @@
 from flask_restful import Resource
 from flask import make_response, jsonify
-from flask_pymongo import ObjectId
 from flask_bcrypt import Bcrypt
 import logging
 
-from app.schemas.users import user_entity
+from app.schemas.users import user_entity, USER_FIELDS
 from app.utils.get_userid_token import get_userid_token
 from app.utils.token_req import tokenReq
+from app.utils.user_cache import user_profile_cache
+from app.utils.etag import conditional_get
+from app.utils.fields import get_requested_fields
+from app.db.versions import USERS
 
 bcrypt = Bcrypt()
 
@@ -18,32 +21,38 @@ class UserResource(Resource):
         self.register_code_collection = kwargs["register_codes"]
 
     @tokenReq("")
+    @conditional_get(USERS, per_user=True)
     def get(self):
         data = {}
         status = 'fail'
         try:
             user_id = get_userid_token()
             if user_id:
-                user = self.user_collection.find_one({"_id": ObjectId(user_id)})
+                fields = get_requested_fields(USER_FIELDS)
+                user = user_profile_cache.get(self.user_collection, user_id)
                 if user:
-                    data = user_entity(user)
+                    data = user_entity(user, fields)
                     message = 'Successfully fetch user details'
                     status = 'success'
                     code = 200
-                    logging.info(f"User {user_id} fetched details successfully")
+                    logging.info("User %s fetched details successfully", user_id)
                 else:
                     message = 'User not found'
                     code = 404
-                    logging.warning(f"User {user_id} does not exist")
+                    logging.warning("User %s does not exist", user_id)
             else:
                 message = 'Invalid user id'
                 code = 400
-                logging.warning(f"User {user_id} provided invalid id")
+                logging.warning("User %s provided invalid id", user_id)
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User provided invalid fields")
         except Exception as ex:
             message = f"{ex}"
             status = 'fail'
             code = 500
-            logging.debug(f"User failed to fetch their details {ex}")
+            logging.debug("User failed to fetch their details %s", ex)
 
         return make_response(jsonify({"message": message, "status": status, "data": data}), code)
 
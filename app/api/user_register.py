@@ -1,14 +1,13 @@
 from flask_restful import Resource
 from flask import jsonify, request, make_response
-from flask_bcrypt import Bcrypt
 from datetime import datetime
 import logging
 
 from app.enums.roles import Roles
 from app.utils.validity_checks import is_valid_email, is_valid_input_value
 from app.schemas.users import create_user_entity
-
-bcrypt = Bcrypt()
+from app.utils.password_hasher import password_hasher, HasherBusyError
+from app.db.versions import bump_versions, USERS
 
 
 class UserRegisterResource(Resource):
@@ -36,7 +35,7 @@ class UserRegisterResource(Resource):
             if user_existing:
                 message = 'User already exists.'
                 code = 409
-                logging.warning(f"User tried to register with existing email")
+                logging.warning("User tried to register with existing email")
             else:
                 token_arg = request.args.get("usertoken")
                 if token_arg:
@@ -44,13 +43,13 @@ class UserRegisterResource(Resource):
                     if not registered_code:
                         message = 'Provided email is not found.'
                         code = 401
-                        logging.warning(f"Manager tried to register with incorrect email")
+                        logging.warning("Manager tried to register with incorrect email")
                     elif "name" not in payload:
                         message = 'Incomplete request. No name was provided.'
                         code = 400
-                        logging.warning(f"Manager tried to register without name")
-                    elif bcrypt.check_password_hash(registered_code["token"], token_arg):
-                        payload['password'] = bcrypt.generate_password_hash(payload['password']).decode('utf-8')
+                        logging.warning("Manager tried to register without name")
+                    elif password_hasher.check_password_hash(registered_code["token"], token_arg):
+                        payload['password'] = password_hasher.generate_password_hash(payload['password'])
                         payload['created_on'] = datetime.now()
                         if not is_valid_email(payload["email"]):
                             status = 'fail'
@@ -62,6 +61,7 @@ class UserRegisterResource(Resource):
                             res = self.user_collection.insert_one(create_user_entity(payload))
                             self.register_codes_collection.delete_one({"email": payload["email"]})
                             if res.acknowledged:
+                                bump_versions(USERS)
                                 status = "successful"
                                 message = "Security Manager created successfully"
                                 code = 201
@@ -71,7 +71,7 @@ class UserRegisterResource(Resource):
                         message = "User token is invalid."
                         logging.warning("Manager tried to register with invalid token")
                 else:
-                    payload['password'] = bcrypt.generate_password_hash(payload['password']).decode('utf-8')
+                    payload['password'] = password_hasher.generate_password_hash(payload['password'])
                     payload['created_on'] = datetime.now()
                     if not is_valid_email(payload["email"]):
                         status = 'fail'
@@ -90,16 +90,21 @@ class UserRegisterResource(Resource):
                         logging.warning("Admin tried to register with invalid name")
                     else:
                         payload["role"] = Roles.ADMIN.value
-                        print(payload)
                         res = self.user_collection.insert_one(payload)
                         if res.acknowledged:
+                            bump_versions(USERS)
                             status = "successful"
                             message = "Administrator registered successfully"
                             code = 201
                             logging.info("Admin successfully registered in the system")
+        except HasherBusyError:
+            message = 'Server is busy. Please try again.'
+            status = "fail"
+            code = 503
+            logging.warning("User registration rejected as password hashing queue is full")
         except Exception as ex:
             message = f"{ex}"
             status = "fail"
             code = 500
-            logging.debug(f"User could not register due to {ex}")
+            logging.debug("User could not register due to %s", ex)
         return make_response(jsonify({'status': status, "message": message}), code)
@@ -8,10 +8,20 @@ import logging
 from app.enums.roles import Roles
 from app.enums.record_count import RecordCount
 from app.enums.vehicle_route_status import VehicleRouteStatus
-from app.schemas.vehicles import vehicle_entity, vehicle_list_entity, create_vehicle_entity
-from app.schemas.users import user_entity
+from app.schemas.vehicles import vehicle_entity, create_vehicle_entity, vehicle_list_pipeline, VEHICLE_SORT_KEY, \
+    VEHICLE_FIELDS, VEHICLE_JOINED_FIELDS
 from app.utils.validity_checks import is_vehicle_plate_valid, is_valid_object_id
+from app.utils.pagination import keyset_query, next_page_cursor
 from app.utils.get_userid_token import get_userid_token
+from app.utils.principal import get_current_principal
+from app.utils.etag import conditional_get
+from app.utils.streaming import wants_ndjson, ndjson_response, STREAM_BATCH_SIZE
+from app.utils.fields import get_requested_fields, find_projection, select_fields, with_cursor_fields
+from app.utils.search import normalize_plate, prefix_query
+from app.db.versions import bump_versions, VEHICLES, ROUTES, USERS
+from app.db.counts import get_total, increment_counts, team_vehicles_counter, team_vehicles_counters, \
+    VEHICLES_COUNTER, UNASSIGNED_VEHICLES_COUNTER
+from app.db.summary import summary_changes, update_fleet_summary
 
 
 def check_vehicle_validity(payload):
@@ -23,6 +33,54 @@ def check_vehicle_validity(payload):
         return True
 
 
+def build_vehicle_filters(args, principal):
+    """
+    Builds the vehicle list filter from the query parameters `status`, `route`, `team`, `unassigned` and
+    `plate` (a vehicle number prefix). Managers only ever see their team's and unassigned vehicles.
+    Args:
+        args: The query parameters of the request.
+        principal: The authenticated caller.
+    Returns:
+        A tuple of the vehicle filter and the counters whose sum is its total, None when the total has to be
+        counted.
+    Raises:
+        ValueError: If a filter value is invalid.
+    """
+    vehicle_query = {}
+    teams = None
+    if principal.role == Roles.MANAGER.value:
+        teams = [principal.id, '']
+    team = args.get("team")
+    if team is not None:
+        if not is_valid_object_id(team):
+            raise ValueError("Invalid team id")
+        teams = [team] if teams is None or team in teams else []
+    if args.get("unassigned") == "true":
+        teams = [''] if teams is None or '' in teams else []
+    if teams is not None:
+        vehicle_query.update({"current_team": teams[0] if len(teams) == 1 else {"$in": teams}})
+    counters = {VEHICLES_COUNTER: {}} if teams is None else team_vehicles_counters(teams)
+
+    status = args.get("status")
+    if status is not None:
+        if status not in VehicleRouteStatus.__members__:
+            raise ValueError("Invalid status")
+        vehicle_query.update({"status": status})
+    route = args.get("route")
+    if route is not None:
+        if not is_valid_object_id(route):
+            raise ValueError("Invalid route id")
+        vehicle_query.update({"current_route": route})
+    plate = args.get("plate")
+    if plate is not None:
+        if not normalize_plate(plate):
+            raise ValueError("Invalid plate")
+        vehicle_query.update({"plate_key": prefix_query(normalize_plate(plate))})
+    if status is not None or route is not None or plate is not None:
+        counters = None
+    return vehicle_query, counters
+
+
 class VehicleResource(Resource):
     """
     A class representing a RESTful API resource for managing vehicles.
@@ -41,9 +99,11 @@ class VehicleResource(Resource):
         self.route_collection = kwargs["route"]
 
     @tokenReq('')
+    @conditional_get(VEHICLES, ROUTES, USERS, per_user=True)
     def get(self):
         """
-        Retrieves a vehicle by its ID or all vehicles in the collection.
+        Retrieves a vehicle by its ID or the vehicles in the collection, filtered as described in
+        build_vehicle_filters. `fields` restricts the returned vehicle fields.
         Args:
             id: The ID of the vehicle to retrieve.
         Returns:
@@ -55,66 +115,75 @@ class VehicleResource(Resource):
         user_id = get_userid_token()
         try:
             vehicle_id = request.args.get("vehicle")
+            fields = get_requested_fields(VEHICLE_FIELDS)
             if vehicle_id:
                 if is_valid_object_id(vehicle_id):
-                    found_vehicle = self.vehicle_collection.find_one({"_id": ObjectId(id)})
+                    if fields and any(field in VEHICLE_JOINED_FIELDS for field in fields):
+                        found_vehicle = next(self.vehicle_collection.aggregate(
+                            vehicle_list_pipeline({"_id": ObjectId(vehicle_id)}, 0, 1, fields)), None)
+                    else:
+                        found_vehicle = self.vehicle_collection.find_one({"_id": ObjectId(vehicle_id)},
+                                                                         find_projection(fields))
+                        found_vehicle = found_vehicle and vehicle_entity(found_vehicle, fields)
                     if found_vehicle:
-                        data = vehicle_entity(found_vehicle)
+                        data = found_vehicle
                         message = 'Successfully fetched vehicle.'
                         status = 'success'
                         code = 200
-                        logging.info(f"User {user_id} successfully fetched the vehicle {vehicle_id}")
+                        logging.info("User %s successfully fetched the vehicle %s", user_id, vehicle_id)
                     else:
                         code = 404
                         message = 'Vehicle not found'
-                        logging.warning(f"User {user_id} requested vehicle that does not exist")
+                        logging.warning("User %s requested vehicle that does not exist", user_id)
                 else:
                     message = 'Invalid vehicle id'
                     code = 400
-                    logging.warning(f"User {user_id} provided invalid vehicle id")
+                    logging.warning("User %s provided invalid vehicle id", user_id)
             else:
-                page_number = int(request.args.get("page"))
+                page_number = request.args.get("page")
+                cursor = request.args.get("cursor")
+                exact = request.args.get("exact") == "true"
                 if not page_number:
                     page_number = 1
+                else:
+                    page_number = int(page_number)
                 record_count = RecordCount.VEHICLE.value
-                vehicle_query = {}
-                if user_id:
-                    user = self.user_collection.find_one({"_id": ObjectId(user_id)})
-                    if not user:
-                        message = 'User not found'
-                        code = 401
-                        logging.warning(f"User {user_id} is not found to access the vehicles list")
+                principal = get_current_principal()
+                if principal:
+                    vehicle_query, counters = build_vehicle_filters(request.args, principal)
+                    if wants_ndjson():
+                        logging.info("User %s streamed the vehicles list", user_id)
+                        return ndjson_response(self.vehicle_collection.aggregate(
+                            vehicle_list_pipeline(vehicle_query, 0, None, fields), batchSize=STREAM_BATCH_SIZE))
+                    total_vehicle_records = get_total(self.vehicle_collection, vehicle_query, counters, exact)
+                    if cursor is not None:
+                        vehicle_list = list(self.vehicle_collection.aggregate(vehicle_list_pipeline(
+                            keyset_query(vehicle_query, VEHICLE_SORT_KEY, cursor), 0, record_count + 1,
+                            with_cursor_fields(fields, VEHICLE_SORT_KEY))))
+                        data = {"vehicles": [select_fields(vehicle, fields) for vehicle in vehicle_list[:record_count]],
+                                'total_records': total_vehicle_records,
+                                "next_cursor": next_page_cursor(vehicle_list, VEHICLE_SORT_KEY, record_count)}
                     else:
-                        if user["role"] == Roles.MANAGER.value:
-                            vehicle_query.update({"current_team": {"$in": [user_id, '']}})
-                        vehicle_list = list(self.vehicle_collection.find(vehicle_query).sort("name").
-                                            skip(record_count * (page_number - 1)).limit(record_count))
-                        total_vehicle_records = self.vehicle_collection.count_documents(vehicle_query)
-                        vehicle_final_list = []
-                        for vehicle in vehicle_list:
-                            vehicle_data = vehicle
-                            if vehicle["current_route"]:
-                                route_info = self.route_collection.find_one({"_id": ObjectId(vehicle["current_route"])})
-                                vehicle_data.update({"route_info": route_info})
-                            if vehicle["current_team"]:
-                                manager_info = self.user_collection.find_one({"_id": ObjectId(vehicle["current_team"])})
-                                vehicle_data.update({"manager_info": manager_info})
-                            vehicle_final_list.append(vehicle_data)
+                        vehicle_list = list(self.vehicle_collection.aggregate(vehicle_list_pipeline(
+                            vehicle_query, record_count * (page_number - 1), record_count, fields)))
+                        data = {"vehicles": vehicle_list, 'total_records': total_vehicle_records}
 
-                        message = 'Successfully fetched all vehicles.'
-                        data = {"vehicles": vehicle_list_entity(vehicle_final_list),
-                                'total_records': total_vehicle_records}
-                        status = 'success'
-                        code = 200
-                        logging.info(f"User {user_id} successfully fetched the vehicles list")
+                    message = 'Successfully fetched all vehicles.'
+                    status = 'success'
+                    code = 200
+                    logging.info("User %s successfully fetched the vehicles list", user_id)
                 else:
                     message = 'Unauthorized'
                     code = 401
-                    logging.warning(f"Unauthorized attempt to access vehicles")
+                    logging.warning("Unauthorized attempt to access vehicles")
 
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User %s provided invalid page, cursor, fields or filters", user_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.warning(f"User failed to fetch vehicles due to {ex}")
+            logging.warning("User failed to fetch vehicles due to %s", ex)
         return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
 
     @tokenReq(Roles.ADMIN.value)
@@ -133,29 +202,32 @@ class VehicleResource(Resource):
             if check_vehicle_validity(payload):
                 code = 400
                 message = 'Incorrect/Invalid vehicle request'
-                logging.warning(f"User {user_id} provided incorrect vehicle number")
+                logging.warning("User %s provided incorrect vehicle number", user_id)
             else:
                 vehicle_exist = self.vehicle_collection.find_one({"vehicle_number": payload['vehicle_number']})
                 if vehicle_exist:
                     message = 'Vehicle already exists.'
                     code = 409
-                    logging.warning(f"User {user_id} tried to create vehicle with existing vehicle number")
+                    logging.warning("User %s tried to create vehicle with existing vehicle number", user_id)
                 else:
                     payload["current_route"] = ''
                     payload["status"] = VehicleRouteStatus.NOT_STARTED.name
                     payload["current_team"] = ""
-                    payload["former_teams"] = []
                     payload["created_on"] = datetime.now()
-                    payload["former_routes"] = []
+                    payload["version"] = 0
+                    payload["plate_key"] = normalize_plate(payload["vehicle_number"])
                     vehicle_created = self.vehicle_collection.insert_one(create_vehicle_entity(payload))
+                    bump_versions(VEHICLES)
+                    increment_counts({VEHICLES_COUNTER: 1, UNASSIGNED_VEHICLES_COUNTER: 1})
+                    update_fleet_summary(summary_changes(None, payload))
                     data = {"id": str(ObjectId(vehicle_created.inserted_id))}
                     message = f"Successfully created vehicle {payload['vehicle_number']}"
                     code = 200
                     status = 'success'
-                    logging.info(f"User {user_id} created vehicle {str(vehicle_created.inserted_id)}")
+                    logging.info("User %s created vehicle %s", user_id, vehicle_created.inserted_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.debug(f"User {user_id} failed to create vehicle due to {ex}")
+            logging.debug("User %s failed to create vehicle due to %s", user_id, ex)
         return make_response(jsonify({"data": data, "message": message, "status": status}), code)
 
     @tokenReq(Roles.ADMIN.value)
@@ -172,26 +244,30 @@ class VehicleResource(Resource):
                             existing_vehicle['status'] != VehicleRouteStatus.ON_DESTINATION.name:
                         message = 'Vehicle is currently on route. Cannot remove vehicle.'
                         code = 400
-                        logging.warning(f"User {user_id} tried to delete vehicle which is on route")
+                        logging.warning("User %s tried to delete vehicle which is on route", user_id)
                     else:
                         deleted_doc = self.vehicle_collection.delete_one({"_id": ObjectId(vehicle_id)})
                         if deleted_doc.deleted_count == 1:
+                            bump_versions(VEHICLES)
+                            update_fleet_summary(summary_changes(existing_vehicle, None))
+                            increment_counts({VEHICLES_COUNTER: -1,
+                                              team_vehicles_counter(existing_vehicle["current_team"]): -1})
                             message = f'Successfully removed vehicle {existing_vehicle["name"]}'
                             status = 'success'
                             code = 200
-                            logging.info(f"User {user_id} deleted vehicle {vehicle_id}")
+                            logging.info("User %s deleted vehicle %s", user_id, vehicle_id)
                         else:
                             message = 'Failed to remove vehicle'
-                            logging.warning(f"User {user_id} failed to delete vehicle")
+                            logging.warning("User %s failed to delete vehicle", user_id)
                 else:
                     message = 'Vehicle not found.'
                     code = 404
-                    logging.warning(f"User {user_id} tried to delete vehicle that does not exist")
+                    logging.warning("User %s tried to delete vehicle that does not exist", user_id)
             else:
                 message = 'Bad request'
                 code = 400
-                logging.warning(f"User {user_id} tried to delete vehicle with invalid id")
+                logging.warning("User %s tried to delete vehicle with invalid id", user_id)
         except Exception as ex:
             message = f"{ex}"
-            logging.warning(f"User {user_id} failed to delete vehicle due to {ex}")
+            logging.warning("User %s failed to delete vehicle due to %s", user_id, ex)
         return make_response(jsonify({"message": message, "status": status}), code)
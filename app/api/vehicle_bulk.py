@@ -0,0 +1,191 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response, current_app
+from pymongo.errors import BulkWriteError
+from datetime import datetime
+import csv
+import io
+import logging
+
+from app.enums.roles import Roles
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from app.schemas.vehicles import create_vehicle_entity
+from app.utils.token_req import tokenReq
+from app.utils.validity_checks import is_vehicle_plate_valid
+from app.utils.get_userid_token import get_userid_token
+from app.utils.streaming import NDJSON_MIMETYPE
+from app.utils.search import normalize_plate
+from app.db.versions import bump_versions, VEHICLES
+from app.db.counts import increment_counts, VEHICLES_COUNTER, UNASSIGNED_VEHICLES_COUNTER
+from app.db.summary import summary_changes, update_fleet_summary
+
+IMPORT_MAX_ROWS = 10000
+IMPORT_CHUNK_SIZE = 1000
+DUPLICATE_KEY_ERROR = 11000
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+FAILED = "failed"
+
+
+def parse_import_rows(body, mimetype):
+    """
+    Reads the vehicle numbers of an import file.
+    Args:
+        body (str): The request body, a CSV file with a `vehicle_number` column or NDJSON objects with a
+            `vehicle_number` key.
+        mimetype (str): Content type of the request.
+    Returns:
+        A list of vehicle numbers in file order. Rows without a usable vehicle number are returned as None.
+    Raises:
+        ValueError: If the content type is not supported or the file cannot be read.
+    """
+    if mimetype == NDJSON_MIMETYPE:
+        vehicle_numbers = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = current_app.json.loads(line)
+            except Exception:
+                row = None
+            vehicle_number = row.get("vehicle_number") if isinstance(row, dict) else None
+            vehicle_numbers.append(vehicle_number.strip() if isinstance(vehicle_number, str) else None)
+        return vehicle_numbers
+    if mimetype == "text/csv":
+        reader = csv.DictReader(io.StringIO(body))
+        if not reader.fieldnames or "vehicle_number" not in reader.fieldnames:
+            raise ValueError("CSV file must have a vehicle_number column")
+        try:
+            return [(row["vehicle_number"] or "").strip() or None for row in reader]
+        except csv.Error as ex:
+            raise ValueError(f"Invalid CSV file: {ex}")
+    raise ValueError(f"Unsupported content type, send text/csv or {NDJSON_MIMETYPE}")
+
+
+def classify_import_rows(vehicle_numbers, existing_numbers):
+    """
+    Validates every row of an import in one pass.
+    A vehicle number already stored, or repeated earlier in the file, is a duplicate.
+    Args:
+        vehicle_numbers (list): Vehicle numbers in file order.
+        existing_numbers (set): Vehicle numbers of the file that are already stored.
+    Returns:
+        A list of row results and the list of row indexes to insert.
+    """
+    results = []
+    to_insert = []
+    seen = set()
+    for index, vehicle_number in enumerate(vehicle_numbers):
+        if not vehicle_number or not is_vehicle_plate_valid(vehicle_number):
+            results.append({"row": index + 1, "vehicle_number": vehicle_number, "status": INVALID})
+        elif vehicle_number in existing_numbers or vehicle_number in seen:
+            results.append({"row": index + 1, "vehicle_number": vehicle_number, "status": DUPLICATE})
+        else:
+            seen.add(vehicle_number)
+            results.append({"row": index + 1, "vehicle_number": vehicle_number, "status": CREATED})
+            to_insert.append(index)
+    return results, to_insert
+
+
+class VehicleBulkResource(Resource):
+    """
+    A class representing a RESTful API resource for importing vehicles in bulk.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the VehicleBulkResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle collection.
+        Returns:
+            None
+        """
+        self.vehicle_collection = kwargs["vehicle"]
+
+    def insert_chunk(self, vehicles, rows, results):
+        """
+        Inserts a chunk of vehicles without stopping at the first failure and records the outcome of each row.
+        Vehicle numbers inserted concurrently by another request are rejected by the unique index and
+        reported as duplicates.
+        Args:
+            vehicles (list): Vehicle documents to insert.
+            rows (list): Result entry of each vehicle.
+            results (list): All row results of the import.
+        Returns:
+            The number of vehicles created.
+        """
+        failed = {}
+        try:
+            self.vehicle_collection.insert_many(vehicles, ordered=False)
+        except BulkWriteError as ex:
+            for error in ex.details.get("writeErrors", []):
+                failed[error["index"]] = DUPLICATE if error["code"] == DUPLICATE_KEY_ERROR else FAILED
+        for position, (vehicle, row) in enumerate(zip(vehicles, rows)):
+            if position in failed:
+                results[row]["status"] = failed[position]
+            else:
+                results[row]["id"] = str(vehicle["_id"])
+        return len(vehicles) - len(failed)
+
+    @tokenReq(Roles.ADMIN.value)
+    def post(self):
+        """
+        Creates the vehicles listed in a CSV or NDJSON file.
+        Returns:
+            A JSON response reporting each row as created, duplicate or invalid, and the number of vehicles
+            created.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            vehicle_numbers = parse_import_rows(request.get_data(as_text=True), request.mimetype)
+            if not vehicle_numbers:
+                message = 'No vehicles to import'
+                code = 400
+                logging.warning("User %s sent an empty vehicle import", user_id)
+            elif len(vehicle_numbers) > IMPORT_MAX_ROWS:
+                message = f'Cannot import more than {IMPORT_MAX_ROWS} vehicles at once'
+                code = 413
+                logging.warning("User %s sent a vehicle import of %s rows", user_id, len(vehicle_numbers))
+            else:
+                candidates = list({vehicle_number for vehicle_number in vehicle_numbers
+                                   if vehicle_number and is_vehicle_plate_valid(vehicle_number)})
+                existing_numbers = {vehicle["vehicle_number"] for vehicle in self.vehicle_collection.find(
+                    {"vehicle_number": {"$in": candidates}}, {"_id": 0, "vehicle_number": 1})}
+                results, to_insert = classify_import_rows(vehicle_numbers, existing_numbers)
+                created_on = datetime.now()
+                created = 0
+                for start in range(0, len(to_insert), IMPORT_CHUNK_SIZE):
+                    rows = to_insert[start:start + IMPORT_CHUNK_SIZE]
+                    vehicles = [create_vehicle_entity({
+                        "vehicle_number": vehicle_numbers[row],
+                        "plate_key": normalize_plate(vehicle_numbers[row]),
+                        "current_route": '',
+                        "status": VehicleRouteStatus.NOT_STARTED.name,
+                        "current_team": "",
+                        "created_on": created_on,
+                        "version": 0
+                    }) for row in rows]
+                    created += self.insert_chunk(vehicles, rows, results)
+                if created:
+                    bump_versions(VEHICLES)
+                    increment_counts({VEHICLES_COUNTER: created, UNASSIGNED_VEHICLES_COUNTER: created})
+                    update_fleet_summary({path: delta * created for path, delta in summary_changes(None, {
+                        "status": VehicleRouteStatus.NOT_STARTED.name, "current_team": "", "current_route": ''
+                    }).items()})
+                data = {"vehicles": results, "created": created}
+                message = f'Successfully imported {created} of {len(vehicle_numbers)} vehicles'
+                status = 'success'
+                code = 200
+                logging.info("User %s imported %s vehicles", user_id, created)
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User %s sent an unreadable vehicle import", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("User %s failed to import vehicles due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, "data": data, "status": status}), code)
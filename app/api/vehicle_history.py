@@ -0,0 +1,69 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+import logging
+
+from app.enums.record_count import RecordCount
+from app.schemas.history import trip_history_pipeline, trip_count_pipeline
+from app.utils.token_req import tokenReq
+from app.utils.validity_checks import is_valid_object_id
+from app.utils.get_userid_token import get_userid_token
+from app.utils.etag import conditional_get
+from app.db.versions import VEHICLES
+
+
+class VehicleHistoryResource(Resource):
+    """
+    A class representing a RESTful API resource for the trip history of a vehicle.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the VehicleHistoryResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle history collection.
+        Returns:
+            None
+        """
+        self.history_collection = kwargs["vehicle_history"]
+
+    @tokenReq('')
+    @conditional_get(VEHICLES)
+    def get(self):
+        """
+        Retrieves a page of the finished trips of a vehicle, newest first.
+        Returns:
+            A JSON response containing the trips of the page and the total number of trips.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            vehicle_id = request.args.get("vehicle")
+            page_number = request.args.get("page")
+            if not page_number:
+                page_number = 1
+            else:
+                page_number = int(page_number)
+            if vehicle_id and is_valid_object_id(vehicle_id):
+                record_count = RecordCount.HISTORY.value
+                trips = list(self.history_collection.aggregate(
+                    trip_history_pipeline(vehicle_id, record_count * (page_number - 1), record_count)))
+                count_result = list(self.history_collection.aggregate(trip_count_pipeline(vehicle_id)))
+                data = {"trips": trips, "total_records": count_result[0]["total"] if count_result else 0}
+                message = 'Successfully fetched vehicle history.'
+                status = 'success'
+                code = 200
+                logging.info("User %s fetched the history of vehicle %s", user_id, vehicle_id)
+            else:
+                message = 'Invalid vehicle id'
+                code = 400
+                logging.warning("User %s provided invalid vehicle id for history", user_id)
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("User %s provided invalid page", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("User %s failed to fetch vehicle history due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
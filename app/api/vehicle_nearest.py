@@ -0,0 +1,77 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+from flask_pymongo import ObjectId
+import logging
+
+from app.enums.roles import Roles
+from app.schemas.vehicles import nearest_vehicles_pipeline
+from app.utils.token_req import tokenReq
+from app.utils.get_userid_token import get_userid_token
+from app.utils.validity_checks import is_valid_object_id
+from app.utils.geo import parse_near_args, parse_near_limit, parse_max_distance
+
+
+class VehicleNearestResource(Resource):
+    """
+    A class representing a RESTful API resource for finding the idle vehicles closest to a route or location.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the VehicleNearestResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle and route collections.
+        Returns:
+            None
+        """
+        self.vehicle_collection = kwargs["vehicle"]
+        self.route_collection = kwargs["route"]
+
+    @tokenReq(Roles.ADMIN.value)
+    def get(self):
+        """
+        Retrieves the vehicles at the depot closest to the start of a route, or to `lng`/`lat`, by their last
+        known position.
+        Returns:
+            A JSON response containing the vehicles with their distance in meters.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            route_id = request.args.get("route")
+            point = None
+            if route_id:
+                if not is_valid_object_id(route_id):
+                    raise ValueError("Invalid route id")
+                max_distance, limit = parse_max_distance(request.args), parse_near_limit(request.args)
+                route = self.route_collection.find_one({"_id": ObjectId(route_id)}, {"start_point": 1})
+                if not route:
+                    message = 'Route not found'
+                    code = 404
+                    logging.warning("ADMIN %s requested vehicles near a route that does not exist", user_id)
+                elif not route.get("start_point"):
+                    message = 'Route has no start point'
+                    code = 400
+                    logging.warning("ADMIN %s requested vehicles near route %s without start point", user_id, route_id)
+                else:
+                    point = route["start_point"]
+            else:
+                point, max_distance, limit = parse_near_args(request.args)
+            if point is not None:
+                vehicles = list(self.vehicle_collection.aggregate(
+                    nearest_vehicles_pipeline(point, limit, max_distance)))
+                data = {"vehicles": vehicles}
+                message = 'Successfully fetched nearest vehicles.'
+                status = 'success'
+                code = 200
+                logging.info("ADMIN %s fetched vehicles near %s", user_id, point['coordinates'])
+        except ValueError as ex:
+            message = f"{ex}"
+            code = 400
+            logging.warning("ADMIN %s provided invalid location for nearest vehicles", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("ADMIN %s failed to fetch nearest vehicles due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
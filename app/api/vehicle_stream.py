@@ -0,0 +1,86 @@
+from flask_restful import Resource
+from flask import request, current_app, Response, stream_with_context
+import logging
+import queue
+
+from app.config import SSE_HEARTBEAT_SECONDS
+from app.enums.roles import Roles
+from app.utils.token_req import tokenReq
+from app.utils.principal import get_current_principal
+
+SSE_MIMETYPE = "text/event-stream"
+SSE_RETRY_MS = 3000
+
+
+def format_event(event_id, event_type, payload):
+    """
+    Formats a Server-Sent Event.
+    Args:
+        event_id (str): Id the client sends back as Last-Event-ID when reconnecting, None for none.
+        event_type (str): Name of the event.
+        payload: JSON serializable event data.
+    Returns:
+        The event as sent on the stream.
+    """
+    lines = f"id: {event_id}\n" if event_id else ""
+    return f"{lines}event: {event_type}\ndata: {current_app.json.dumps(payload)}\n\n"
+
+
+def format_vehicle_event(event):
+    return format_event(event["id"], "vehicle", {"operation": event["operation"], "vehicle": event["vehicle"]})
+
+
+class VehicleStreamResource(Resource):
+    """
+    A class representing a Server-Sent Events stream of vehicle changes.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the VehicleStreamResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle event hub.
+        Returns:
+            None
+        """
+        self.vehicle_events = kwargs["vehicle_events"]
+
+    @tokenReq('')
+    def get(self):
+        """
+        Streams the vehicle changes the caller may see. Managers only receive the changes of their team's
+        vehicles and of unassigned vehicles, and no deletes of vehicles whose team is unknown. Changes missed
+        since Last-Event-ID are sent first. A `reset` event tells the client that changes were missed and the
+        list has to be fetched again.
+        Returns:
+            A streamed text/event-stream response.
+        """
+        principal = get_current_principal()
+        teams = {principal.id, ''} if principal.role == Roles.MANAGER.value else None
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+
+        def generate():
+            subscription, backlog = self.vehicle_events.subscribe(teams, last_event_id)
+            logging.info("User %s subscribed to vehicle changes", principal.id)
+            try:
+                yield f"retry: {SSE_RETRY_MS}\n\n"
+                for event in self.vehicle_events.replay(subscription):
+                    yield format_vehicle_event(event)
+                if subscription.missed:
+                    yield format_event(None, "reset", {})
+                for event in backlog:
+                    yield format_vehicle_event(event)
+                while not subscription.overflowed:
+                    try:
+                        event = subscription.queue.get(timeout=SSE_HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        yield ": keepalive\n\n"
+                        continue
+                    if subscription.is_new(event):
+                        yield format_vehicle_event(event)
+            finally:
+                self.vehicle_events.unsubscribe(subscription)
+                logging.info("User %s unsubscribed from vehicle changes", principal.id)
+
+        return Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE,
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,122 @@
+from flask_restful import Resource
+from flask import request, jsonify, make_response
+from flask_pymongo import ObjectId
+from datetime import datetime
+import logging
+
+from app.schemas.telemetry import create_telemetry_entity, telemetry_entity
+from app.utils.token_req import tokenReq
+from app.utils.validity_checks import is_valid_object_id
+from app.utils.get_userid_token import get_userid_token
+from app.utils.telemetry_buffer import TelemetryBusyError
+
+TELEMETRY_MAX_BATCH = 1000
+TELEMETRY_RETRY_AFTER = 1
+
+
+class VehicleTelemetryResource(Resource):
+    """
+    A class representing a RESTful API resource for the GPS telemetry of vehicles.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initializes a new instance of the VehicleTelemetryResource class.
+        Args:
+            **kwargs: Keyword arguments that contain a reference to the vehicle collection and the telemetry
+                buffer of the worker.
+        Returns:
+            None
+        """
+        self.vehicle_collection = kwargs["vehicle"]
+        self.telemetry_buffer = kwargs["telemetry_buffer"]
+
+    @tokenReq('')
+    def post(self):
+        """
+        Accepts a ping or a list of pings. Valid pings are buffered and written behind the request.
+        Returns:
+            A 202 JSON response with the number of accepted pings and the invalid ones, or 503 when the buffer
+            is full.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        headers = {}
+        user_id = get_userid_token()
+        try:
+            payload = request.get_json()
+            pings = payload if isinstance(payload, list) else [payload]
+            if len(pings) > TELEMETRY_MAX_BATCH:
+                message = f'Cannot send more than {TELEMETRY_MAX_BATCH} pings at once'
+                code = 413
+                logging.warning("User %s sent a telemetry batch of %s pings", user_id, len(pings))
+            else:
+                received_on = datetime.utcnow()
+                accepted = []
+                rejected = []
+                for index, ping in enumerate(pings):
+                    try:
+                        accepted.append(create_telemetry_entity(ping, received_on))
+                    except ValueError as ex:
+                        rejected.append({"index": index, "message": f"{ex}"})
+                if accepted:
+                    self.telemetry_buffer.add(accepted)
+                data = {"accepted": len(accepted), "rejected": rejected}
+                if accepted:
+                    message = f'Accepted {len(accepted)} of {len(pings)} pings'
+                    status = 'success'
+                    code = 202
+                else:
+                    message = 'No valid pings'
+                    code = 400
+                    logging.warning("User %s sent only invalid pings", user_id)
+        except TelemetryBusyError as ex:
+            message = f"{ex}"
+            code = 503
+            headers = {"Retry-After": str(TELEMETRY_RETRY_AFTER)}
+            logging.warning("Telemetry buffer full, rejected pings of user %s", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("User %s failed to send telemetry due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, "data": data, "status": status}), code, headers)
+
+    @tokenReq('')
+    def get(self):
+        """
+        Retrieves the latest known position of a vehicle. Positions received by this worker are served from
+        memory, other ones from the position last written to the vehicle.
+        Returns:
+            A JSON response containing the latest position of the vehicle.
+        """
+        status = 'fail'
+        code = 500
+        data = {}
+        user_id = get_userid_token()
+        try:
+            vehicle_id = request.args.get("vehicle")
+            if vehicle_id and is_valid_object_id(vehicle_id):
+                latest = self.telemetry_buffer.latest(vehicle_id)
+                if latest is None:
+                    vehicle = self.vehicle_collection.find_one({"_id": ObjectId(vehicle_id)},
+                                                               {"last_loc": 1, "last_seen": 1})
+                    if vehicle and vehicle.get("last_loc"):
+                        latest = {"vehicle": vehicle_id, "loc": vehicle["last_loc"], "ts": vehicle["last_seen"]}
+                if latest:
+                    data = telemetry_entity(latest)
+                    message = 'Successfully fetched vehicle position.'
+                    status = 'success'
+                    code = 200
+                    logging.info("User %s fetched the position of vehicle %s", user_id, vehicle_id)
+                else:
+                    message = 'Vehicle position not found'
+                    code = 404
+                    logging.warning("User %s requested position of vehicle without telemetry", user_id)
+            else:
+                message = 'Invalid vehicle id'
+                code = 400
+                logging.warning("User %s provided invalid vehicle id for position", user_id)
+        except Exception as ex:
+            message = f"{ex}"
+            logging.warning("User %s failed to fetch vehicle position due to %s", user_id, ex)
+        return make_response(jsonify({"message": message, 'data': data, "status": status}), code)
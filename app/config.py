@@ -0,0 +1,44 @@
+from pathlib import Path
+import os
+from dotenv import load_dotenv
+
+env_path = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(dotenv_path=env_path)
+
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+REACT_APP_URL = os.getenv("REACT_APP_URL")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+FLASK_DEBUG = os.getenv("FLASK_DEBUG", "") == "1"
+
+MONGO_URI = os.getenv("MONGO_URI") or \
+    f"mongodb+srv://{os.getenv('DB_USERNAME')}:{os.getenv('DB_PWD')}@{os.getenv('DB_CLUSTER')}"
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", str(max(PASSWORD_HASH_WORKERS, 1) * 4)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+LOCKOUT_BACKEND = os.getenv("LOCKOUT_BACKEND", "memory")
+LOCKOUT_MAX_ENTRIES = int(os.getenv("LOCKOUT_MAX_ENTRIES", "10000"))
+
+VEHICLE_EVENT_BUFFER = int(os.getenv("VEHICLE_EVENT_BUFFER", "1000"))
+VEHICLE_EVENT_QUEUE = int(os.getenv("VEHICLE_EVENT_QUEUE", "100"))
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+TELEMETRY_FLUSH_SIZE = int(os.getenv("TELEMETRY_FLUSH_SIZE", "500"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1"))
+TELEMETRY_MAX_PENDING = int(os.getenv("TELEMETRY_MAX_PENDING", "20000"))
+TELEMETRY_RETENTION_DAYS = int(os.getenv("TELEMETRY_RETENTION_DAYS", "30"))
@@ -1,23 +1,79 @@
-from pathlib import Path
 import os
-from pymongo import MongoClient, ASCENDING
-from dotenv import load_dotenv
-
-
-env_path = Path(__file__).resolve().parent.parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-username1 = os.getenv("DB_USERNAME")
-password2 = os.getenv("DB_PWD")
-cluster3 = os.getenv("DB_CLUSTER")
-username = os.environ.get("DB_USERNAME")
-password = os.environ.get("DB_PWD")
-cluster = os.environ.get("DB_CLUSTER")
-client = MongoClient(f"mongodb+srv://{username}:{password}@{cluster}")
-
-db = client["fleet-fortress"]
-user_collection = db["users"]
-register_codes = db["register_codes"]
-register_codes.create_index([('expire_at', ASCENDING)], expireAfterSeconds=86400)
-route_collection = db["routes"]
-vehicle_collection = db["vehicles"]
\ No newline at end of file
+import threading
+from pymongo import MongoClient
+
+from app.config import MONGO_URI, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_CONNECT_TIMEOUT_MS, \
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS, MONGO_COMPRESSORS
+
+DB_NAME = "fleet-fortress"
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the MongoClient of the current process, creating it on first use.
+    A client inherited through fork() is never reused: the child process gets its own client and pool.
+    Returns:
+        The MongoClient of the current process.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                options = {
+                    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+                    "minPoolSize": MONGO_MIN_POOL_SIZE,
+                    "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+                    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+                }
+                if MONGO_COMPRESSORS:
+                    options["compressors"] = MONGO_COMPRESSORS
+                _client = MongoClient(MONGO_URI, **options)
+                _client_pid = pid
+    return _client
+
+
+def reset_client():
+    """
+    Forgets the client of the parent process. Called from the post-fork hook of the worker processes.
+    Returns:
+        None
+    """
+    global _client, _client_pid
+    with _client_lock:
+        _client = None
+        _client_pid = None
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+class LazyCollection:
+    """
+    A stand-in for a pymongo collection that resolves the collection of the current process on every access,
+    so resources can be wired up at import time without opening a connection.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attribute):
+        return getattr(get_db()[self.name], attribute)
+
+
+user_collection = LazyCollection("users")
+register_codes = LazyCollection("register_codes")
+route_collection = LazyCollection("routes")
+vehicle_collection = LazyCollection("vehicles")
+login_attempts = LazyCollection("login_attempts")
+collection_versions = LazyCollection("collection_versions")
+record_counts = LazyCollection("record_counts")
+vehicle_history = LazyCollection("vehicle_history")
+vehicle_telemetry = LazyCollection("vehicle_telemetry")
+fleet_summary = LazyCollection("fleet_summary")
@@ -0,0 +1,57 @@
+import argparse
+import sys
+from pymongo import MongoClient
+
+from app.db import get_db, DB_NAME
+from app.db.indexes import apply_indexes, find_collection_scans
+from app.db.counts import rebuild_counts
+from app.db.history import migrate_vehicle_history
+from app.db.search_keys import backfill_search_keys
+from app.db.summary import rebuild_fleet_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.db", description="Database maintenance commands.")
+    parser.add_argument("command", choices=["migrate", "check-plans", "rebuild-counts", "migrate-history",
+                                            "backfill-search-keys", "rebuild-summary"],
+                        help="migrate: create the registered collections and indexes. "
+                             "check-plans: fail when a registered hot query runs as a collection scan. "
+                             "rebuild-counts: recompute the list total counters. "
+                             "migrate-history: move the trip history of vehicles into history buckets. "
+                             "backfill-search-keys: write the plate and route name search keys. "
+                             "rebuild-summary: recompute the fleet summary snapshot.")
+    parser.add_argument("--uri", help="Connect to this MongoDB instead of the configured cluster, "
+                                      "e.g. mongodb://localhost:27017")
+    args = parser.parse_args()
+
+    database = MongoClient(args.uri)[DB_NAME] if args.uri else get_db()
+
+    if args.command == "migrate":
+        for collection_name, index_name in apply_indexes(database):
+            print(f"{collection_name}.{index_name}")
+        return 0
+
+    if args.command == "rebuild-counts":
+        print(f"{rebuild_counts(database)} counters written")
+        return 0
+
+    if args.command == "migrate-history":
+        print(f"{migrate_vehicle_history(database)} vehicles migrated")
+        return 0
+
+    if args.command == "backfill-search-keys":
+        print(f"{backfill_search_keys(database)} documents updated")
+        return 0
+
+    if args.command == "rebuild-summary":
+        print(f"{rebuild_fleet_summary(database)} vehicles summarized")
+        return 0
+
+    scans = find_collection_scans(database)
+    for name in scans:
+        print(f"COLLSCAN: {name}")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
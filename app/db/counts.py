@@ -0,0 +1,108 @@
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+
+from app.db import record_counts
+
+ROUTES_COUNTER = "routes"
+VEHICLES_COUNTER = "vehicles"
+UNASSIGNED_VEHICLES_COUNTER = "vehicles:unassigned"
+COUNTS_REBUILT = "rebuilt"
+
+
+def team_vehicles_counter(team):
+    """
+    Returns the counter key of the vehicles assigned to a manager, or of the unassigned vehicles.
+    Args:
+        team (str): Id of the manager, empty for unassigned vehicles.
+    Returns:
+        The counter key.
+    """
+    return f"vehicles:team:{team}" if team else UNASSIGNED_VEHICLES_COUNTER
+
+
+def team_vehicles_counters(teams):
+    """
+    Builds the counters whose sum is the number of vehicles assigned to any of the given teams.
+    Args:
+        teams (list): Manager ids, empty string for unassigned vehicles.
+    Returns:
+        A dict mapping every counter key to the vehicle filter it counts.
+    """
+    return {team_vehicles_counter(team): {"current_team": team} for team in teams}
+
+
+def increment_counts(changes):
+    """
+    Applies deltas to the counters in one round trip. A missing counter is created from its delta: once the
+    counters were rebuilt, a counter is only missing while no record matches it.
+    Args:
+        changes (dict): Counter keys mapped to the delta to apply.
+    Returns:
+        None
+    """
+    operations = [UpdateOne({"_id": key}, {"$inc": {"count": delta}}, upsert=True)
+                  for key, delta in changes.items() if delta]
+    if operations:
+        record_counts.bulk_write(operations, ordered=False)
+
+
+def sum_counters(stored, counters):
+    """
+    Adds up the counters of a list filter.
+    Args:
+        stored (dict): The counters read from record_counts, with COUNTS_REBUILT, mapped to their count.
+        counters (dict): Counter keys of the list filter.
+    Returns:
+        The total, or None when the counters were never rebuilt and the records have to be counted.
+    """
+    if COUNTS_REBUILT not in stored:
+        return None
+    return sum(stored.get(key, 0) for key in counters)
+
+
+def get_total(collection, query, counters, exact=False):
+    """
+    Returns the total number of records matching a list filter without counting the collection when possible.
+    Until the counters are rebuilt, an unfiltered list reads the collection metadata count and a filtered one
+    counts its records.
+    Args:
+        collection: The listed collection.
+        query (dict): The list filter.
+        counters (dict): Counter keys, mapped to the filter each counts, whose sum equals the number of records
+            matching the query. None when the filter has no counters.
+        exact (bool): Whether to count the matching records instead of reading the counters.
+    Returns:
+        The total number of matching records.
+    """
+    if exact or counters is None:
+        return collection.count_documents(query)
+    stored = {counter["_id"]: counter["count"]
+              for counter in record_counts.find({"_id": {"$in": [COUNTS_REBUILT, *counters]}})}
+    total = sum_counters(stored, counters)
+    if total is None:
+        return collection.count_documents(query) if query else collection.estimated_document_count()
+    return total
+
+
+def rebuild_counts(database):
+    """
+    Recomputes every counter from the collections. Until it has run once, totals are counted on every request.
+    Writes made while it runs may be missed, so it should run while the API is stopped or idle.
+    Args:
+        database: The pymongo database to rebuild the counters of.
+    Returns:
+        The number of counters written.
+    """
+    counts = {
+        ROUTES_COUNTER: database["routes"].count_documents({}),
+        VEHICLES_COUNTER: database["vehicles"].count_documents({}),
+        UNASSIGNED_VEHICLES_COUNTER: 0,
+    }
+    for team in database["vehicles"].aggregate([{"$group": {"_id": "$current_team", "count": {"$sum": 1}}}]):
+        key = team_vehicles_counter(team["_id"])
+        counts[key] = counts.get(key, 0) + team["count"]
+    operations = [ReplaceOne({"_id": key}, {"count": count}, upsert=True) for key, count in counts.items()]
+    operations.append(ReplaceOne({"_id": COUNTS_REBUILT}, {"count": 0, "rebuilt_on": datetime.utcnow()}, upsert=True))
+    database["record_counts"].bulk_write(operations, ordered=False)
+    database["record_counts"].delete_many({"_id": {"$nin": [COUNTS_REBUILT, *counts]}})
+    return len(counts)
@@ -0,0 +1,61 @@
+from datetime import datetime
+from pymongo import UpdateOne
+
+from app.db import vehicle_history
+
+HISTORY_BUCKET_SIZE = 50
+
+
+def record_trip(vehicle_id, route, team, completed_on=None):
+    """
+    Appends a finished trip to the newest history bucket of a vehicle, opening a new bucket when it is full.
+    Args:
+        vehicle_id (str): Id of the vehicle.
+        route (str): Id of the route the vehicle finished.
+        team (str): Id of the manager the vehicle was assigned to.
+        completed_on (datetime): When the trip finished, now by default.
+    Returns:
+        None
+    """
+    completed_on = completed_on or datetime.now()
+    vehicle_history.update_one(
+        {"vehicle": vehicle_id, "count": {"$lt": HISTORY_BUCKET_SIZE}},
+        {"$push": {"trips": {"route": route, "team": team, "completed_on": completed_on}},
+         "$inc": {"count": 1},
+         "$min": {"first_trip": completed_on},
+         "$max": {"last_trip": completed_on}},
+        upsert=True)
+
+
+def migrate_vehicle_history(database):
+    """
+    Moves the former_routes/former_teams arrays of every vehicle into history buckets.
+    The arrays never recorded when a trip finished, so the migrated trips have no `completed_on` and are listed
+    after the dated trips, in their original order. Buckets are upserted on their vehicle and position and a
+    vehicle's arrays are only removed after its buckets were written, so the migration can be run again after a
+    failure without duplicating trips.
+    Args:
+        database: The pymongo database to migrate.
+    Returns:
+        The number of vehicles migrated.
+    """
+    migrated = 0
+    vehicles = database["vehicles"].find(
+        {"$or": [{"former_routes": {"$exists": True}}, {"former_teams": {"$exists": True}}]},
+        {"former_routes": 1, "former_teams": 1})
+    for vehicle in vehicles:
+        vehicle_id = str(vehicle["_id"])
+        routes = vehicle.get("former_routes") or []
+        teams = vehicle.get("former_teams") or []
+        trips = [{"route": route, "team": teams[index] if index < len(teams) else ''}
+                 for index, route in enumerate(routes)]
+        operations = [UpdateOne({"vehicle": vehicle_id, "legacy_bucket": number},
+                                {"$setOnInsert": {"count": len(trips[start:start + HISTORY_BUCKET_SIZE]),
+                                                  "trips": trips[start:start + HISTORY_BUCKET_SIZE]}},
+                                upsert=True)
+                      for number, start in enumerate(range(0, len(trips), HISTORY_BUCKET_SIZE))]
+        if operations:
+            database["vehicle_history"].bulk_write(operations)
+        database["vehicles"].update_one({"_id": vehicle["_id"]}, {"$unset": {"former_routes": "", "former_teams": ""}})
+        migrated += 1
+    return migrated
@@ -0,0 +1,168 @@
+from pymongo import ASCENDING, GEOSPHERE
+
+from app.config import TELEMETRY_RETENTION_DAYS
+from app.enums.roles import Roles
+
+COLLECTIONS = {
+    "vehicle_telemetry": {"timeseries": {"timeField": "ts", "metaField": "vehicle", "granularity": "seconds"},
+                          "expireAfterSeconds": TELEMETRY_RETENTION_DAYS * 86400},
+}
+
+# Indexes the API used to create when it started keep their default names, as an index cannot be created again
+# under another name.
+INDEXES = {
+    "users": [
+        {"keys": [("email", ASCENDING)], "name": "email_unique", "unique": True},
+        {"keys": [("role", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)], "name": "role_name"},
+    ],
+    "register_codes": [
+        {"keys": [("expire_at", ASCENDING)], "name": "expire_at_1", "expireAfterSeconds": 86400},
+        {"keys": [("email", ASCENDING)], "name": "email"},
+    ],
+    "login_attempts": [
+        {"keys": [("expire_at", ASCENDING)], "name": "expire_at_ttl", "expireAfterSeconds": 0},
+    ],
+    "routes": [
+        {"keys": [("name", ASCENDING), ("_id", ASCENDING)], "name": "name_1__id_1"},
+        {"keys": [("name_key", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)], "name": "name_key_name_id"},
+        {"keys": [("start_point", GEOSPHERE)], "name": "start_point_2dsphere"},
+        {"keys": [("end_point", GEOSPHERE)], "name": "end_point_2dsphere"},
+    ],
+    "vehicles": [
+        {"keys": [("vehicle_number", ASCENDING)], "name": "vehicle_number_unique", "unique": True},
+        {"keys": [("vehicle_number", ASCENDING), ("_id", ASCENDING)], "name": "vehicle_number_1__id_1"},
+        {"keys": [("current_team", ASCENDING), ("vehicle_number", ASCENDING), ("_id", ASCENDING)],
+         "name": "current_team_1_vehicle_number_1__id_1"},
+        {"keys": [("current_route", ASCENDING), ("vehicle_number", ASCENDING), ("_id", ASCENDING)],
+         "name": "current_route_vehicle_number"},
+        {"keys": [("status", ASCENDING), ("vehicle_number", ASCENDING), ("_id", ASCENDING)],
+         "name": "status_vehicle_number"},
+        {"keys": [("current_team", ASCENDING), ("status", ASCENDING), ("vehicle_number", ASCENDING),
+                  ("_id", ASCENDING)], "name": "current_team_status_vehicle_number"},
+        {"keys": [("plate_key", ASCENDING), ("_id", ASCENDING)], "name": "plate_key_id"},
+        {"keys": [("last_loc", GEOSPHERE), ("status", ASCENDING)], "name": "last_loc_2dsphere_status"},
+    ],
+    "vehicle_history": [
+        {"keys": [("vehicle", ASCENDING), ("count", ASCENDING)], "name": "vehicle_count"},
+    ],
+    "vehicle_telemetry": [
+        {"keys": [("vehicle", ASCENDING), ("ts", ASCENDING)], "name": "vehicle_ts"},
+    ],
+}
+
+# Indexes removed from the registry, dropped by apply_indexes when they exist.
+OBSOLETE_INDEXES = {
+    "vehicles": ["current_route"],
+}
+
+HOT_QUERIES = [
+    {"name": "login/register user lookup", "collection": "users", "filter": {"email": "user@example.com"}},
+    {"name": "manager roster", "collection": "users", "filter": {"role": Roles.MANAGER.value},
+     "sort": [("name", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "manager roster vehicles", "collection": "vehicles",
+     "filter": {"current_team": "000000000000000000000000"}},
+    {"name": "manager route statuses", "collection": "vehicles",
+     "filter": {"status": {"$in": ["STARTED", "ON_THE_WAY", "ON_DESTINATION"]}, "current_team": {"$nin": ["", None]}}},
+    {"name": "register code lookup", "collection": "register_codes", "filter": {"email": "user@example.com"}},
+    {"name": "route page", "collection": "routes", "filter": {},
+     "sort": [("name", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "vehicle page", "collection": "vehicles", "filter": {},
+     "sort": [("vehicle_number", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "manager vehicle page", "collection": "vehicles",
+     "filter": {"current_team": {"$in": ["000000000000000000000000", ""]}},
+     "sort": [("vehicle_number", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "vehicles on route", "collection": "vehicles", "filter": {"current_route": "000000000000000000000000"}},
+    {"name": "vehicle trip history", "collection": "vehicle_history",
+     "filter": {"vehicle": "000000000000000000000000"}},
+    {"name": "vehicle duplicate check", "collection": "vehicles", "filter": {"vehicle_number": "AB12 CDE"}},
+    {"name": "vehicle plate search", "collection": "vehicles", "filter": {"plate_key": {"$regex": "^AB12"}}},
+    {"name": "vehicles by status", "collection": "vehicles", "filter": {"status": "ON_THE_WAY"},
+     "sort": [("vehicle_number", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "manager vehicles by status", "collection": "vehicles",
+     "filter": {"current_team": {"$in": ["000000000000000000000000", ""]}, "status": "ON_THE_WAY"},
+     "sort": [("vehicle_number", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "route name search", "collection": "routes", "filter": {"name_key": {"$regex": "^north"}}},
+    {"name": "routes near a point", "collection": "routes",
+     "filter": {"start_point": {"$near": {"$geometry": {"type": "Point", "coordinates": [0, 51.5]}}}}},
+    {"name": "idle vehicles near a point", "collection": "vehicles",
+     "filter": {"last_loc": {"$near": {"$geometry": {"type": "Point", "coordinates": [0, 51.5]}}},
+                "status": "NOT_STARTED"}},
+]
+
+
+def create_collections(database):
+    """
+    Creates the collections that need options, such as time-series collections. Existing collections are left
+    untouched.
+    Args:
+        database: The pymongo database to migrate.
+    Returns:
+        A list with the names of the collections created.
+    """
+    existing = set(database.list_collection_names())
+    created = []
+    for collection_name, options in COLLECTIONS.items():
+        if collection_name not in existing:
+            database.create_collection(collection_name, **options)
+            created.append(collection_name)
+    return created
+
+
+def apply_indexes(database):
+    """
+    Creates the registered collections and every index of the registry, and drops the obsolete indexes.
+    Existing indexes with the same definition are left untouched.
+    Args:
+        database: The pymongo database to migrate.
+    Returns:
+        A list of (collection name, index name) tuples that were applied.
+    """
+    create_collections(database)
+    applied = []
+    for collection_name, indexes in INDEXES.items():
+        for index in indexes:
+            options = {key: value for key, value in index.items() if key != "keys"}
+            database[collection_name].create_index(index["keys"], **options)
+            applied.append((collection_name, index["name"]))
+    for collection_name, index_names in OBSOLETE_INDEXES.items():
+        existing = database[collection_name].index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                database[collection_name].drop_index(index_name)
+    return applied
+
+
+def has_collection_scan(plan):
+    """
+    Checks whether a query plan, or any of its input stages, is a collection scan.
+    Args:
+        plan: The winning plan returned by explain().
+    Returns:
+        Boolean indicating whether the plan contains a COLLSCAN stage.
+    """
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(has_collection_scan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(has_collection_scan(value) for value in plan)
+    return False
+
+
+def find_collection_scans(database):
+    """
+    Runs explain() on every registered hot query.
+    Args:
+        database: The pymongo database to check.
+    Returns:
+        A list with the names of the hot queries whose winning plan is a collection scan.
+    """
+    scans = []
+    for query in HOT_QUERIES:
+        cursor = database[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if has_collection_scan(winning_plan):
+            scans.append(query["name"])
+    return scans
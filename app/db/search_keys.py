@@ -0,0 +1,31 @@
+from pymongo import UpdateOne
+
+from app.utils.search import normalize_plate, normalize_name
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _backfill(collection, source, key, normalize):
+    written = 0
+    operations = []
+    for document in collection.find({key: {"$exists": False}, source: {"$type": "string"}}, {source: 1}):
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {key: normalize(document[source])}}))
+        if len(operations) == BACKFILL_BATCH_SIZE:
+            written += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        written += collection.bulk_write(operations, ordered=False).modified_count
+    return written
+
+
+def backfill_search_keys(database):
+    """
+    Writes the normalized search keys, plate_key on vehicles and name_key on routes, of the documents created
+    before they existed. Documents that already have their key are skipped, so it can be run again.
+    Args:
+        database: The pymongo database to migrate.
+    Returns:
+        The number of documents updated.
+    """
+    return _backfill(database["vehicles"], "vehicle_number", "plate_key", normalize_plate) + \
+        _backfill(database["routes"], "name", "name_key", normalize_name)
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from app.db import fleet_summary, vehicle_collection
+
+SUMMARY_ID = "fleet"
+UNASSIGNED_KEY = "unassigned"
+NO_ROUTE_KEY = "none"
+
+
+def _team_key(team):
+    return team or UNASSIGNED_KEY
+
+
+def _route_key(route):
+    return route or NO_ROUTE_KEY
+
+
+def fleet_summary_pipeline():
+    """
+    Builds the aggregation pipeline computing the fleet summary in one pass over the vehicles.
+    Returns:
+        A list of aggregation stages emitting one document with the snapshot fields.
+    """
+    return [
+        {"$facet": {
+            "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "by_team": [{"$group": {"_id": "$current_team", "count": {"$sum": 1}}}],
+            "by_route": [{"$group": {"_id": "$current_route", "count": {"$sum": 1}}}],
+            "total": [{"$count": "count"}],
+        }}
+    ]
+
+
+def compute_fleet_summary(collection):
+    """
+    Computes the fleet summary from the vehicles.
+    Args:
+        collection: The vehicles collection.
+    Returns:
+        The summary document, without its id.
+    """
+    result = next(collection.aggregate(fleet_summary_pipeline()))
+    summary = {"by_status": {}, "by_team": {}, "by_route": {}, "total": 0}
+    for group in result["by_status"]:
+        if group["_id"]:
+            summary["by_status"][group["_id"]] = group["count"]
+    for group in result["by_team"]:
+        key = _team_key(group["_id"])
+        summary["by_team"][key] = summary["by_team"].get(key, 0) + group["count"]
+    for group in result["by_route"]:
+        key = _route_key(group["_id"])
+        summary["by_route"][key] = summary["by_route"].get(key, 0) + group["count"]
+    if result["total"]:
+        summary["total"] = result["total"][0]["count"]
+    return summary
+
+
+def get_fleet_summary(exact=False):
+    """
+    Returns the fleet summary from the snapshot document. Until rebuild_fleet_summary has written the snapshot,
+    the summary is computed from the vehicles on every call.
+    Args:
+        exact (bool): Whether to compute the summary from the vehicles instead of reading the snapshot.
+    Returns:
+        The summary document, without its id.
+    """
+    if not exact:
+        snapshot = fleet_summary.find_one({"_id": SUMMARY_ID, "rebuilt_on": {"$exists": True}},
+                                          {"_id": 0, "rebuilt_on": 0})
+        if snapshot:
+            return snapshot
+    return compute_fleet_summary(vehicle_collection)
+
+
+def summary_changes(before, after):
+    """
+    Computes the snapshot deltas of a vehicle write.
+    Args:
+        before (dict): The vehicle before the write, None when it was created.
+        after (dict): The vehicle after the write, None when it was deleted.
+    Returns:
+        A dict mapping snapshot field paths to the delta to apply.
+    """
+    changes = {}
+    for vehicle, delta in ((before, -1), (after, 1)):
+        if vehicle is None:
+            continue
+        for path in (f"by_status.{vehicle.get('status')}", f"by_team.{_team_key(vehicle.get('current_team'))}",
+                     f"by_route.{_route_key(vehicle.get('current_route'))}", "total"):
+            changes[path] = changes.get(path, 0) + delta
+    return {path: delta for path, delta in changes.items() if delta}
+
+
+def update_fleet_summary(*changes):
+    """
+    Applies snapshot deltas in one round trip. A missing snapshot is created from the deltas; it is only read
+    once rebuild_fleet_summary has overwritten it.
+    Args:
+        *changes (dict): Deltas returned by summary_changes.
+    Returns:
+        None
+    """
+    merged = {}
+    for change in changes:
+        for path, delta in change.items():
+            merged[path] = merged.get(path, 0) + delta
+    merged = {path: delta for path, delta in merged.items() if delta}
+    if merged:
+        fleet_summary.update_one({"_id": SUMMARY_ID}, {"$inc": merged}, upsert=True)
+
+
+def rebuild_fleet_summary(database):
+    """
+    Recomputes the snapshot document from the vehicles. Writes made while it runs may be missed, so it should run
+    while the API is stopped or idle.
+    Args:
+        database: The pymongo database to rebuild the snapshot of.
+    Returns:
+        The number of vehicles summarized.
+    """
+    summary = compute_fleet_summary(database["vehicles"])
+    database["fleet_summary"].replace_one({"_id": SUMMARY_ID}, {**summary, "rebuilt_on": datetime.utcnow()},
+                                          upsert=True)
+    return summary["total"]
@@ -0,0 +1,34 @@
+from pymongo import UpdateOne
+
+from app.db import collection_versions
+
+ROUTES = "routes"
+VEHICLES = "vehicles"
+USERS = "users"
+
+
+def bump_versions(*collection_names):
+    """
+    Increments the version counter of collections after a write, invalidating the ETags built from them.
+    Args:
+        *collection_names (str): Names of the collections that were modified.
+    Returns:
+        None
+    """
+    collection_versions.bulk_write(
+        [UpdateOne({"_id": name}, {"$inc": {"version": 1}}, upsert=True) for name in collection_names],
+        ordered=False)
+
+
+def get_versions(collection_names):
+    """
+    Reads the version counters of collections in one query.
+    Args:
+        collection_names (list): Names of the collections.
+    Returns:
+        A dict mapping every collection name to its version, 0 for collections never written to.
+    """
+    versions = {name: 0 for name in collection_names}
+    for counter in collection_versions.find({"_id": {"$in": list(collection_names)}}):
+        versions[counter["_id"]] = counter["version"]
+    return versions
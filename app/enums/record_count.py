@@ -5,3 +5,4 @@ class RecordCount(Enum):
     ROUTE = 10
     VEHICLE = 10
     MANAGERS = 10
+    HISTORY = 10
@@ -0,0 +1,37 @@
+def trip_history_pipeline(vehicle_id, skip, limit):
+    """
+    Builds the aggregation pipeline for a page of finished trips of a vehicle, newest first. Trips migrated from
+    the former arrays have no completion time and come last.
+    Args:
+        vehicle_id (str): Id of the vehicle.
+        skip (int): Number of trips to skip.
+        limit (int): Maximum number of trips to return.
+    Returns:
+        A list of aggregation stages.
+    """
+    pipeline = [
+        {"$match": {"vehicle": vehicle_id}},
+        {"$unwind": {"path": "$trips", "includeArrayIndex": "position"}},
+        {"$sort": {"trips.completed_on": -1, "_id": -1, "position": -1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    return pipeline + [
+        {"$limit": limit},
+        {"$project": {"_id": 0, "route": "$trips.route", "team": "$trips.team",
+                      "completed_on": "$trips.completed_on"}}
+    ]
+
+
+def trip_count_pipeline(vehicle_id):
+    """
+    Builds the aggregation pipeline counting the finished trips of a vehicle from its bucket sizes.
+    Args:
+        vehicle_id (str): Id of the vehicle.
+    Returns:
+        A list of aggregation stages.
+    """
+    return [
+        {"$match": {"vehicle": vehicle_id}},
+        {"$group": {"_id": None, "total": {"$sum": "$count"}}}
+    ]
@@ -1,24 +1,109 @@
-from flask_pymongo import ObjectId
+from bson import ObjectId
 
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from app.schemas.serializer import compile_serializer
+from app.schemas.vehicles import vehicle_projection
 
-def manager_entity(manager_info):
-    formatted_entity = {
-        "id": str(ObjectId(manager_info["_id"])),
-        "name": manager_info["name"],
-        "email": manager_info["email"],
-        "created_on": manager_info["created_on"]
+MANAGER_SORT_KEY = "name"
+MANAGER_FIELDS = ["id", "name", "email", "created_on", "assigned_vehicles", "current_route"]
+ACTIVE_ROUTE_STATUSES = [status.name for status in VehicleRouteStatus if status is not VehicleRouteStatus.NOT_STARTED]
+
+
+manager_entity = compile_serializer([
+    ("id", "_id", str),
+    ("name", "name", None),
+    ("email", "email", None),
+    ("created_on", "created_on", None),
+    ("assigned_vehicles", "assigned_vehicles", None),
+    ("current_route", "current_route", None),
+    ("current_vehicle", "current_vehicle", None),
+], required=("_id", "name", "email", "created_on"))
+
+
+def manager_list_entity(manager_list, fields=None):
+    return [manager_entity(manager, fields) for manager in manager_list]
+
+
+def team_route_status_pipeline():
+    """
+    Builds the aggregation pipeline, run on the vehicles collection, giving the current route status of every
+    manager with a vehicle out of the depot. As in the roster, it is the status of the manager's last such vehicle.
+    Only the vehicles out of the depot are read, through the status index.
+    Returns:
+        A list of aggregation stages emitting one `{_id: manager id, status: status name}` document per manager.
+    """
+    return [
+        {"$match": {"status": {"$in": ACTIVE_ROUTE_STATUSES}, "current_team": {"$nin": ["", None]}}},
+        {"$group": {"_id": "$current_team", "status": {"$last": "$status"}}},
+    ]
+
+
+def route_status_query(manager_query, route_status, team_statuses):
+    """
+    Restricts a manager filter to the managers whose current route status matches.
+    Managers without a vehicle out of the depot have the status NOT_STARTED.
+    Args:
+        manager_query (dict): Filter applied to the users collection.
+        route_status (str): VehicleRouteStatus name to match.
+        team_statuses (iterable): Documents returned by team_route_status_pipeline.
+    Returns:
+        The filter for the users collection.
+    """
+    statuses = {team["_id"]: team["status"] for team in team_statuses if ObjectId.is_valid(team["_id"])}
+    if route_status == VehicleRouteStatus.NOT_STARTED.name:
+        ids = {"$nin": [ObjectId(team) for team in statuses]}
+    else:
+        ids = {"$in": [ObjectId(team) for team, status in statuses.items() if status == route_status]}
+    return {"$and": [manager_query, {"_id": ids}]}
+
+
+def manager_roster_pipeline(manager_query, skip, limit, fields=None):
+    """
+    Builds the aggregation pipeline for a page of managers with their assigned vehicles.
+    The projection emits the same keys as manager_entity. `current_route` is taken from the last assigned
+    vehicle that is not at the depot, as the roster always did. The vehicles are only looked up for the managers
+    of the page; to filter by route status, restrict the query with route_status_query first.
+    Args:
+        manager_query (dict): Filter applied to the users collection.
+        skip (int): Number of managers to skip.
+        limit (int): Maximum number of managers to return, None to return every matching manager.
+        fields (list): Fields to emit, None for every field. Vehicles are only looked up when a vehicle field
+            is requested.
+    Returns:
+        A list of aggregation stages.
+    """
+    pipeline = [
+        {"$match": manager_query},
+        {"$sort": {MANAGER_SORT_KEY: 1, "_id": 1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    projection = {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        "name": 1,
+        "email": 1,
+        "created_on": 1,
+        "assigned_vehicles": 1,
+        "current_route": {"$arrayElemAt": ["$active_vehicles.current_route", -1]}
     }
-    if "assigned_vehicles" in manager_info:
-        formatted_entity.update({"assigned_vehicles": manager_info["assigned_vehicles"]})
-    if 'current_route' in manager_info:
-        formatted_entity.update({"current_route": manager_info["current_route"]})
-    if "current_vehicle" in manager_info:
-        formatted_entity.update({"current_vehicle": manager_info["current_vehicle"]})
-    return formatted_entity
-
-
-def manager_list_entity(manager_list):
-    formatted_list = []
-    for manager in manager_list:
-        formatted_list.append(manager_entity(manager))
-    return formatted_list
+    if fields is not None:
+        projection = {key: value for key, value in projection.items() if key == "_id" or key in fields}
+        if "assigned_vehicles" not in fields and "current_route" not in fields:
+            return pipeline + [{"$project": projection}]
+    return pipeline + [
+        {"$lookup": {
+            "from": "vehicles",
+            "let": {"manager_id": {"$toString": "$_id"}},
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$current_team", "$$manager_id"]}}},
+                         {"$project": vehicle_projection()}],
+            "as": "assigned_vehicles"
+        }},
+        {"$addFields": {"active_vehicles": {"$filter": {
+            "input": "$assigned_vehicles", "as": "vehicle",
+            "cond": {"$ne": ["$$vehicle.status", VehicleRouteStatus.NOT_STARTED.value]}
+        }}}},
+        {"$project": projection},
+    ]
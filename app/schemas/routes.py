@@ -1,15 +1,20 @@
-from flask_pymongo import ObjectId
+from app.schemas.serializer import compile_serializer
+from app.utils.geo import geo_near_stages
 
+ROUTE_SORT_KEY = "name"
+ROUTE_FIELDS = ["id", "name", "start_loc", "end_loc", "start_point", "end_point", "created_on"]
+ROUTE_POINT_FIELDS = ("start_point", "end_point")
 
-def route_entity(route_info):
-    formatted_entity = {
-        "id": str(ObjectId(route_info["_id"])),
-        "name": route_info["name"],
-        "start_loc": route_info["start_loc"],
-        "end_loc": route_info["end_loc"],
-        "created_on": route_info["created_on"]
-    }
-    return formatted_entity
+
+route_entity = compile_serializer([
+    ("id", "_id", str),
+    ("name", "name", None),
+    ("start_loc", "start_loc", None),
+    ("end_loc", "end_loc", None),
+    ("start_point", "start_point", None),
+    ("end_point", "end_point", None),
+    ("created_on", "created_on", None),
+], required=("_id", "name", "start_loc", "end_loc", "created_on"))
 
 
 def create_route_entity(route_info):
@@ -19,11 +24,39 @@ def create_route_entity(route_info):
         "end_loc": route_info["end_loc"],
         "created_on": route_info["created_on"]
     }
+    if "name_key" in route_info:
+        formatted_entity.update({"name_key": route_info["name_key"]})
+    for key in ROUTE_POINT_FIELDS:
+        if route_info.get(key):
+            formatted_entity.update({key: route_info[key]})
     return formatted_entity
 
 
-def route_list_entity(route_list):
-    formatted_list = []
-    for route in route_list:
-        formatted_list.append(route_entity(route))
-    return formatted_list
+def route_list_entity(route_list, fields=None):
+    return [route_entity(route, fields) for route in route_list]
+
+
+def nearby_routes_pipeline(point, key, limit, max_distance=None):
+    """
+    Builds the aggregation pipeline for the routes starting or ending closest to a point.
+    Args:
+        point (dict): GeoJSON point to search around.
+        key (str): `start_point` or `end_point`.
+        limit (int): Maximum number of routes to return.
+        max_distance (float): Optional maximum distance in meters.
+    Returns:
+        A list of aggregation stages emitting the keys of route_entity and the distance in meters.
+    """
+    return geo_near_stages(point, key, limit, max_distance) + [
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "name": 1,
+            "start_loc": 1,
+            "end_loc": 1,
+            "start_point": 1,
+            "end_point": 1,
+            "created_on": 1,
+            "distance": 1
+        }}
+    ]
@@ -0,0 +1,45 @@
+def compile_serializer(spec, required=()):
+    """
+    Compiles a schema into a function formatting documents of that schema.
+    The spec is resolved once, so formatting a document only copies the keys it holds.
+    Args:
+        spec (list): (output key, source key, converter) tuples, in output order. The source key may be a tuple
+            of keys to read a nested value. The converter is None when the value is copied as is.
+            A later entry with the same output key overrides an earlier one, and source keys missing from
+            the document are skipped.
+        required (tuple): Source keys a document must hold when it is formatted with every field. A missing one
+            raises KeyError, as the hand-written entity functions did.
+    Returns:
+        A function taking a document and an optional list of output fields to restrict the result to.
+    """
+    entries = tuple((output, source, convert) for output, source, convert in spec if not isinstance(source, tuple))
+    nested_entries = tuple((output, source, convert) for output, source, convert in spec if isinstance(source, tuple))
+    entries_by_field = {}
+    for output, source, convert in spec:
+        entries_by_field.setdefault(output, []).append((output, source, convert))
+
+    def serialize(document, fields=None):
+        if fields is None:
+            for source in required:
+                if source not in document:
+                    raise KeyError(source)
+            flat, nested = entries, nested_entries
+        else:
+            selected = [entry for field in fields for entry in entries_by_field.get(field, ())]
+            flat = [entry for entry in selected if not isinstance(entry[1], tuple)]
+            nested = [entry for entry in selected if isinstance(entry[1], tuple)]
+        formatted = {}
+        for output, source, convert in flat:
+            if source in document:
+                formatted[output] = convert(document[source]) if convert else document[source]
+        for output, source, convert in nested:
+            value = document
+            for key in source:
+                if key not in value:
+                    break
+                value = value[key]
+            else:
+                formatted[output] = convert(value) if convert else value
+        return formatted
+
+    return serialize
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from app.utils.validity_checks import is_valid_object_id
+
+
+def create_telemetry_entity(ping, received_on):
+    """
+    Validates a GPS ping and builds the document stored in the time-series collection.
+    Args:
+        ping (dict): The ping sent by the client, with `vehicle`, `lat`, `lng` and optionally `ts` (epoch seconds),
+            `speed` and `heading`.
+        received_on (datetime): UTC time the ping was received, used when it has no timestamp.
+    Returns:
+        The telemetry document.
+    Raises:
+        ValueError: If the ping is invalid.
+    """
+    if not isinstance(ping, dict):
+        raise ValueError("Ping must be an object")
+    if not isinstance(ping.get("vehicle"), str) or not is_valid_object_id(ping["vehicle"]):
+        raise ValueError("Invalid vehicle id")
+    lat = ping.get("lat")
+    lng = ping.get("lng")
+    if not isinstance(lat, (int, float)) or isinstance(lat, bool) or not -90 <= lat <= 90:
+        raise ValueError("Invalid latitude")
+    if not isinstance(lng, (int, float)) or isinstance(lng, bool) or not -180 <= lng <= 180:
+        raise ValueError("Invalid longitude")
+    telemetry = {"vehicle": ping["vehicle"], "ts": received_on,
+                 "loc": {"type": "Point", "coordinates": [float(lng), float(lat)]}}
+    if "ts" in ping:
+        if not isinstance(ping["ts"], (int, float)) or isinstance(ping["ts"], bool):
+            raise ValueError("Invalid timestamp")
+        try:
+            telemetry["ts"] = datetime.utcfromtimestamp(ping["ts"])
+        except (OverflowError, OSError, ValueError):
+            raise ValueError("Invalid timestamp")
+    for key in ("speed", "heading"):
+        if key in ping:
+            if not isinstance(ping[key], (int, float)) or isinstance(ping[key], bool):
+                raise ValueError(f"Invalid {key}")
+            telemetry[key] = float(ping[key])
+    return telemetry
+
+
+def telemetry_entity(telemetry):
+    formatted_entity = {
+        "vehicle": telemetry["vehicle"],
+        "lng": telemetry["loc"]["coordinates"][0],
+        "lat": telemetry["loc"]["coordinates"][1],
+        "ts": telemetry["ts"]
+    }
+    for key in ("speed", "heading"):
+        if key in telemetry:
+            formatted_entity.update({key: telemetry[key]})
+    return formatted_entity
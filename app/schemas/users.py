@@ -1,4 +1,6 @@
-from flask_pymongo import ObjectId
+from app.schemas.serializer import compile_serializer
+
+USER_FIELDS = ["id", "name", "email", "role", "created_on"]
 
 
 def create_user_entity(user_data):
@@ -13,12 +15,11 @@ def create_user_entity(user_data):
     return user
 
 
-def user_entity(user_data):
-    return {
-        "id": str(ObjectId(user_data["_id"])),
-        "name": user_data["name"],
-        "email": user_data["email"],
-        "role": user_data["role"],
-        "created_on": user_data["created_on"]
-    }
+user_entity = compile_serializer([
+    ("id", "_id", str),
+    ("name", "name", None),
+    ("email", "email", None),
+    ("role", "role", None),
+    ("created_on", "created_on", None),
+], required=("_id", "name", "email", "role", "created_on"))
 
@@ -1,55 +1,154 @@
 from app.enums.vehicle_route_status import VehicleRouteStatus
-from flask_pymongo import ObjectId
-
-
-def vehicle_entity(vehicle_info):
-    formatted_entity = {}
-    if "_id" in vehicle_info:
-        formatted_entity.update({"id": str(ObjectId(vehicle_info["_id"]))})
-    if "vehicle_number" in vehicle_info:
-        formatted_entity.update({"vehicle_number": vehicle_info["vehicle_number"]})
-    if "current_team" in vehicle_info:
-        formatted_entity.update({"current_team": vehicle_info["current_team"]})
-    if "former_teams" in vehicle_info:
-        formatted_entity.update({"former_teams": vehicle_info["former_teams"], })
-    if "status" in vehicle_info:
-        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status"]].value})
-    if "status_name" in vehicle_info:
-        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status_name"]].name})
-    if "created_on" in vehicle_info:
-        formatted_entity.update({"created_on": vehicle_info["created_on"]})
-    if "current_route" in vehicle_info:
-        formatted_entity.update({"current_route": vehicle_info["current_route"]})
-    if "former_routes" in vehicle_info:
-        formatted_entity.update({"former_routes": vehicle_info["former_routes"]})
-    if "manager_info" in vehicle_info and "name" in vehicle_info["manager_info"]:
-        formatted_entity.update({"current_team_name": vehicle_info["manager_info"]["name"]})
-    if 'route_info' in vehicle_info and "name" in vehicle_info["route_info"]:
-        formatted_entity.update({"current_route_name": vehicle_info["route_info"]["name"]})
-    return formatted_entity
-
-
-def create_vehicle_entity(vehicle_info):
-    formatted_entity = {}
-    if "vehicle_number" in vehicle_info:
-        formatted_entity.update({"vehicle_number": vehicle_info["vehicle_number"]})
-    if "current_team" in vehicle_info:
-        formatted_entity.update({"current_team": vehicle_info["current_team"]})
-    if "former_teams" in vehicle_info:
-        formatted_entity.update({"former_teams": vehicle_info["former_teams"], })
-    if "status" in vehicle_info:
-        formatted_entity.update({"status": vehicle_info["status"]})
-    if "created_on" in vehicle_info:
-        formatted_entity.update({"created_on": vehicle_info["created_on"]})
-    if "current_route" in vehicle_info:
-        formatted_entity.update({"current_route": vehicle_info["current_route"]})
-    if "former_routes" in vehicle_info:
-        formatted_entity.update({"former_routes": vehicle_info["former_routes"]})
-    return formatted_entity
-
-
-def vehicle_list_entity(vehicle_list):
-    formatted_list = []
-    for vehicle in vehicle_list:
-        formatted_list.append(vehicle_entity(vehicle))
-    return formatted_list
+from app.schemas.serializer import compile_serializer
+from app.utils.geo import geo_near_stages
+
+VEHICLE_SORT_KEY = "vehicle_number"
+VEHICLE_FIELDS = ["id", "vehicle_number", "current_team", "status", "created_on", "current_route", "version",
+                  "current_team_name", "current_route_name"]
+VEHICLE_JOINED_FIELDS = ("current_team_name", "current_route_name")
+STATUS_VALUES = {status.name: status.value for status in VehicleRouteStatus}
+STATUS_NAMES = {status.name: status.name for status in VehicleRouteStatus}
+# Markers of the bulk assignments being applied, removed once the request has read back its writes.
+BULK_WRITES_FIELD = "bulk_writes"
+
+vehicle_entity = compile_serializer([
+    ("id", "_id", str),
+    ("vehicle_number", "vehicle_number", None),
+    ("current_team", "current_team", None),
+    ("status", "status", STATUS_VALUES.__getitem__),
+    ("status", "status_name", STATUS_NAMES.__getitem__),
+    ("created_on", "created_on", None),
+    ("current_route", "current_route", None),
+    ("version", "version", None),
+    ("current_team_name", ("manager_info", "name"), None),
+    ("current_route_name", ("route_info", "name"), None),
+])
+
+create_vehicle_entity = compile_serializer([
+    ("vehicle_number", "vehicle_number", None),
+    ("plate_key", "plate_key", None),
+    ("current_team", "current_team", None),
+    ("status", "status", None),
+    ("created_on", "created_on", None),
+    ("current_route", "current_route", None),
+    ("version", "version", None),
+])
+
+
+def vehicle_list_entity(vehicle_list, fields=None):
+    return [vehicle_entity(vehicle, fields) for vehicle in vehicle_list]
+
+
+def vehicle_status_value_expr(field="$status"):
+    """
+    Builds an aggregation expression mapping a stored status name to its VehicleRouteStatus value.
+    Args:
+        field (str): Field path holding the status name.
+    Returns:
+        A $switch expression that mirrors the status conversion done in vehicle_entity.
+    """
+    return {
+        "$switch": {
+            "branches": [{"case": {"$eq": [field, status.name]}, "then": status.value}
+                         for status in VehicleRouteStatus],
+            "default": "$$REMOVE"
+        }
+    }
+
+
+def vehicle_projection(fields=None):
+    """
+    Builds the $project stage body emitting the same keys as vehicle_entity for a stored vehicle.
+    Args:
+        fields (list): Fields to emit, None for every field.
+    Returns:
+        A projection document.
+    """
+    projection = {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        "vehicle_number": 1,
+        "current_team": 1,
+        "status": vehicle_status_value_expr(),
+        "created_on": 1,
+        "current_route": 1,
+        "version": 1
+    }
+    if fields is not None:
+        projection = {key: value for key, value in projection.items() if key == "_id" or key in fields}
+    return projection
+
+
+def vehicle_list_pipeline(vehicle_query, skip, limit, fields=None):
+    """
+    Builds the aggregation pipeline for a page of vehicles together with their route and manager names.
+    The projection emits the same keys as vehicle_entity so the result can be returned as is.
+    Args:
+        vehicle_query (dict): Filter applied to the vehicles collection.
+        skip (int): Number of vehicles to skip, 0 when paging with a cursor.
+        limit (int): Maximum number of vehicles to return, None to return every matching vehicle.
+        fields (list): Fields to emit, None for every field. Route and manager names are only looked up
+            when requested.
+    Returns:
+        A list of aggregation stages.
+    """
+    pipeline = [
+        {"$match": vehicle_query},
+        {"$sort": {VEHICLE_SORT_KEY: 1, "_id": 1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    projection = vehicle_projection(fields)
+    if fields is None or "current_route_name" in fields:
+        pipeline.append({"$lookup": {
+            "from": "routes",
+            "let": {"route_id": {"$convert": {"input": "$current_route", "to": "objectId",
+                                              "onError": None, "onNull": None}}},
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$route_id"]}}}, {"$project": {"_id": 0, "name": 1}}],
+            "as": "route_info"
+        }})
+        projection["current_route_name"] = {"$arrayElemAt": ["$route_info.name", 0]}
+    if fields is None or "current_team_name" in fields:
+        pipeline.append({"$lookup": {
+            "from": "users",
+            "let": {"manager_id": {"$convert": {"input": "$current_team", "to": "objectId",
+                                                "onError": None, "onNull": None}}},
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$manager_id"]}}}, {"$project": {"_id": 0, "name": 1}}],
+            "as": "manager_info"
+        }})
+        projection["current_team_name"] = {"$arrayElemAt": ["$manager_info.name", 0]}
+    return pipeline + [{"$project": projection}]
+
+
+def vehicle_version_query(version):
+    """
+    Builds the filter guarding an update on the version the client last read.
+    Vehicles created before versioning have no version field and count as version 0.
+    Args:
+        version (int): Version sent by the client.
+    Returns:
+        A filter on the version field.
+    """
+    if not version:
+        return {"version": {"$in": [0, None]}}
+    return {"version": version}
+
+
+def nearest_vehicles_pipeline(point, limit, max_distance=None):
+    """
+    Builds the aggregation pipeline for the vehicles at the depot closest to a point, by their last known
+    position.
+    Args:
+        point (dict): GeoJSON point to search around.
+        limit (int): Maximum number of vehicles to return.
+        max_distance (float): Optional maximum distance in meters.
+    Returns:
+        A list of aggregation stages emitting the keys of vehicle_entity, the last known position and the distance
+        in meters.
+    """
+    return geo_near_stages(point, "last_loc", limit, max_distance,
+                           {"status": VehicleRouteStatus.NOT_STARTED.name}) + [
+        {"$project": dict(vehicle_projection(), last_loc=1, last_seen=1, distance=1)}
+    ]
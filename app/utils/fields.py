@@ -0,0 +1,82 @@
+from flask import request
+
+
+def get_requested_fields(allowed_fields):
+    """
+    Reads the `fields` query parameter, a comma separated list of the response fields the client needs.
+    Args:
+        allowed_fields (list): Fields of the schema a client may select.
+    Returns:
+        The list of requested fields, or None when the parameter is absent.
+    Raises:
+        ValueError: If a requested field is not part of the schema.
+    """
+    return parse_requested_fields(request.args.get("fields"), allowed_fields)
+
+
+def parse_requested_fields(fields_arg, allowed_fields):
+    """
+    Parses a `fields` query parameter.
+    Args:
+        fields_arg (str): The parameter value, None when absent.
+        allowed_fields (list): Fields of the schema a client may select.
+    Returns:
+        The list of requested fields, or None when the parameter is absent.
+    Raises:
+        ValueError: If a requested field is not part of the schema.
+    """
+    if fields_arg is None:
+        return None
+    fields = []
+    for field in fields_arg.split(","):
+        field = field.strip()
+        if field and field not in fields:
+            fields.append(field)
+    invalid_fields = [field for field in fields if field not in allowed_fields]
+    if not fields or invalid_fields:
+        raise ValueError(f"Invalid fields: {', '.join(invalid_fields) or fields_arg}")
+    return fields
+
+
+def find_projection(fields, computed_fields=()):
+    """
+    Builds the find() projection fetching only what is needed for the requested fields.
+    Args:
+        fields (list): Requested fields, None for every field.
+        computed_fields (tuple): Requested fields that are not stored on the document.
+    Returns:
+        A projection document, or None to fetch whole documents.
+    """
+    if fields is None:
+        return None
+    projection = {field: 1 for field in fields if field != "id" and field not in computed_fields}
+    projection["_id"] = 1 if "id" in fields else 0
+    return projection
+
+
+def select_fields(entity, fields):
+    """
+    Keeps only the requested fields of a formatted entity.
+    Args:
+        entity (dict): The formatted entity.
+        fields (list): Requested fields, None for every field.
+    Returns:
+        The entity restricted to the requested fields.
+    """
+    if fields is None:
+        return entity
+    return {field: entity[field] for field in fields if field in entity}
+
+
+def with_cursor_fields(fields, sort_key):
+    """
+    Adds the fields a keyset cursor is built from to the requested fields.
+    Args:
+        fields (list): Requested fields, None for every field.
+        sort_key (str): Field the records are ordered by.
+    Returns:
+        The fields to fetch so the next page cursor can be computed.
+    """
+    if fields is None:
+        return None
+    return fields + [field for field in ("id", sort_key) if field not in fields]
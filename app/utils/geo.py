@@ -0,0 +1,108 @@
+DEFAULT_NEAR_RESULTS = 10
+MAX_NEAR_RESULTS = 100
+
+
+def geo_point(lng, lat):
+    """
+    Builds a GeoJSON point.
+    Args:
+        lng (float): Longitude, between -180 and 180.
+        lat (float): Latitude, between -90 and 90.
+    Returns:
+        A GeoJSON Point.
+    Raises:
+        ValueError: If a coordinate is not a number or is out of range.
+    """
+    if isinstance(lng, bool) or isinstance(lat, bool) or not isinstance(lng, (int, float)) \
+            or not isinstance(lat, (int, float)):
+        raise ValueError("Coordinates must be numbers")
+    if not -180 <= lng <= 180 or not -90 <= lat <= 90:
+        raise ValueError("Coordinates out of range")
+    return {"type": "Point", "coordinates": [float(lng), float(lat)]}
+
+
+def parse_geo_point(value):
+    """
+    Validates a GeoJSON point sent by a client.
+    Args:
+        value (dict): A GeoJSON object such as {"type": "Point", "coordinates": [lng, lat]}.
+    Returns:
+        The normalized GeoJSON Point.
+    Raises:
+        ValueError: If the value is not a valid point.
+    """
+    if not isinstance(value, dict) or value.get("type") != "Point" or not isinstance(value.get("coordinates"), list) \
+            or len(value["coordinates"]) != 2:
+        raise ValueError("Invalid GeoJSON point")
+    return geo_point(*value["coordinates"])
+
+
+def parse_near_args(args):
+    """
+    Reads the `lng`, `lat`, `max_distance` (meters) and `limit` query parameters of a proximity search.
+    Args:
+        args: The query parameters of the request.
+    Returns:
+        A tuple of the GeoJSON point, the maximum distance or None, and the number of results.
+    Raises:
+        ValueError: If a parameter is missing or invalid.
+    """
+    if args.get("lng") is None or args.get("lat") is None:
+        raise ValueError("lng and lat are required")
+    point = geo_point(float(args["lng"]), float(args["lat"]))
+    return point, parse_max_distance(args), parse_near_limit(args)
+
+
+def parse_max_distance(args):
+    """
+    Reads the `max_distance` query parameter of a proximity search, in meters.
+    Args:
+        args: The query parameters of the request.
+    Returns:
+        The maximum distance, None when absent.
+    Raises:
+        ValueError: If the distance is not a positive number.
+    """
+    max_distance = args.get("max_distance")
+    if not max_distance:
+        return None
+    max_distance = float(max_distance)
+    if not max_distance > 0:
+        raise ValueError("max_distance must be positive")
+    return max_distance
+
+
+def parse_near_limit(args):
+    """
+    Reads the `limit` query parameter of a proximity search.
+    Args:
+        args: The query parameters of the request.
+    Returns:
+        The number of results, DEFAULT_NEAR_RESULTS when absent.
+    Raises:
+        ValueError: If the limit is not between 1 and MAX_NEAR_RESULTS.
+    """
+    limit = int(args.get("limit") or DEFAULT_NEAR_RESULTS)
+    if not 1 <= limit <= MAX_NEAR_RESULTS:
+        raise ValueError(f"limit must be between 1 and {MAX_NEAR_RESULTS}")
+    return limit
+
+
+def geo_near_stages(point, key, limit, max_distance=None, query=None):
+    """
+    Builds the stages returning the closest documents first with their distance in meters.
+    Args:
+        point (dict): GeoJSON point to search around.
+        key (str): 2dsphere indexed field to search on.
+        limit (int): Maximum number of documents returned.
+        max_distance (float): Optional maximum distance in meters.
+        query (dict): Optional filter the documents must match.
+    Returns:
+        A list with the $geoNear and $limit stages.
+    """
+    geo_near = {"near": point, "key": key, "distanceField": "distance", "spherical": True}
+    if max_distance is not None:
+        geo_near["maxDistance"] = max_distance
+    if query:
+        geo_near["query"] = query
+    return [{"$geoNear": geo_near}, {"$limit": limit}]
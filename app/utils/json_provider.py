@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+import json
+
+import orjson
+from bson.objectid import ObjectId
+from flask import current_app
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+JSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """
+    Encodes the values orjson does not serialize by itself, the way Flask's default provider does.
+    Datetimes keep Flask's HTTP date format so responses are unchanged.
+    Args:
+        value: The value to encode.
+    Returns:
+        A JSON serializable value.
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_json(obj, indent=False):
+    """
+    Encodes a value the way the app's JSON provider does.
+    Args:
+        obj: The value to encode.
+        indent (bool): Whether to pretty print the JSON.
+    Returns:
+        The JSON document as bytes.
+    """
+    option = JSON_OPTIONS | orjson.OPT_INDENT_2 if indent else JSON_OPTIONS
+    try:
+        return orjson.dumps(obj, default=_default, option=option)
+    except orjson.JSONEncodeError as ex:
+        if "64-bit" not in str(ex):
+            raise
+        # orjson only encodes 64-bit integers; the rare document holding a larger one is encoded by the json module.
+        return json.dumps(obj, default=_default, sort_keys=True, ensure_ascii=False, indent=2 if indent else None,
+                          separators=None if indent else (",", ":")).encode("utf-8")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider encoding with orjson. Keys are sorted and datetimes are written as HTTP dates, matching
+    the output of the default provider.
+    """
+
+    def _dumps_bytes(self, obj):
+        return dumps_json(obj, self._app.debug)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj) + b"\n", mimetype="application/json")
+
+
+def output_json(data, code, headers=None):
+    """
+    Flask-RESTful representation encoding the responses it builds itself, such as errors, with the app's
+    JSON provider.
+    Args:
+        data: The response body.
+        code (int): The HTTP status code.
+        headers (dict): Optional extra headers.
+    Returns:
+        A JSON response.
+    """
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
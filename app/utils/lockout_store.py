@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+import time
+
+from app.config import LOCKOUT_BACKEND, LOCKOUT_MAX_ENTRIES
+
+MAX_FAILED_ATTEMPTS = 3
+LOCKOUT_TIME = 60 * 30
+
+
+class InMemoryLockoutStore:
+    """
+    Failed login attempts kept in the memory of the current process.
+    Entries expire LOCKOUT_TIME seconds after the last failed attempt and the number of tracked emails is bounded.
+    """
+
+    def __init__(self, max_attempts, lockout_time, max_entries):
+        """
+        Initializes a new instance of the InMemoryLockoutStore class.
+        Args:
+            max_attempts (int): Failed attempts after which the email is locked out.
+            lockout_time (int): Seconds an email stays tracked after its last failed attempt.
+            max_entries (int): Maximum number of emails tracked at the same time.
+        Returns:
+            None
+        """
+        self.max_attempts = max_attempts
+        self.lockout_time = lockout_time
+        self.max_entries = max_entries
+        self._attempts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now):
+        # Entries are kept in order of their last failed attempt, so the expired ones are at the front.
+        while self._attempts:
+            email, (count, expires_at) = next(iter(self._attempts.items()))
+            if expires_at > now:
+                break
+            del self._attempts[email]
+
+    def get_lockout(self, email):
+        """
+        Checks whether an email is locked out.
+        Args:
+            email (str): Email used to log in.
+        Returns:
+            Seconds left until the lockout ends, or None when the email is not locked out.
+        """
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._attempts.get(email)
+        if entry and entry[0] >= self.max_attempts:
+            return entry[1] - now
+        return None
+
+    def register_failure(self, email):
+        """
+        Records a failed login attempt.
+        Args:
+            email (str): Email used to log in.
+        Returns:
+            None
+        """
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            count = self._attempts.pop(email, (0, None))[0]
+            self._attempts[email] = (count + 1, now + self.lockout_time)
+            while len(self._attempts) > self.max_entries:
+                self._attempts.popitem(last=False)
+
+    def reset(self, email):
+        """
+        Forgets the failed attempts of an email after a successful login.
+        Args:
+            email (str): Email used to log in.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._attempts.pop(email, None)
+
+
+class MongoLockoutStore:
+    """
+    Failed login attempts kept in a Mongo collection shared by every worker.
+    Documents carry an `expire_at` date that a TTL index removes them at.
+    """
+
+    def __init__(self, collection, max_attempts, lockout_time):
+        """
+        Initializes a new instance of the MongoLockoutStore class.
+        Args:
+            collection: The login attempts collection.
+            max_attempts (int): Failed attempts after which the email is locked out.
+            lockout_time (int): Seconds an email stays tracked after its last failed attempt.
+        Returns:
+            None
+        """
+        self.collection = collection
+        self.max_attempts = max_attempts
+        self.lockout_time = lockout_time
+
+    def get_lockout(self, email):
+        now = datetime.utcnow()
+        entry = self.collection.find_one({"_id": email, "count": {"$gte": self.max_attempts},
+                                          "expire_at": {"$gt": now}})
+        if entry:
+            return (entry["expire_at"] - now).total_seconds()
+        return None
+
+    def register_failure(self, email):
+        now = datetime.utcnow()
+        # The TTL monitor only runs once a minute, so an expired document restarts the count itself.
+        self.collection.update_one({"_id": email}, [{"$set": {
+            "count": {"$cond": [{"$gt": ["$expire_at", now]}, {"$add": ["$count", 1]}, 1]},
+            "expire_at": now + timedelta(seconds=self.lockout_time)
+        }}], upsert=True)
+
+    def reset(self, email):
+        self.collection.delete_one({"_id": email})
+
+
+def create_lockout_store(login_attempts_collection):
+    """
+    Creates the lockout store selected by the LOCKOUT_BACKEND setting.
+    Args:
+        login_attempts_collection: The collection used by the mongo backend.
+    Returns:
+        An InMemoryLockoutStore for `memory`, a MongoLockoutStore for `mongo`.
+    """
+    if LOCKOUT_BACKEND == "mongo":
+        return MongoLockoutStore(login_attempts_collection, MAX_FAILED_ATTEMPTS, LOCKOUT_TIME)
+    return InMemoryLockoutStore(MAX_FAILED_ATTEMPTS, LOCKOUT_TIME, LOCKOUT_MAX_ENTRIES)
@@ -0,0 +1,221 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+import orjson
+from flask import request
+
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+
+REQUEST_ID_HEADER = "X-Request-ID"
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))) | {"message", "asctime"}
+
+_request_context = ContextVar("request_log_context", default=None)
+
+
+def parse_sample_rates(value):
+    """
+    Parses the LOG_SAMPLE_RATES setting.
+    Args:
+        value (str): Comma separated `route=rate` pairs, e.g. `/api/v1/vehicle=0.1,/api/v1/route=0.05`.
+    Returns:
+        A dict mapping every route to the fraction of its successful requests that are logged.
+    Raises:
+        ValueError: If a pair is malformed or a rate is not between 0 and 1.
+    """
+    rates = {}
+    for pair in filter(None, (item.strip() for item in value.split(","))):
+        route, _, rate = pair.rpartition("=")
+        rate = float(rate)
+        if not route or not 0 <= rate <= 1:
+            raise ValueError(f"Invalid log sample rate {pair}")
+        rates[route] = rate
+    return rates
+
+
+SAMPLE_RATES = parse_sample_rates(LOG_SAMPLE_RATES)
+
+
+class RequestLogFilter(logging.Filter):
+    """
+    Adds the id of the current request to every record and drops the INFO and DEBUG records of the requests left
+    out by sampling. Warnings and errors are always kept.
+    """
+
+    def filter(self, record):
+        context = _request_context.get()
+        record.request_id = context["request_id"] if context else None
+        return not context or context["sampled"] or record.levelno >= logging.WARNING
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line. Fields passed through `extra` are written as keys of the object.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Queue handler whose listener thread writes the records, so a request never waits on the log stream.
+    Like the other background threads of the app, the listener is started in every process on first use since it
+    does not survive fork(). Records are dropped when the queue is full.
+    """
+
+    def __init__(self, target, queue_size=LOG_QUEUE_SIZE):
+        """
+        Initializes a new instance of the BackgroundQueueHandler class.
+        Args:
+            target (logging.Handler): Handler the listener thread writes the records to.
+            queue_size (int): Maximum number of records waiting to be written.
+        Returns:
+            None
+        """
+        super().__init__(queue.Queue(queue_size))
+        self.target = target
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid != pid:
+                # The queue of the parent may have been locked by its listener at fork time.
+                self.queue = queue.Queue(self.queue_size)
+                self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+                self._listener.start()
+                atexit.register(self._listener.stop)
+                self._pid = pid
+
+    def prepare(self, record):
+        # Only the message is rendered here; the listener thread serializes the record.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=LOG_LEVEL, log_format=LOG_FORMAT):
+    """
+    Routes the root logger through a BackgroundQueueHandler. Calling it again replaces the previous handlers.
+    Args:
+        level (str): Minimum level of the records.
+        log_format (str): `json` for structured records, `text` for the plain format.
+    Returns:
+        The installed handler.
+    """
+    target = logging.StreamHandler(sys.stderr)
+    if log_format == "json":
+        target.setFormatter(StructuredFormatter())
+    else:
+        target.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s:%(request_id)s:%(message)s',
+                                              datefmt='%m/%d/%Y %I:%M:%S %p'))
+    handler = BackgroundQueueHandler(target)
+    handler.addFilter(RequestLogFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    return handler
+
+
+def begin_request_log(request_id, route):
+    """
+    Starts the log context of a request and decides whether its success logs are sampled in.
+    Args:
+        request_id (str): Id received in the X-Request-ID header, None to generate one.
+        route (str): URL rule of the endpoint, the key of LOG_SAMPLE_RATES.
+    Returns:
+        The request id.
+    """
+    request_id = request_id or uuid.uuid4().hex
+    rate = SAMPLE_RATES.get(route, 1)
+    _request_context.set({"request_id": request_id, "route": route, "start": time.perf_counter(),
+                          "sampled": rate >= 1 or random.random() < rate})
+    return request_id
+
+
+def end_request_log(method, path, status_code):
+    """
+    Logs the completion of a request with its latency and clears its log context.
+    Args:
+        method (str): HTTP method of the request.
+        path (str): Path of the request.
+        status_code (int): Status code of the response.
+    Returns:
+        The request id, or None when no log context was started.
+    """
+    context = _request_context.get()
+    if context is None:
+        return None
+    latency_ms = round((time.perf_counter() - context["start"]) * 1000, 2)
+    level = logging.WARNING if status_code >= 500 else logging.INFO
+    logging.log(level, "%s %s %s %sms", method, path, status_code, latency_ms,
+                extra={"method": method, "path": path, "status": status_code, "latency_ms": latency_ms})
+    _request_context.set(None)
+    return context["request_id"]
+
+
+def start_flask_request_log():
+    begin_request_log(request.headers.get(REQUEST_ID_HEADER),
+                      request.url_rule.rule if request.url_rule else request.path)
+
+
+def finish_flask_request_log(response):
+    request_id = end_request_log(request.method, request.path, response.status_code)
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+def clear_request_log(exception):
+    _request_context.set(None)
+
+
+def register_request_logging(app):
+    """
+    Registers the hooks adding the request id and latency to the logs of a Flask application.
+    Args:
+        app: The Flask application.
+    Returns:
+        None
+    """
+    app.before_request(start_flask_request_log)
+    app.after_request(finish_flask_request_log)
+    app.teardown_request(clear_request_log)
@@ -0,0 +1,73 @@
+from bson.objectid import ObjectId
+import base64
+import json
+
+
+def encode_cursor(sort_value, object_id):
+    """
+    Encodes the position of a record into an opaque cursor.
+    Args:
+        sort_value: Value of the sort key of the last record returned.
+        object_id (str): Id of the last record returned.
+    Returns:
+        A url safe string that can be passed back as the `cursor` query parameter.
+    """
+    raw = json.dumps([sort_value, str(object_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor created by encode_cursor.
+    Args:
+        cursor (str): Cursor received from the client.
+    Returns:
+        A tuple of the sort key value and the ObjectId of the last record seen.
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, object_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return sort_value, ObjectId(object_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_query(query, sort_key, cursor):
+    """
+    Restricts a query to the records placed after the cursor when ordered by (sort_key, _id).
+    Args:
+        query (dict): Filter the records must already match.
+        sort_key (str): Field the records are ordered by.
+        cursor (str): Cursor received from the client, empty for the first page.
+    Returns:
+        A filter matching the records of the next page.
+    """
+    if not cursor:
+        return query
+    sort_value, last_id = decode_cursor(cursor)
+    if sort_value is None:
+        after_cursor = {"$or": [{sort_key: {"$ne": None}}, {sort_key: None, "_id": {"$gt": last_id}}]}
+    else:
+        after_cursor = {"$or": [{sort_key: {"$gt": sort_value}}, {sort_key: sort_value, "_id": {"$gt": last_id}}]}
+    if not query:
+        return after_cursor
+    return {"$and": [query, after_cursor]}
+
+
+def next_page_cursor(records, sort_key, limit):
+    """
+    Builds the cursor for the page following the given records.
+    The records are expected to be fetched with one extra item to detect whether another page exists.
+    Args:
+        records (list): Formatted records of the current page, including the extra item.
+        sort_key (str): Field the records are ordered by.
+        limit (int): Page size.
+    Returns:
+        The cursor of the next page, or None when there are no more records.
+    """
+    if len(records) <= limit:
+        return None
+    last_record = records[limit - 1]
+    return encode_cursor(last_record.get(sort_key), last_record["id"])
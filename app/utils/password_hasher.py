@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import logging
+import os
+import threading
+import bcrypt
+
+from app.config import BCRYPT_LOG_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE, PASSWORD_HASH_TIMEOUT
+
+
+class HasherBusyError(Exception):
+    """
+    Raised when more password hashing jobs are pending than the configured queue depth, or when a job does not
+    complete within the configured timeout.
+    """
+
+
+def _generate_password_hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check_password_hash(pw_hash, password):
+    return bcrypt.checkpw(password.encode("utf-8"), pw_hash.encode("utf-8"))
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded pool of worker processes so that the request threads
+    of the API worker only wait on the result instead of burning CPU while holding the GIL.
+    Every API worker process starts its own pool, so the number of hashing processes of a deployment is the number
+    of API workers times `workers`.
+    """
+
+    def __init__(self, rounds, workers, max_pending, timeout=None):
+        """
+        Initializes a new instance of the PasswordHasher class.
+        Args:
+            rounds (int): bcrypt cost factor used for new hashes.
+            workers (int): Number of hashing processes. With 0 the hashing runs in the calling thread.
+            max_pending (int): Maximum number of jobs queued or running at the same time.
+            timeout (float): Seconds a request waits on a job, None to wait until it completes.
+        Returns:
+            None
+        """
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != pid:
+                    # spawn, as forking a threaded API worker is not safe
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+                    self._executor_pid = pid
+        return self._executor
+
+    def _discard_executor(self, executor):
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _run(self, function, *args):
+        if not self._pending.acquire(blocking=False):
+            raise HasherBusyError("Too many pending password operations")
+        future = None
+        try:
+            if self.workers <= 0:
+                return function(*args)
+            # A worker killed e.g. by the OOM killer breaks the whole pool; start a new one and retry once.
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(function, *args)
+                    return future.result(timeout=self.timeout)
+                except BrokenProcessPool:
+                    future = None
+                    self._discard_executor(executor)
+                    logging.warning("Password hashing pool is broken, starting a new one")
+                    if attempt:
+                        raise
+        except FutureTimeoutError:
+            future.cancel()
+            raise HasherBusyError("Password operation timed out")
+        finally:
+            # A job that timed out keeps its slot until the pool is done with it.
+            if future is None:
+                self._pending.release()
+            else:
+                future.add_done_callback(lambda _: self._pending.release())
+
+    def generate_password_hash(self, password):
+        """
+        Hashes a password with the configured cost factor.
+        Args:
+            password (str): The plain text password.
+        Returns:
+            The bcrypt hash as a string.
+        Raises:
+            HasherBusyError: If the hashing queue is full or the job timed out.
+        """
+        return self._run(_generate_password_hash, password, self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        """
+        Checks a password against a stored bcrypt hash.
+        Args:
+            pw_hash (str): The stored hash.
+            password (str): The plain text password.
+        Returns:
+            Boolean indicating whether the password matches.
+        Raises:
+            HasherBusyError: If the hashing queue is full or the job timed out.
+        """
+        return self._run(_check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """
+        Checks whether a stored hash was created with a different cost factor than the configured one.
+        Args:
+            pw_hash (str): The stored hash, e.g. `$2b$12$...`.
+        Returns:
+            Boolean indicating whether the hash should be regenerated.
+        """
+        try:
+            return int(pw_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+
+password_hasher = PasswordHasher(BCRYPT_LOG_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE, PASSWORD_HASH_TIMEOUT)
@@ -0,0 +1,52 @@
+from flask import g
+
+from app.utils.token_verifier import get_token_payload
+
+
+class Principal:
+    """
+    The authenticated caller of the current request, built from the claims of the verified JWT.
+    """
+
+    def __init__(self, user_id, role, email):
+        """
+        Initializes a new instance of the Principal class.
+        Args:
+            user_id (str): Id of the user the token was issued to.
+            role (str): Role of the user, one of Roles.
+            email (str): Email of the user.
+        Returns:
+            None
+        """
+        self.id = user_id
+        self.role = role
+        self.email = email
+
+    @classmethod
+    def from_claims(cls, user_claims):
+        """
+        Builds a principal from the `user` claim of a token payload.
+        Args:
+            user_claims (dict): The `user` claim minted by LoginResource.
+        Returns:
+            A Principal, or None when the claim does not identify a user.
+        """
+        if not user_claims or "id" not in user_claims or "role" not in user_claims:
+            return None
+        return cls(user_claims["id"], user_claims["role"], user_claims.get("email"))
+
+
+def get_current_principal():
+    """
+    Returns the principal of the current request. tokenReq populates it; endpoints without the decorator
+    build it from the request token on first use.
+    Returns:
+        The Principal of the caller, or None when the request is not authenticated.
+    """
+    if "principal" not in g:
+        try:
+            payload = get_token_payload()
+        except Exception:
+            payload = None
+        g.principal = Principal.from_claims(payload.get("user")) if payload else None
+    return g.principal
@@ -0,0 +1,37 @@
+import re
+
+PLATE_KEY_PATTERN = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_plate(vehicle_number):
+    """
+    Normalizes a vehicle number for searching: upper case without spaces or punctuation.
+    Args:
+        vehicle_number (str): The vehicle number as entered.
+    Returns:
+        The search key of the vehicle number.
+    """
+    return PLATE_KEY_PATTERN.sub("", vehicle_number.upper())
+
+
+def normalize_name(name):
+    """
+    Normalizes a name for case-insensitive searching.
+    Args:
+        name (str): The name as entered.
+    Returns:
+        The search key of the name.
+    """
+    return " ".join(name.split()).casefold()
+
+
+def prefix_query(prefix):
+    """
+    Builds a filter matching the values starting with a normalized prefix. The anchored, case-sensitive regex
+    is answered as a range scan of the field's index.
+    Args:
+        prefix (str): The normalized prefix.
+    Returns:
+        A query operator for the search key field.
+    """
+    return {"$regex": f"^{re.escape(prefix)}"}
@@ -0,0 +1,46 @@
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    """
+    Checks whether the client asked for a streamed list, either with `Accept: application/x-ndjson`
+    or with the `format=ndjson` query parameter.
+    Returns:
+        Boolean indicating whether the list should be streamed as NDJSON.
+    """
+    return prefers_ndjson(request.args, request.accept_mimetypes)
+
+
+def prefers_ndjson(args, accept_mimetypes):
+    """
+    Checks whether a request asked for a streamed list.
+    Args:
+        args: The query parameters of the request.
+        accept_mimetypes: The parsed Accept header of the request.
+    Returns:
+        Boolean indicating whether the list should be streamed as NDJSON.
+    """
+    if args.get("format") == "ndjson":
+        return True
+    return accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def ndjson_response(records, serializer=None):
+    """
+    Streams records as newline delimited JSON, one serialized record per line, while the cursor is iterated.
+    Only the current batch of the cursor is held in memory.
+    Args:
+        records: An iterable of records, usually a pymongo cursor.
+        serializer: Optional function formatting each record before it is encoded.
+    Returns:
+        A streamed Flask response.
+    """
+    def generate():
+        dumps = current_app.json.dumps
+        for record in records:
+            yield dumps(serializer(record) if serializer else record) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,148 @@
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+import atexit
+import logging
+import os
+import threading
+
+from app.config import TELEMETRY_FLUSH_SIZE, TELEMETRY_FLUSH_INTERVAL, TELEMETRY_MAX_PENDING
+
+
+class TelemetryBusyError(Exception):
+    """
+    Raised when the telemetry buffer of the worker is full because writes cannot keep up with the pings.
+    """
+
+
+class TelemetryBuffer:
+    """
+    Buffers GPS pings in the memory of the worker and writes them behind the requests.
+    The buffer is flushed to the time-series collection with insert_many when it reaches the flush size or
+    after the flush interval, whichever comes first. The latest position of every vehicle seen by the worker is
+    kept in memory and written to the vehicle document on each flush.
+    """
+
+    def __init__(self, telemetry_collection, vehicle_collection, flush_size=TELEMETRY_FLUSH_SIZE,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL, max_pending=TELEMETRY_MAX_PENDING):
+        """
+        Initializes a new instance of the TelemetryBuffer class.
+        Args:
+            telemetry_collection: The time-series collection of pings.
+            vehicle_collection: The vehicles collection.
+            flush_size (int): Number of buffered pings that triggers a flush.
+            flush_interval (float): Maximum number of seconds a ping stays buffered.
+            max_pending (int): Maximum number of buffered pings. Further pings are rejected.
+        Returns:
+            None
+        """
+        self.telemetry_collection = telemetry_collection
+        self.vehicle_collection = vehicle_collection
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._pings = []
+        self._positions = {}
+        self._dirty_positions = {}
+        self._pid = None
+
+    def _ensure_flusher(self):
+        # The flusher thread of the master process does not survive fork(), every worker starts its own.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid != pid:
+                self._pings = []
+                self._positions = {}
+                self._dirty_positions = {}
+                threading.Thread(target=self._run_flusher, name="telemetry-flusher", daemon=True).start()
+                atexit.register(self.flush)
+                self._pid = pid
+
+    def _run_flusher(self):
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def add(self, pings):
+        """
+        Buffers pings and records them as the latest known positions.
+        Args:
+            pings (list): Telemetry documents with `vehicle`, `ts` and `loc`.
+        Returns:
+            None
+        Raises:
+            TelemetryBusyError: If the buffer cannot take the pings.
+        """
+        self._ensure_flusher()
+        with self._lock:
+            if len(self._pings) + len(pings) > self.max_pending:
+                raise TelemetryBusyError("Too many pending telemetry pings")
+            self._pings.extend(pings)
+            for ping in pings:
+                latest = self._positions.get(ping["vehicle"])
+                if latest is None or latest["ts"] <= ping["ts"]:
+                    self._positions[ping["vehicle"]] = ping
+                    self._dirty_positions[ping["vehicle"]] = ping
+            pending = len(self._pings)
+        if pending >= self.flush_size:
+            self._flush_requested.set()
+
+    def latest(self, vehicle_id):
+        """
+        Returns the latest position received by this worker for a vehicle.
+        Args:
+            vehicle_id (str): Id of the vehicle.
+        Returns:
+            The latest ping, or None when this worker has not received any.
+        """
+        with self._lock:
+            return self._positions.get(vehicle_id)
+
+    def flush(self):
+        """
+        Writes the buffered pings and the latest positions. Pings that fail to be written are put back in the
+        buffer while there is room for them; pings of a chunk that were inserted before an error are not.
+        Returns:
+            The number of pings written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pings, self._pings = self._pings, []
+                positions, self._dirty_positions = self._dirty_positions, {}
+            written = 0
+            unwritten = []
+            try:
+                for start in range(0, len(pings), self.flush_size):
+                    chunk = pings[start:start + self.flush_size]
+                    try:
+                        self.telemetry_collection.insert_many(chunk, ordered=False)
+                    except BulkWriteError as ex:
+                        failed = {error["index"] for error in ex.details.get("writeErrors", [])}
+                        written += len(chunk) - len(failed)
+                        unwritten = [ping for index, ping in enumerate(chunk) if index in failed]
+                        unwritten += pings[start + self.flush_size:]
+                        raise
+                    except PyMongoError:
+                        unwritten = pings[start:]
+                        raise
+                    written += len(chunk)
+                if positions:
+                    self.vehicle_collection.bulk_write([
+                        UpdateOne({"_id": ObjectId(vehicle_id),
+                                   "$or": [{"last_seen": {"$lt": ping["ts"]}}, {"last_seen": None}]},
+                                  {"$set": {"last_loc": ping["loc"], "last_seen": ping["ts"]}})
+                        for vehicle_id, ping in positions.items()], ordered=False)
+            except PyMongoError as ex:
+                with self._lock:
+                    room = max(self.max_pending - len(self._pings), 0)
+                    self._pings = unwritten[:room] + self._pings
+                    for vehicle_id, ping in positions.items():
+                        self._dirty_positions.setdefault(vehicle_id, ping)
+                logging.warning("Failed to write telemetry, %s pings dropped: %s", max(len(unwritten) - room, 0), ex)
+            return written
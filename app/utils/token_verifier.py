@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from flask import g, request
+import threading
+import time
+import jwt
+
+from app.config import JWT_SECRET_KEY, JWT_CACHE_SIZE
+
+JWT_ALGORITHMS = ["HS256"]
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs and keeps a bounded LRU of tokens that were already verified.
+    A cached token is dropped once its `exp` is reached, so an expired token is always decoded again
+    and rejected by jwt.decode.
+    """
+
+    def __init__(self, secret_key, max_entries):
+        """
+        Initializes a new instance of the TokenVerifier class.
+        Args:
+            secret_key (str): Key the tokens are signed with.
+            max_entries (int): Maximum number of verified tokens kept in memory.
+        Returns:
+            None
+        """
+        self.secret_key = secret_key
+        self.max_entries = max_entries
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token):
+        """
+        Verifies a token, skipping the signature check when it was verified before and has not expired.
+        Args:
+            token (str): The encoded JWT.
+        Returns:
+            The decoded token payload.
+        Raises:
+            jwt.exceptions.PyJWTError: If the token is invalid or expired.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._verified.get(token)
+            if cached:
+                payload, expires_at = cached
+                if expires_at > now:
+                    self._verified.move_to_end(token)
+                    return payload
+                del self._verified[token]
+
+        payload = jwt.decode(token, self.secret_key, algorithms=JWT_ALGORITHMS)
+        if "exp" in payload:
+            with self._lock:
+                self._verified[token] = (payload, payload["exp"])
+                self._verified.move_to_end(token)
+                while len(self._verified) > self.max_entries:
+                    self._verified.popitem(last=False)
+        return payload
+
+
+token_verifier = TokenVerifier(JWT_SECRET_KEY, JWT_CACHE_SIZE)
+
+
+def read_token(headers, cookies):
+    """
+    Reads the JWT of a request from the Authorization header or the jwt_token cookie.
+    Args:
+        headers: The request headers.
+        cookies: The request cookies.
+    Returns:
+        The encoded token, or None when the request carries no token.
+    """
+    if "Authorization" in headers:
+        return headers["Authorization"]
+    elif "jwt_token" in cookies:
+        return cookies.get("jwt_token")
+    return None
+
+
+def get_request_token():
+    """
+    Reads the JWT of the current request.
+    Returns:
+        The encoded token, or None when the request carries no token.
+    """
+    return read_token(request.headers, request.cookies)
+
+
+def get_token_payload():
+    """
+    Verifies the token of the current request once and keeps the payload for the rest of the request.
+    Returns:
+        The decoded token payload, or None when the request carries no token.
+    Raises:
+        jwt.exceptions.PyJWTError: If the token is invalid or expired.
+    """
+    if "token_payload" not in g:
+        token = get_request_token()
+        g.token_payload = token_verifier.verify(token) if token else None
+    return g.token_payload
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from flask_pymongo import ObjectId
+import threading
+import time
+
+from app.config import USER_CACHE_TTL, USER_CACHE_SIZE
+
+USER_PROFILE_PROJECTION = {"password": 0}
+
+
+class UserProfileCache:
+    """
+    A small in-process TTL cache of user documents for endpoints that need more than the token claims.
+    Writes to a user must call invalidate. That only clears the cache of the worker process making the write, so
+    the other workers, and every worker after a direct database edit, may serve the old document for up to `ttl`
+    seconds.
+    """
+
+    def __init__(self, ttl, max_entries):
+        """
+        Initializes a new instance of the UserProfileCache class.
+        Args:
+            ttl (int): Seconds a user document is served from memory.
+            max_entries (int): Maximum number of user documents kept in memory.
+        Returns:
+            None
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_collection, user_id):
+        """
+        Returns the user document, fetching it from the collection when it is not cached or has expired.
+        Args:
+            user_collection: The users collection.
+            user_id (str): Id of the user.
+        Returns:
+            The user document, or None when the user does not exist.
+        """
+        user = self.cached(user_id)
+        if user is None:
+            user = user_collection.find_one({"_id": ObjectId(user_id)}, USER_PROFILE_PROJECTION)
+            if user:
+                self.store(user_id, user)
+        return user
+
+    def cached(self, user_id):
+        """
+        Returns the user document if it is cached and has not expired.
+        Args:
+            user_id (str): Id of the user.
+        Returns:
+            The user document, or None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._profiles.get(user_id)
+            if cached:
+                user, expires_at = cached
+                if expires_at > now:
+                    self._profiles.move_to_end(user_id)
+                    return user
+                del self._profiles[user_id]
+        return None
+
+    def store(self, user_id, user):
+        """
+        Caches a user document fetched with USER_PROFILE_PROJECTION.
+        Args:
+            user_id (str): Id of the user.
+            user (dict): The user document.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._profiles[user_id] = (user, time.monotonic() + self.ttl)
+            self._profiles.move_to_end(user_id)
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """
+        Drops a user document from the cache after it was modified.
+        Args:
+            user_id (str): Id of the user.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._profiles.pop(user_id, None)
+
+
+user_profile_cache = UserProfileCache(USER_CACHE_TTL, USER_CACHE_SIZE)
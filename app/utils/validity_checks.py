@@ -1,6 +1,12 @@
 from bson.objectid import ObjectId
 import re
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+INPUT_VALUE_PATTERN = re.compile(r'^[a-zA-Z0-9\s.-]*$')
+VEHICLE_PLATE_PATTERN = re.compile(
+    r"(^[A-Z]{2}[0-9]{2} [A-Z]{3}$)|(^[A-Z][0-9]{1,3} [A-Z]{3}$)|(^[A-Z]{3} [0-9]{1,3}[A-Z]$)"
+    r"|(^[0-9]{1,4} [A-Z]{1,2}$)|(^[0-9]{1,3} [A-Z]{1,3}$)|(^[A-Z]{1,2} [0-9]{1,4}$)|(^[A-Z]{1,3} [0-9]{1,3}$)")
+
 
 def is_valid_email(email):
     """
@@ -10,13 +16,11 @@ def is_valid_email(email):
     Returns:
         Boolean indicating whether the provided email is valid.
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(EMAIL_PATTERN.match(email))
 
 
 def is_valid_input_value(input_value):
-    pattern = r'^[a-zA-Z0-9\s.-]*$'
-    return bool(re.match(pattern, input_value))
+    return bool(INPUT_VALUE_PATTERN.match(input_value))
 
 
 def is_valid_object_id(o_id):
@@ -28,6 +32,4 @@ def is_valid_object_id(o_id):
 
 
 def is_vehicle_plate_valid(vehicle_number):
-    regex = r"(^[A-Z]{2}[0-9]{2} [A-Z]{3}$)|(^[A-Z][0-9]{1,3} [A-Z]{3}$)|(^[A-Z]{3} [0-9]{1,3}[A-Z]$)" \
-            r"|(^[0-9]{1,4} [A-Z]{1,2}$)|(^[0-9]{1,3} [A-Z]{1,3}$)|(^[A-Z]{1,2} [0-9]{1,4}$)|(^[A-Z]{1,3} [0-9]{1,3}$)"
-    return bool(re.match(regex, vehicle_number))
+    return bool(VEHICLE_PLATE_PATTERN.match(vehicle_number))
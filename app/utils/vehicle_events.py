@@ -0,0 +1,247 @@
+from collections import deque
+from pymongo.errors import OperationFailure, PyMongoError
+import logging
+import os
+import queue
+import threading
+import time
+
+from app.config import VEHICLE_EVENT_BUFFER, VEHICLE_EVENT_QUEUE
+from app.schemas.vehicles import vehicle_entity, BULK_WRITES_FIELD
+
+# Fields written by the telemetry flush. An update touching only them is a position report, not a vehicle change,
+# and neither is the removal of bulk assignment markers.
+POSITION_FIELDS = ["last_loc", "last_seen"]
+IGNORED_FIELDS = POSITION_FIELDS + [BULK_WRITES_FIELD]
+WATCH_PIPELINE = [{"$match": {"$or": [
+    {"operationType": {"$in": ["insert", "replace", "delete"]}},
+    {"operationType": "update", "$expr": {"$or": [
+        {"$gt": [{"$size": {"$objectToArray": "$updateDescription.updatedFields"}},
+                 {"$size": {"$filter": {
+                     "input": {"$objectToArray": "$updateDescription.updatedFields"}, "as": "field",
+                     "cond": {"$in": [{"$arrayElemAt": [{"$split": ["$$field.k", "."]}, 0]}, IGNORED_FIELDS]}}}}]},
+        {"$gt": [{"$size": {"$filter": {"input": {"$ifNull": ["$updateDescription.removedFields", []]},
+                                        "as": "field", "cond": {"$ne": ["$$field", BULK_WRITES_FIELD]}}}}, 0]},
+    ]}},
+]}}]
+WATCH_RETRY_SECONDS = 2
+REPLAY_AWAIT_MS = 200
+
+
+class VehicleSubscription:
+    """
+    The queue of vehicle events waiting to be sent to one client.
+    """
+
+    def __init__(self, teams, queue_size):
+        """
+        Initializes a new instance of the VehicleSubscription class.
+        Args:
+            teams (set): Teams whose vehicles the client may see, None to see every vehicle.
+            queue_size (int): Maximum number of events waiting to be sent.
+        Returns:
+            None
+        """
+        self.teams = teams
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self.missed = False
+        self.resume_token = None
+        self.last_event_id = None
+
+    def can_see(self, event):
+        # Events of vehicles whose team is unknown carry no team and are only sent to the clients seeing everything.
+        if self.teams is None:
+            return True
+        return not self.teams.isdisjoint(event["teams"])
+
+    def is_new(self, event):
+        # Resume tokens sort in the order of the changes, so an event already replayed is not sent twice.
+        return self.last_event_id is None or event["id"] > self.last_event_id
+
+    def offer(self, event):
+        """
+        Queues an event the client may see. A client that falls too far behind is marked as overflowed and its
+        stream is closed, so it reconnects and catches up from the event buffer.
+        Args:
+            event (dict): The published event.
+        Returns:
+            None
+        """
+        if not self.overflowed and self.can_see(event):
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                self.overflowed = True
+
+
+class VehicleEventHub:
+    """
+    Fans out the changes of the vehicles collection to the streaming clients of the current process.
+    A single change stream is opened per process, on the first subscription. The last events are kept in a
+    ring buffer keyed by their resume token, so a reconnecting client sending Last-Event-ID receives what it
+    missed instead of refetching the list; older events are replayed from the change stream with that token.
+    """
+
+    def __init__(self, vehicle_collection, buffer_size=VEHICLE_EVENT_BUFFER, queue_size=VEHICLE_EVENT_QUEUE):
+        """
+        Initializes a new instance of the VehicleEventHub class.
+        Args:
+            vehicle_collection: The vehicles collection.
+            buffer_size (int): Number of past events kept for reconnecting clients.
+            queue_size (int): Maximum number of events waiting to be sent to one client.
+        Returns:
+            None
+        """
+        self.vehicle_collection = vehicle_collection
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._events = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._teams = {}
+        self._resume_token = None
+
+    def _ensure_watcher(self):
+        # A watcher thread started before fork() does not exist in the child process.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid != pid:
+                self._events = deque(maxlen=self.buffer_size)
+                self._subscribers = set()
+                self._teams = {}
+                self._resume_token = None
+                threading.Thread(target=self._watch, name="vehicle-events", daemon=True).start()
+                self._pid = pid
+
+    def _load_teams(self):
+        # Changes are only read after the stream is open, so the teams loaded here are never older than the events
+        # applied on top of them.
+        self._teams = {str(vehicle["_id"]): vehicle.get("current_team", "")
+                       for vehicle in self.vehicle_collection.find({}, {"current_team": 1})}
+
+    def _watch(self):
+        while True:
+            try:
+                with self.vehicle_collection.watch(WATCH_PIPELINE, full_document="updateLookup",
+                                                   resume_after=self._resume_token) as stream:
+                    if self._resume_token is None:
+                        self._load_teams()
+                    for change in stream:
+                        self._publish(change)
+            except OperationFailure as ex:
+                # The resume token is no longer in the oplog: start again from the current time.
+                logging.warning("Vehicle change stream could not resume: %s", ex)
+                self._resume_token = None
+                time.sleep(WATCH_RETRY_SECONDS)
+            except PyMongoError as ex:
+                logging.warning("Vehicle change stream interrupted: %s", ex)
+                time.sleep(WATCH_RETRY_SECONDS)
+
+    def build_event(self, change, track=True):
+        """
+        Builds the event sent to the clients for a change.
+        Args:
+            change (dict): The change stream document.
+            track (bool): Whether to record the team of the vehicle. Replayed changes are older than the known
+                teams and are not recorded.
+        Returns:
+            The event, or None when the change has nothing to send.
+        """
+        vehicle_id = str(change["documentKey"]["_id"])
+        document = change.get("fullDocument")
+        previous_team = self._teams.get(vehicle_id)
+        if change["operationType"] == "delete":
+            if track:
+                self._teams.pop(vehicle_id, None)
+            vehicle = {"id": vehicle_id}
+            teams = set() if previous_team is None else {previous_team}
+        elif document:
+            team = document.get("current_team", "")
+            if track:
+                self._teams[vehicle_id] = team
+            vehicle = vehicle_entity(document)
+            teams = {team} if previous_team is None else {team, previous_team}
+        else:
+            # The vehicle was deleted before its update could be looked up, the delete event follows.
+            return None
+        return {"id": change["_id"]["_data"], "operation": change["operationType"], "vehicle": vehicle,
+                "teams": teams}
+
+    def _publish(self, change):
+        event = self.build_event(change)
+        self._resume_token = change["_id"]
+        if event is None:
+            return
+        with self._lock:
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(event)
+
+    def subscribe(self, teams, last_event_id=None):
+        """
+        Registers a client.
+        Args:
+            teams (set): Teams whose vehicles the client may see, None to see every vehicle.
+            last_event_id (str): Id of the last event the client received before reconnecting.
+        Returns:
+            The subscription, and the buffered events the client missed. When the last event is no longer
+            buffered, for instance after a restart, the subscription keeps it as resume token and the missed
+            events are read with replay().
+        """
+        self._ensure_watcher()
+        subscription = VehicleSubscription(teams, self.queue_size)
+        with self._lock:
+            backlog = []
+            if last_event_id:
+                event_ids = [event["id"] for event in self._events]
+                if last_event_id in event_ids:
+                    backlog = list(self._events)[event_ids.index(last_event_id) + 1:]
+                else:
+                    subscription.resume_token = last_event_id
+            self._subscribers.add(subscription)
+        return subscription, [event for event in backlog if subscription.can_see(event)]
+
+    def replay(self, subscription):
+        """
+        Reads the changes made since the resume token of a subscription from the database. The subscription is
+        registered first, so the live events that follow the replayed ones are already queued; the ones replayed
+        as well are skipped by is_new(). When the token cannot be resumed or more changes than the event buffer
+        were missed, the subscription is marked as missed and the client has to refetch the list.
+        Args:
+            subscription (VehicleSubscription): A subscription returned by subscribe().
+        Returns:
+            A generator of the missed events the client may see.
+        """
+        if not subscription.resume_token:
+            return
+        replayed = 0
+        try:
+            with self.vehicle_collection.watch(WATCH_PIPELINE, full_document="updateLookup",
+                                               resume_after={"_data": subscription.resume_token},
+                                               max_await_time_ms=REPLAY_AWAIT_MS) as stream:
+                while True:
+                    change = stream.try_next()
+                    if change is None:
+                        return
+                    replayed += 1
+                    if replayed > self.buffer_size:
+                        subscription.missed = True
+                        return
+                    event = self.build_event(change, track=False)
+                    if event is None:
+                        continue
+                    subscription.last_event_id = event["id"]
+                    if subscription.can_see(event):
+                        yield event
+        except PyMongoError as ex:
+            logging.warning("Vehicle changes could not be replayed: %s", ex)
+            subscription.missed = True
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
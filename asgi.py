@@ -0,0 +1,72 @@
+from quart import Quart, request
+from asgiref.wsgi import WsgiToAsgi
+
+from app.config import REACT_APP_URL
+from app.aio.resources import get_vehicles, get_routes, get_managers, get_user
+from app.utils.logs import begin_request_log, end_request_log, REQUEST_ID_HEADER
+from main import app as wsgi_app
+
+API_PREFIX = '/api/v1'
+ASYNC_PATHS = {f"{API_PREFIX}/vehicle", f"{API_PREFIX}/route", f"{API_PREFIX}/user/managers", f"{API_PREFIX}/user"}
+ASYNC_METHODS = {"GET", "HEAD"}
+
+
+def create_async_app():
+    """
+    Creates the Quart application serving the read endpoints on the event loop.
+    Returns:
+        The configured Quart application.
+    """
+    async_app = Quart(__name__)
+    async_app.add_url_rule(f"{API_PREFIX}/vehicle", 'get_vehicles', get_vehicles, methods=["GET"])
+    async_app.add_url_rule(f"{API_PREFIX}/route", 'get_routes', get_routes, methods=["GET"])
+    async_app.add_url_rule(f"{API_PREFIX}/user/managers", 'get_managers', get_managers, methods=["GET"])
+    async_app.add_url_rule(f"{API_PREFIX}/user", 'get_user', get_user, methods=["GET"])
+
+    @async_app.before_request
+    async def start_request_log():
+        begin_request_log(request.headers.get(REQUEST_ID_HEADER),
+                          request.url_rule.rule if request.url_rule else request.path)
+
+    @async_app.after_request
+    async def finish_request_log(response):
+        request_id = end_request_log(request.method, request.path, response.status_code)
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @async_app.after_request
+    async def add_cors_headers(response):
+        origin = request.headers.get("Origin")
+        if origin and origin == REACT_APP_URL:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.vary.add("Origin")
+        return response
+
+    return async_app
+
+
+def create_application(async_app, flask_app):
+    """
+    Builds the ASGI entry point: the read endpoints are served by the Quart app, every other request is handed to
+    the Flask app in a worker thread.
+    Args:
+        async_app: The Quart application.
+        flask_app: The Flask application.
+    Returns:
+        The ASGI application.
+    """
+    wsgi_application = WsgiToAsgi(flask_app)
+
+    async def application(scope, receive, send):
+        if scope["type"] == "lifespan" or (scope["type"] == "http" and scope["method"] in ASYNC_METHODS and
+                                           scope["path"].rstrip("/") in ASYNC_PATHS):
+            await async_app(scope, receive, send)
+        else:
+            await wsgi_application(scope, receive, send)
+
+    return application
+
+
+application = create_application(create_async_app(), wsgi_app)
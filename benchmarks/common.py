@@ -0,0 +1,102 @@
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("REACT_APP_URL", "http://localhost:3000")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import jwt
+from pymongo import MongoClient
+
+import app.db
+from app.config import JWT_SECRET_KEY
+
+
+def make_parser(description, threads=8, duration=5):
+    """
+    Builds the parser of the options shared by the benchmarks.
+    Args:
+        description (str): Description of the benchmark.
+        threads (int): Default number of concurrent clients.
+        duration (float): Default number of seconds to run.
+    Returns:
+        The argument parser.
+    """
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="Run against this MongoDB, e.g. mongodb://localhost:27017. Without it the "
+                                      "benchmark uses an in-memory mongomock database and only measures the app.")
+    parser.add_argument("--threads", type=int, default=threads)
+    parser.add_argument("--duration", type=float, default=duration)
+    return parser
+
+
+def use_database(uri, name="fleet-fortress-benchmark"):
+    """
+    Points the collections of the app to a benchmark database, dropped first.
+    Args:
+        uri (str): MongoDB connection string, None for an in-memory mongomock database.
+        name (str): Name of the benchmark database.
+    Returns:
+        The database.
+    """
+    if uri:
+        client = MongoClient(uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+    client.drop_database(name)
+    database = client[name]
+    app.db.get_db = lambda: database
+    return database
+
+
+def auth_headers(user_id, role):
+    token = jwt.encode({"user": {"id": str(user_id), "role": role, "email": "bench@example.com"},
+                        "exp": datetime.utcnow() + timedelta(hours=1)}, JWT_SECRET_KEY)
+    return {"Authorization": token}
+
+
+def run_load(call, threads, duration):
+    """
+    Calls a function from several threads for a fixed time.
+    Args:
+        call: Function called repeatedly with the thread number; returns whether the call succeeded.
+        threads (int): Number of concurrent callers.
+        duration (float): Seconds to run.
+    Returns:
+        A dict with the number of calls, failures, calls per second and latency percentiles in milliseconds.
+    """
+    latencies = [[] for _ in range(threads)]
+    failures = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def worker(number):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if not call(number):
+                failures[number] += 1
+            latencies[number].append((time.perf_counter() - started) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    merged = sorted(latency for thread_latencies in latencies for latency in thread_latencies)
+    return {"calls": len(merged), "failures": sum(failures), "per_second": round(len(merged) / elapsed, 1),
+            "p50_ms": percentile(merged, 50), "p99_ms": percentile(merged, 99)}
+
+
+def percentile(values, rank):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(len(values) * rank / 100))], 2)
+
+
+def report(name, result):
+    print(f"{name}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
@@ -0,0 +1,67 @@
+"""
+Login storm benchmark: concurrent clients log in through POST /api/v1/login while other clients read
+GET /api/v1/route. Runs once with bcrypt hashing in the request threads and once per hashing pool size, and reports
+the login throughput and the latency of the unrelated reads, next to the reads measured without logins.
+
+    python -m benchmarks.password_hasher --uri mongodb://localhost:27017 --workers 0,2 --threads 8 --read-threads 4
+"""
+import threading
+from datetime import datetime
+
+import bcrypt
+from bson import ObjectId
+
+from benchmarks.common import make_parser, use_database, auth_headers, run_load, report
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument("--workers", default="0,2", help="Comma separated pool sizes, 0 hashes in the request thread.")
+    parser.add_argument("--read-threads", type=int, default=4, help="Clients reading routes during the logins.")
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    database = use_database(args.uri)
+    from main import app as flask_app
+    from app.config import BCRYPT_LOG_ROUNDS
+    from app.enums.roles import Roles
+    from app.utils.password_hasher import password_hasher
+
+    pw_hash = bcrypt.hashpw(b"bench-password", bcrypt.gensalt(BCRYPT_LOG_ROUNDS)).decode("utf-8")
+    database.users.insert_many([{"name": f"Bench {number}", "email": f"bench{number}@example.com", "password": pw_hash,
+                                 "role": Roles.MANAGER.value, "created_on": datetime.now()}
+                                for number in range(args.users)])
+    database.routes.insert_many([{"name": f"Bench route {number}", "start_loc": "A", "end_loc": "B",
+                                  "created_on": datetime.now()} for number in range(20)])
+    headers = auth_headers(ObjectId(), Roles.ADMIN.value)
+    login_clients = [flask_app.test_client() for _ in range(args.threads)]
+    read_clients = [flask_app.test_client() for _ in range(args.read_threads)]
+    logins = [0] * args.threads
+
+    def login(number):
+        logins[number] += 1
+        email = f"bench{(number + logins[number] * args.threads) % args.users}@example.com"
+        response = login_clients[number].post("/api/v1/login", json={"email": email, "password": "bench-password"})
+        return response.status_code == 200
+
+    def read(number):
+        return read_clients[number].get("/api/v1/route", headers=headers).status_code == 200
+
+    report("routes without logins", run_load(read, args.read_threads, args.duration))
+    for workers in (int(value) for value in args.workers.split(",")):
+        password_hasher.workers = workers
+        if workers:
+            password_hasher.generate_password_hash("warm up")
+        reads = {}
+        reader = threading.Thread(target=lambda: reads.update(run_load(read, args.read_threads, args.duration)))
+        reader.start()
+        report(f"logins workers={workers}", run_load(login, args.threads, args.duration))
+        reader.join()
+        report(f"routes during logins workers={workers}", reads)
+        if password_hasher._executor is not None:
+            password_hasher._executor.shutdown()
+            password_hasher._executor = None
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+Micro benchmark of the compiled vehicle serializer against the hand-written function it replaced, and of the
+orjson provider against Flask's default JSON provider, on a page of vehicles.
+
+    python -m benchmarks.serializers --rows 1000 --repeat 20
+"""
+import argparse
+import timeit
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from app.schemas.vehicles import vehicle_entity
+from app.utils.json_provider import OrjsonProvider
+
+
+def legacy_vehicle_entity(vehicle_info):
+    # The hand-written vehicle_entity replaced by compile_serializer, as the reference of the comparison.
+    formatted_entity = {}
+    if "_id" in vehicle_info:
+        formatted_entity.update({"id": str(ObjectId(vehicle_info["_id"]))})
+    if "vehicle_number" in vehicle_info:
+        formatted_entity.update({"vehicle_number": vehicle_info["vehicle_number"]})
+    if "current_team" in vehicle_info:
+        formatted_entity.update({"current_team": vehicle_info["current_team"]})
+    if "status" in vehicle_info:
+        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status"]].value})
+    if "status_name" in vehicle_info:
+        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status_name"]].name})
+    if "created_on" in vehicle_info:
+        formatted_entity.update({"created_on": vehicle_info["created_on"]})
+    if "current_route" in vehicle_info:
+        formatted_entity.update({"current_route": vehicle_info["current_route"]})
+    if "version" in vehicle_info:
+        formatted_entity.update({"version": vehicle_info["version"]})
+    if "manager_info" in vehicle_info and "name" in vehicle_info["manager_info"]:
+        formatted_entity.update({"current_team_name": vehicle_info["manager_info"]["name"]})
+    if 'route_info' in vehicle_info and "name" in vehicle_info["route_info"]:
+        formatted_entity.update({"current_route_name": vehicle_info["route_info"]["name"]})
+    return formatted_entity
+
+
+def vehicles(rows):
+    return [{"_id": ObjectId(), "vehicle_number": f"AB{number:04d} CDE", "current_team": "64105f3e1c9d440000c1b2c3",
+             "status": "ON_THE_WAY", "created_on": datetime(2023, 3, 14), "current_route": "64105f3e1c9d440000b1b2c3",
+             "version": number, "manager_info": {"name": "Mia"}, "route_info": {"name": "North loop"}}
+            for number in range(rows)]
+
+
+def best_ms(call, repeat):
+    return round(min(timeit.repeat(call, number=1, repeat=repeat)) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = vehicles(args.rows)
+    legacy_ms = best_ms(lambda: [legacy_vehicle_entity(document) for document in documents], args.repeat)
+    compiled_ms = best_ms(lambda: [vehicle_entity(document) for document in documents], args.repeat)
+    print(f"vehicle_entity x{args.rows}: legacy={legacy_ms}ms compiled={compiled_ms}ms")
+
+    flask_app = Flask(__name__)
+    payload = {"status": "success", "message": "ok",
+               "data": {"vehicles": [vehicle_entity(document) for document in documents], "total_records": args.rows}}
+    with flask_app.app_context():
+        default_ms = best_ms(lambda: DefaultJSONProvider(flask_app).response(payload), args.repeat)
+        orjson_ms = best_ms(lambda: OrjsonProvider(flask_app).response(payload), args.repeat)
+    print(f"JSON response x{args.rows}: default={default_ms}ms orjson={orjson_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Side-by-side load benchmark of the two serving modes: gunicorn with threads (`main:app`) and hypercorn on an event
+loop (`asgi:application`). Both are started with the same number of worker processes against the same MongoDB,
+then concurrent clients send the same read requests to each. Reports the throughput and latency percentiles of
+every mode.
+
+The servers use the configured database of the app on the given MongoDB, so point --uri at a disposable server.
+Vehicles and routes are only inserted when the collections are empty; the requests themselves are read-only.
+
+    python -m benchmarks.serving --uri mongodb://localhost:27017 --workers 2 --threads 32
+"""
+import http.client
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from benchmarks.common import make_parser, auth_headers, run_load, report
+from app.db import DB_NAME
+from app.enums.roles import Roles
+from app.enums.vehicle_route_status import VehicleRouteStatus
+
+
+def seed(database, vehicles):
+    if not database.routes.estimated_document_count():
+        database.routes.insert_many([{"name": f"Bench route {number}", "start_loc": "A", "end_loc": "B",
+                                      "created_on": datetime.now()} for number in range(50)])
+    if not database.vehicles.estimated_document_count():
+        statuses = [status.name for status in VehicleRouteStatus]
+        database.vehicles.insert_many([{"vehicle_number": f"BE{number:05d} NCH", "current_team": "",
+                                        "current_route": "", "status": statuses[number % len(statuses)],
+                                        "created_on": datetime.now(), "version": 1}
+                                       for number in range(vehicles)])
+
+
+def start_server(mode, port, workers, threads, uri):
+    env = dict(os.environ, MONGO_URI=uri, LOG_LEVEL="ERROR")
+    if mode == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+                   "-w", str(workers), "--threads", str(threads)]
+    else:
+        command = [sys.executable, "-m", "hypercorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+                   "asgi:application"]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(port, path, headers, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+            connection.request("GET", path, headers=headers)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def measure(port, paths, headers, threads, duration):
+    connections = [None] * threads
+    counters = [0] * threads
+
+    def call(number):
+        path = paths[counters[number] % len(paths)]
+        counters[number] += 1
+        try:
+            if connections[number] is None:
+                connections[number] = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            connections[number].request("GET", path, headers=headers)
+            response = connections[number].getresponse()
+            response.read()
+            return response.status == 200
+        except (OSError, http.client.HTTPException):
+            connections[number].close()
+            connections[number] = None
+            return False
+
+    result = run_load(call, threads, duration)
+    for connection in connections:
+        if connection is not None:
+            connection.close()
+    return result
+
+
+def main():
+    parser = make_parser(__doc__, threads=32, duration=10)
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes of each server.")
+    parser.add_argument("--server-threads", type=int, default=4, help="Threads of each gunicorn worker.")
+    parser.add_argument("--paths", default="/api/v1/vehicle,/api/v1/route",
+                        help="Comma separated GET paths requested in turn.")
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    if not args.uri:
+        parser.error("the serving modes read from a MongoDB server, pass --uri")
+
+    seed(MongoClient(args.uri)[DB_NAME], args.vehicles)
+    headers = auth_headers(ObjectId(), Roles.ADMIN.value)
+    paths = args.paths.split(",")
+    for mode in ("gunicorn", "hypercorn"):
+        server = start_server(mode, args.port, args.workers, args.server_threads, args.uri)
+        try:
+            wait_until_ready(args.port, paths[0], headers)
+            report(f"{mode} workers={args.workers}", measure(args.port, paths, headers, args.threads, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
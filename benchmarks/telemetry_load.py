@@ -0,0 +1,52 @@
+"""
+Load benchmark of POST /api/v1/vehicle/telemetry: concurrent clients send batches of pings while the buffer
+writes them behind the requests. Reports the request throughput and latency, then checks that every accepted ping
+was written exactly once.
+
+    python -m benchmarks.telemetry_load --uri mongodb://localhost:27017 --threads 16 --batch 50
+"""
+import time
+
+from bson import ObjectId
+
+from benchmarks.common import make_parser, use_database, auth_headers, run_load, report
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument("--batch", type=int, default=50, help="Pings per request.")
+    parser.add_argument("--vehicles", type=int, default=200)
+    args = parser.parse_args()
+    database = use_database(args.uri)
+    from main import app as flask_app
+    from app.enums.roles import Roles
+
+    vehicle_ids = [str(vehicle_id) for vehicle_id in database.vehicles.insert_many(
+        [{"vehicle_number": f"BENCH {number}"} for number in range(args.vehicles)]).inserted_ids]
+    headers = auth_headers(ObjectId(), Roles.MANAGER.value)
+    clients = [flask_app.test_client() for _ in range(args.threads)]
+    accepted = [0] * args.threads
+
+    def send(number):
+        now = time.time()
+        pings = [{"vehicle": vehicle_ids[(number * args.batch + index) % len(vehicle_ids)], "lat": 51.5,
+                  "lng": -0.1, "ts": now} for index in range(args.batch)]
+        response = clients[number].post("/api/v1/vehicle/telemetry", headers=headers, json=pings)
+        if response.status_code != 202:
+            return False
+        accepted[number] += response.get_json()["data"]["accepted"]
+        return True
+
+    report(f"telemetry batch={args.batch}", run_load(send, args.threads, args.duration))
+
+    deadline = time.perf_counter() + 30
+    while database.vehicle_telemetry.count_documents({}) < sum(accepted) and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    written = database.vehicle_telemetry.count_documents({})
+    print(f"accepted={sum(accepted)} written={written} positions="
+          f"{database.vehicles.count_documents({'last_seen': {'$ne': None}})}")
+    return 0 if written == sum(accepted) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
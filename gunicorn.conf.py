@@ -0,0 +1,16 @@
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+preload_app = True
+wsgi_app = "main:app"
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # The app is imported once in the master; make sure no worker reuses a client created before the fork.
+    from app.db import reset_client
+    reset_client()
@@ -1,66 +1,102 @@
-import os
 from flask import Flask
 from flask_cors import CORS
-import logging
-from pathlib import Path
-from dotenv import load_dotenv
 from flask_restful import Api
 
-from app.db import user_collection, register_codes, route_collection, vehicle_collection
+from app.config import REACT_APP_URL, JWT_SECRET_KEY, FLASK_DEBUG
+from app.db import user_collection, register_codes, route_collection, vehicle_collection, login_attempts, \
+    vehicle_history, vehicle_telemetry
 from app.api.login import LoginResource
 from app.api.user import UserResource
 from app.api.logout import LogoutResource
 from app.api.route import RouteResource
+from app.api.route_nearby import RouteNearbyResource
 from app.api.vehicle import VehicleResource
 from app.api.manager_vehicle import ManagerVehicleResource
 from app.api.user_register import UserRegisterResource
 from app.api.managers import ManagerResource
-from app.api.admin_vehicle import AdminVehicleResource
+from app.api.admin_vehicle import AdminVehicleResource, AdminVehicleBulkResource
 from app.api.reg_token import RegisterTokenResource
+from app.api.fleet import FleetSummaryResource
+from app.api.vehicle_history import VehicleHistoryResource
+from app.api.vehicle_bulk import VehicleBulkResource
+from app.api.vehicle_stream import VehicleStreamResource
+from app.api.vehicle_telemetry import VehicleTelemetryResource
+from app.api.vehicle_nearest import VehicleNearestResource
+from app.utils.lockout_store import create_lockout_store
+from app.utils.json_provider import OrjsonProvider, output_json
+from app.utils.vehicle_events import VehicleEventHub
+from app.utils.telemetry_buffer import TelemetryBuffer
+from app.utils.logs import configure_logging, register_request_logging
 
-app = Flask(__name__)
-api = Api(app, prefix='/api/v1')
 
-env_path = Path(__file__).resolve().parent.parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+def root_get_call():
+    return '<h1>HELLO WORLD</h1>'
 
-origin_url = os.getenv("REACT_APP_URL")
-secret_key = os.getenv("JWT_SECRET_KEY")
 
-CORS(app, supports_credentials=True, resources={r'/*': {"origins": origin_url}})
+def create_app():
+    """
+    Creates the Flask application and registers the API resources.
+    No database connection is opened here: every process connects lazily on its first query.
+    Returns:
+        The configured Flask application.
+    """
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    api = Api(app, prefix='/api/v1')
+    api.representation('application/json')(output_json)
 
-logging.basicConfig(format='%(asctime)s - %(levelname)s:%(message)s', datefmt='%m/%d/%Y %I:%M:%S %p',
-                    level=logging.DEBUG)
+    CORS(app, supports_credentials=True, resources={r'/*': {"origins": REACT_APP_URL}})
 
+    configure_logging()
+    register_request_logging(app)
 
-@app.route('/', methods=["GET"])
-def root_get_call():
-    return '<h1>HELLO WORLD</h1>'
+    app.add_url_rule('/', 'root_get_call', root_get_call, methods=["GET"])
+
+    api.add_resource(LoginResource, '/login',
+                     resource_class_kwargs={"user": user_collection, "secret_key": JWT_SECRET_KEY,
+                                            "lockout_store": create_lockout_store(login_attempts)})
+
+    api.add_resource(UserResource, '/user', '/user/generate-token',
+                     resource_class_kwargs={'user': user_collection, "register_codes": register_codes})
+    api.add_resource(ManagerResource, '/user/managers',
+                     resource_class_kwargs={'user': user_collection, "vehicle": vehicle_collection})
+    api.add_resource(RouteResource, '/route',
+                     resource_class_kwargs={'route': route_collection, "user": user_collection,
+                                            "vehicle": vehicle_collection})
+    api.add_resource(RouteNearbyResource, '/route/nearby', resource_class_kwargs={'route': route_collection})
+    api.add_resource(AdminVehicleResource, '/vehicle/admin',
+                     resource_class_kwargs={"vehicle": vehicle_collection, "route": route_collection,
+                                            "user": user_collection})
+    api.add_resource(AdminVehicleBulkResource, '/vehicle/admin/bulk',
+                     resource_class_kwargs={"vehicle": vehicle_collection, "route": route_collection,
+                                            "user": user_collection})
+    api.add_resource(ManagerVehicleResource, "/vehicle/manager",
+                     resource_class_kwargs={"vehicle": vehicle_collection})
+    api.add_resource(VehicleHistoryResource, '/vehicle/history',
+                     resource_class_kwargs={"vehicle_history": vehicle_history})
+    api.add_resource(VehicleStreamResource, '/vehicle/stream',
+                     resource_class_kwargs={"vehicle_events": VehicleEventHub(vehicle_collection)})
+    api.add_resource(VehicleTelemetryResource, '/vehicle/telemetry',
+                     resource_class_kwargs={"vehicle": vehicle_collection,
+                                            "telemetry_buffer": TelemetryBuffer(vehicle_telemetry, vehicle_collection)})
+    api.add_resource(VehicleNearestResource, '/vehicle/nearest',
+                     resource_class_kwargs={"vehicle": vehicle_collection, "route": route_collection})
+    api.add_resource(VehicleBulkResource, '/vehicle/bulk',
+                     resource_class_kwargs={"vehicle": vehicle_collection})
+    api.add_resource(VehicleResource, '/vehicle',
+                     resource_class_kwargs={'vehicle': vehicle_collection,
+                                            "route": route_collection, "user": user_collection})
+    api.add_resource(UserRegisterResource, '/register',
+                     resource_class_kwargs={'user': user_collection, "register_codes": register_codes})
+    api.add_resource(RegisterTokenResource, '/user/generate-token',
+                     resource_class_kwargs={"user": user_collection, "register_codes": register_codes})
+    api.add_resource(LogoutResource, '/logout')
+    api.add_resource(FleetSummaryResource, '/fleet/summary')
 
+    return app
 
-api.add_resource(LoginResource, '/login',
-                 resource_class_kwargs={"user": user_collection, "secret_key": secret_key})
 
-api.add_resource(UserResource, '/user', '/user/generate-token',
-                 resource_class_kwargs={'user': user_collection, "register_codes": register_codes})
-api.add_resource(ManagerResource, '/user/managers',
-                 resource_class_kwargs={'user': user_collection, "vehicle": vehicle_collection})
-api.add_resource(RouteResource, '/route',
-                 resource_class_kwargs={'route': route_collection, "user": user_collection,
-                                        "vehicle": vehicle_collection})
-api.add_resource(AdminVehicleResource, '/vehicle/admin',
-                 resource_class_kwargs={"vehicle": vehicle_collection, "route": route_collection,
-                                        "user": user_collection})
-api.add_resource(ManagerVehicleResource, "/vehicle/manager",
-                 resource_class_kwargs={"vehicle": vehicle_collection})
-api.add_resource(VehicleResource, '/vehicle',
-                 resource_class_kwargs={'vehicle': vehicle_collection,
-                                        "route": route_collection, "user": user_collection})
-api.add_resource(UserRegisterResource, '/register',
-                 resource_class_kwargs={'user': user_collection, "register_codes": register_codes})
-api.add_resource(RegisterTokenResource, '/user/generate-token',
-                 resource_class_kwargs={"user": user_collection, "register_codes":register_codes})
-api.add_resource(LogoutResource, '/logout')
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=FLASK_DEBUG)
@@ -0,0 +1,78 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("REACT_APP_URL", "http://localhost:3000")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+
+import jwt
+import mongomock
+import pytest
+
+import app.db
+from app.config import JWT_SECRET_KEY
+from app.db import DB_NAME
+
+
+class AtomicCollection:
+    """
+    Wraps a mongomock collection so every operation runs under one lock, like a single-document write on a
+    mongod. mongomock reads and writes a matched document in separate steps, which would let threads interleave
+    inside one update.
+    """
+
+    def __init__(self, collection, lock):
+        self._collection = collection
+        self._lock = lock
+
+    def __getattr__(self, attribute):
+        value = getattr(self._collection, attribute)
+        if not callable(value):
+            return value
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return value(*args, **kwargs)
+        return locked
+
+
+class AtomicDatabase:
+    def __init__(self, database):
+        self._database = database
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        return AtomicCollection(self._database[name], self._lock)
+
+    def __getattr__(self, attribute):
+        return getattr(self._database, attribute)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = mongomock.MongoClient()[DB_NAME]
+    monkeypatch.setattr(app.db, "get_db", lambda: database)
+    return database
+
+
+@pytest.fixture
+def atomic_database(monkeypatch):
+    database = AtomicDatabase(mongomock.MongoClient()[DB_NAME])
+    monkeypatch.setattr(app.db, "get_db", lambda: database)
+    return database
+
+
+@pytest.fixture
+def client():
+    from main import app as flask_app
+    flask_app.config["TESTING"] = True
+    return flask_app.test_client()
+
+
+def auth_headers(user_id, role, email="user@example.com"):
+    token = jwt.encode({"user": {"id": str(user_id), "role": role, "email": email},
+                        "exp": datetime.utcnow() + timedelta(hours=1)}, JWT_SECRET_KEY)
+    return {"Authorization": token}
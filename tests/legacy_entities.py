@@ -0,0 +1,95 @@
+"""
+The entity functions as they were before compile_serializer, kept to check the compiled serializers return
+the same output.
+"""
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from bson import ObjectId
+
+
+def vehicle_entity(vehicle_info):
+    formatted_entity = {}
+    if "_id" in vehicle_info:
+        formatted_entity.update({"id": str(ObjectId(vehicle_info["_id"]))})
+    if "vehicle_number" in vehicle_info:
+        formatted_entity.update({"vehicle_number": vehicle_info["vehicle_number"]})
+    if "current_team" in vehicle_info:
+        formatted_entity.update({"current_team": vehicle_info["current_team"]})
+    if "status" in vehicle_info:
+        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status"]].value})
+    if "status_name" in vehicle_info:
+        formatted_entity.update({"status": VehicleRouteStatus[vehicle_info["status_name"]].name})
+    if "created_on" in vehicle_info:
+        formatted_entity.update({"created_on": vehicle_info["created_on"]})
+    if "current_route" in vehicle_info:
+        formatted_entity.update({"current_route": vehicle_info["current_route"]})
+    if "version" in vehicle_info:
+        formatted_entity.update({"version": vehicle_info["version"]})
+    if "manager_info" in vehicle_info and "name" in vehicle_info["manager_info"]:
+        formatted_entity.update({"current_team_name": vehicle_info["manager_info"]["name"]})
+    if 'route_info' in vehicle_info and "name" in vehicle_info["route_info"]:
+        formatted_entity.update({"current_route_name": vehicle_info["route_info"]["name"]})
+    return formatted_entity
+
+
+def create_vehicle_entity(vehicle_info):
+    formatted_entity = {}
+    if "vehicle_number" in vehicle_info:
+        formatted_entity.update({"vehicle_number": vehicle_info["vehicle_number"]})
+    if "current_team" in vehicle_info:
+        formatted_entity.update({"current_team": vehicle_info["current_team"]})
+    if "status" in vehicle_info:
+        formatted_entity.update({"status": vehicle_info["status"]})
+    if "created_on" in vehicle_info:
+        formatted_entity.update({"created_on": vehicle_info["created_on"]})
+    if "current_route" in vehicle_info:
+        formatted_entity.update({"current_route": vehicle_info["current_route"]})
+    if "version" in vehicle_info:
+        formatted_entity.update({"version": vehicle_info["version"]})
+    return formatted_entity
+
+
+def route_entity(route_info, fields=None):
+    if fields is not None:
+        formatted_entity = {field: route_info[field] for field in fields if field in route_info}
+        if "id" in fields:
+            formatted_entity.update({"id": str(ObjectId(route_info["_id"]))})
+        return formatted_entity
+    formatted_entity = {
+        "id": str(ObjectId(route_info["_id"])),
+        "name": route_info["name"],
+        "start_loc": route_info["start_loc"],
+        "end_loc": route_info["end_loc"],
+        "created_on": route_info["created_on"]
+    }
+    return formatted_entity
+
+
+def user_entity(user_data, fields=None):
+    if fields is not None:
+        formatted_entity = {field: user_data[field] for field in fields if field != "id" and field in user_data}
+        if "id" in fields:
+            formatted_entity.update({"id": str(ObjectId(user_data["_id"]))})
+        return formatted_entity
+    return {
+        "id": str(ObjectId(user_data["_id"])),
+        "name": user_data["name"],
+        "email": user_data["email"],
+        "role": user_data["role"],
+        "created_on": user_data["created_on"]
+    }
+
+
+def manager_entity(manager_info):
+    formatted_entity = {
+        "id": str(ObjectId(manager_info["_id"])),
+        "name": manager_info["name"],
+        "email": manager_info["email"],
+        "created_on": manager_info["created_on"]
+    }
+    if "assigned_vehicles" in manager_info:
+        formatted_entity.update({"assigned_vehicles": manager_info["assigned_vehicles"]})
+    if 'current_route' in manager_info:
+        formatted_entity.update({"current_route": manager_info["current_route"]})
+    if "current_vehicle" in manager_info:
+        formatted_entity.update({"current_vehicle": manager_info["current_vehicle"]})
+    return formatted_entity
@@ -0,0 +1,79 @@
+from bson import ObjectId
+from mongomock.collection import Collection
+from pymongo import UpdateOne
+
+from app.api.admin_vehicle import remove_bulk_write_marker
+from app.enums.roles import Roles
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from tests.conftest import auth_headers
+
+
+def seed(database):
+    admin_id = database.users.insert_one({"name": "Admin", "email": "admin@example.com",
+                                          "role": Roles.ADMIN.value}).inserted_id
+    manager_id = str(database.users.insert_one({"name": "Manager", "email": "manager@example.com",
+                                                "role": Roles.MANAGER.value}).inserted_id)
+    route_id = str(database.routes.insert_one({"name": "North"}).inserted_id)
+    vehicle_ids = database.vehicles.insert_many([
+        {"vehicle_number": f"AB1{number} CDE", "current_team": "", "current_route": "", "version": 1,
+         "status": VehicleRouteStatus.NOT_STARTED.name} for number in range(2)]).inserted_ids
+    database.record_counts.insert_many([{"_id": "vehicles:unassigned", "count": 2},
+                                        {"_id": f"vehicles:team:{manager_id}", "count": 0}])
+    database.fleet_summary.insert_one({"_id": "fleet", "total": 2, "by_team": {"unassigned": 2},
+                                       "by_route": {"none": 2}, "by_status": {"NOT_STARTED": 2}})
+    return admin_id, manager_id, route_id, vehicle_ids
+
+
+def assign(client, admin_id, manager_id, route_id, vehicle_ids):
+    return client.put("/api/v1/vehicle/admin/bulk", headers=auth_headers(admin_id, Roles.ADMIN.value),
+                      json=[{"vehicle": str(vehicle_id), "current_route": route_id, "current_team": manager_id,
+                             "version": 1} for vehicle_id in vehicle_ids])
+
+
+def test_bulk_assignment_reports_the_writes_that_were_applied(client, database, monkeypatch):
+    admin_id, manager_id, route_id, (raced_id, applied_id) = seed(database)
+    bulk_write = Collection.bulk_write
+
+    def racing_bulk_write(collection, requests, **kwargs):
+        if collection.name == "vehicles" and all(isinstance(request, UpdateOne) for request in requests):
+            # One vehicle is modified between the validation and the write, the other one right after the write.
+            collection.update_one({"_id": raced_id}, {"$inc": {"version": 1}})
+            result = bulk_write(collection, requests, **kwargs)
+            collection.update_one({"_id": applied_id}, {"$inc": {"version": 1}})
+            return result
+        return bulk_write(collection, requests, **kwargs)
+
+    monkeypatch.setattr(Collection, "bulk_write", racing_bulk_write)
+    response = assign(client, admin_id, manager_id, route_id, [raced_id, applied_id])
+
+    data = response.get_json()["data"]
+    assert data["updated"] == 1
+    assert [(result["vehicle"], result["code"]) for result in data["vehicles"]] == \
+        [(str(raced_id), 409), (str(applied_id), 200)]
+    assert database.vehicles.find_one({"_id": raced_id})["current_team"] == ""
+    assert database.vehicles.count_documents({"bulk_writes": {"$exists": True}}) == 0
+    counts = {counter["_id"]: counter["count"] for counter in database.record_counts.find()}
+    assert counts == {"vehicles:unassigned": 1, f"vehicles:team:{manager_id}": 1}
+    summary = database.fleet_summary.find_one({"_id": "fleet"})
+    assert summary["by_team"] == {"unassigned": 1, manager_id: 1}
+    assert summary["by_route"] == {"none": 1, route_id: 1}
+
+
+def test_bulk_assignment_applies_every_valid_assignment(client, database):
+    admin_id, manager_id, route_id, vehicle_ids = seed(database)
+
+    response = assign(client, admin_id, manager_id, route_id, vehicle_ids)
+
+    assert response.get_json()["data"]["updated"] == 2
+    assert all(vehicle["current_team"] == manager_id and vehicle["version"] == 2 and "bulk_writes" not in vehicle
+               for vehicle in database.vehicles.find())
+
+
+def test_bulk_assignment_keeps_the_markers_of_pending_assignments(database):
+    marker, pending = ObjectId(), ObjectId()
+    vehicle_ids = database.vehicles.insert_many([{"bulk_writes": [marker]}, {"bulk_writes": [pending, marker]},
+                                                 {"bulk_writes": [pending]}]).inserted_ids
+
+    remove_bulk_write_marker(database.vehicles, set(vehicle_ids), marker)
+
+    assert [vehicle.get("bulk_writes") for vehicle in database.vehicles.find()] == [None, [pending], [pending]]
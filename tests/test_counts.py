@@ -0,0 +1,69 @@
+import threading
+
+from mongomock.collection import Collection
+
+from app.db.counts import get_total, increment_counts, rebuild_counts, team_vehicles_counters, COUNTS_REBUILT, \
+    VEHICLES_COUNTER
+
+
+def test_totals_are_counted_until_the_counters_are_rebuilt(database):
+    database.vehicles.insert_many([{"current_team": "a"}, {"current_team": "a"}, {"current_team": ""}])
+    increment_counts({"vehicles:team:a": 1})
+
+    assert get_total(database.vehicles, {"current_team": "a"}, team_vehicles_counters(["a"])) == 2
+    assert database.record_counts.find_one({"_id": "vehicles:team:a"})["count"] == 1
+
+    rebuild_counts(database)
+
+    assert get_total(database.vehicles, {"current_team": "a"}, team_vehicles_counters(["a"])) == 2
+    assert get_total(database.vehicles, {"current_team": {"$in": ["a", ""]}}, team_vehicles_counters(["a", ""])) == 3
+
+
+def test_increments_create_missing_counters(database):
+    rebuild_counts(database)
+
+    increment_counts({"vehicles:team:b": 1})
+    database.vehicles.insert_one({"current_team": "b"})
+
+    assert get_total(database.vehicles, {"current_team": "b"}, team_vehicles_counters(["b"])) == 1
+    assert get_total(database.vehicles, {"current_team": "c"}, team_vehicles_counters(["c"])) == 0
+
+
+def test_concurrent_increments_of_a_new_counter_are_all_applied(atomic_database):
+    rebuild_counts(atomic_database)
+    threads = [threading.Thread(target=increment_counts, args=({VEHICLES_COUNTER: 1, "vehicles:team:d": 1},))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts = {counter["_id"]: counter["count"] for counter in atomic_database["record_counts"].find()}
+    assert counts[VEHICLES_COUNTER] == 20
+    assert counts["vehicles:team:d"] == 20
+
+
+def test_rebuild_replaces_existing_counters(database):
+    database.vehicles.insert_one({"current_team": "a"})
+    increment_counts({"vehicles:team:a": 5, "vehicles:team:gone": 1})
+
+    assert rebuild_counts(database) == 4
+
+    counts = {counter["_id"]: counter["count"] for counter in database.record_counts.find()}
+    assert counts.pop(COUNTS_REBUILT) == 0
+    assert counts == {"routes": 0, "vehicles": 1, "vehicles:unassigned": 0, "vehicles:team:a": 1}
+
+
+def test_unfiltered_totals_use_the_estimated_count_until_the_counters_are_rebuilt(database, monkeypatch):
+    database.routes.insert_many([{"name": "North"}, {"name": "South"}])
+    estimated = []
+    estimated_document_count = Collection.estimated_document_count
+
+    def spy(collection, *args, **kwargs):
+        estimated.append(collection.name)
+        return estimated_document_count(collection, *args, **kwargs)
+    monkeypatch.setattr(Collection, "estimated_document_count", spy)
+
+    assert get_total(database.routes, {}, {"routes": {}}) == 2
+    assert get_total(database.routes, {"name": "North"}, {"routes:north": {}}) == 1
+    assert estimated == ["routes"]
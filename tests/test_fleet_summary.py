@@ -0,0 +1,42 @@
+from app.db.summary import get_fleet_summary, rebuild_fleet_summary, summary_changes, update_fleet_summary
+from app.enums.roles import Roles
+from tests.conftest import auth_headers
+
+
+def create_vehicle(database, vehicle):
+    database.vehicles.insert_one(dict(vehicle))
+    update_fleet_summary(summary_changes(None, vehicle))
+
+
+def test_summary_is_computed_until_the_snapshot_is_rebuilt(database):
+    database.vehicles.insert_one({"status": "NOT_STARTED", "current_team": "", "current_route": ""})
+    create_vehicle(database, {"status": "ON_THE_WAY", "current_team": "a", "current_route": "r"})
+
+    # The deltas written before the rebuild only cover the second vehicle.
+    assert database.fleet_summary.find_one({"_id": "fleet"})["total"] == 1
+    assert get_fleet_summary() == {"total": 2, "by_status": {"NOT_STARTED": 1, "ON_THE_WAY": 1},
+                                   "by_team": {"unassigned": 1, "a": 1}, "by_route": {"none": 1, "r": 1}}
+
+
+def test_snapshot_is_kept_up_to_date_after_the_rebuild(database):
+    database.vehicles.insert_one({"status": "NOT_STARTED", "current_team": "", "current_route": ""})
+    assert rebuild_fleet_summary(database) == 1
+
+    create_vehicle(database, {"status": "ON_THE_WAY", "current_team": "a", "current_route": "r"})
+    database.vehicles.insert_one({"status": "NOT_STARTED", "current_team": "", "current_route": ""})
+
+    assert get_fleet_summary() == {"total": 2, "by_status": {"NOT_STARTED": 1, "ON_THE_WAY": 1},
+                                   "by_team": {"unassigned": 1, "a": 1}, "by_route": {"none": 1, "r": 1}}
+    assert get_fleet_summary(exact=True)["total"] == 3
+
+
+def test_summary_endpoint(client, database):
+    admin_id = database.users.insert_one({"name": "Admin", "email": "admin@example.com",
+                                          "role": Roles.ADMIN.value}).inserted_id
+    create_vehicle(database, {"status": "ON_THE_WAY", "current_team": "a", "current_route": "r"})
+
+    response = client.get("/api/v1/fleet/summary", headers=auth_headers(admin_id, Roles.ADMIN.value))
+
+    assert response.status_code == 200
+    assert response.get_json()["data"] == {"total": 1, "by_status": {"ON_THE_WAY": 1}, "by_team": {"a": 1},
+                                           "by_route": {"r": 1}}
@@ -0,0 +1,22 @@
+from pymongo import ASCENDING
+
+import app.db.indexes
+from app.db.indexes import apply_indexes, INDEXES
+
+
+def test_migrate_reuses_the_indexes_created_by_the_baseline(database, monkeypatch):
+    # mongomock cannot create time-series collections.
+    monkeypatch.setattr(app.db.indexes, "create_collections", lambda database: [])
+    # Created at import time before the registry; mongod refuses the same keys under another name.
+    database.register_codes.create_index([("expire_at", ASCENDING)], expireAfterSeconds=86400)
+    database.routes.create_index([("name", ASCENDING), ("_id", ASCENDING)])
+    database.vehicles.create_index([("vehicle_number", ASCENDING), ("_id", ASCENDING)])
+    database.vehicles.create_index([("current_team", ASCENDING), ("vehicle_number", ASCENDING), ("_id", ASCENDING)])
+    database.vehicles.create_index([("current_route", ASCENDING)], name="current_route")
+
+    apply_indexes(database)
+
+    for collection_name in INDEXES:
+        keys = [tuple(index["key"]) for index in database[collection_name].index_information().values()]
+        assert len(keys) == len(set(keys)), collection_name
+    assert "current_route" not in database.vehicles.index_information()
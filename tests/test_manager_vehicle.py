@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+from bson import ObjectId
+
+from app.api.manager_vehicle import ManagerVehicleResource, build_vehicle_update
+from app.db.summary import rebuild_fleet_summary
+from app.enums.roles import Roles
+from tests.conftest import auth_headers
+
+MANAGER = "0000000000000000000000a1"
+OTHER_MANAGER = "0000000000000000000000a2"
+ROUTE = "0000000000000000000000b1"
+VEHICLE_ID = ObjectId("0000000000000000000000c1")
+
+
+def vehicle(**fields):
+    return dict({"_id": VEHICLE_ID, "vehicle_number": "AB12 CDE", "current_team": MANAGER, "current_route": ROUTE,
+                 "status": "NOT_STARTED", "version": 1}, **fields)
+
+
+@pytest.mark.parametrize("stored, request_args, expected", [
+    (None, (None, "STARTED", None), ('Vehicle not found', 404)),
+    (vehicle(current_team=OTHER_MANAGER), (None, "STARTED", None), ('Unauthorised attempt to update vehicle.', 401)),
+    (vehicle(current_team=OTHER_MANAGER), (MANAGER, None, None), ('Unauthorised attempt to update vehicle.', 401)),
+    (vehicle(), (None, "STARTED", 0), ('Vehicle was modified by another request.', 409)),
+    (vehicle(current_team="", status="STARTED"), (MANAGER, None, None), ('Invalid attempt to change team.', 401)),
+    (vehicle(status="STARTED"), ("", None, None), ('Invalid attempt to change team.', 401)),
+    (vehicle(), (None, "ON_THE_WAY", None), ('Invalid status transition', 400)),
+    (vehicle(current_route=""), (None, "STARTED", None), ('No route is assigned to vehicle', 400)),
+    (vehicle(status="ON_THE_WAY", current_route=""), (None, "NOT_STARTED", None),
+     ('No route is assigned to vehicle', 400)),
+])
+def test_update_filter_rejects_what_get_rejection_reports(database, stored, request_args, expected):
+    if stored:
+        database.vehicles.insert_one(stored)
+    conditions, update = build_vehicle_update(MANAGER, *request_args)
+
+    assert database.vehicles.find_one({"$and": [{"_id": VEHICLE_ID}] + conditions}) is None
+    resource = ManagerVehicleResource(vehicle=database.vehicles)
+    assert resource.get_rejection(str(VEHICLE_ID), MANAGER, *request_args) == expected
+
+
+@pytest.mark.parametrize("stored, request_args, expected", [
+    (vehicle(current_team=""), (MANAGER, None, None), {"current_team": MANAGER}),
+    (vehicle(), ("", None, None), {"current_team": ""}),
+    (vehicle(), (None, "STARTED", 1), {"status": "STARTED"}),
+    (vehicle(status="ON_THE_WAY"), (None, "ON_DESTINATION", None), {"status": "ON_DESTINATION", "current_route": ""}),
+    (vehicle(status="ON_DESTINATION", current_route=""), (None, "NOT_STARTED", None), {"status": "NOT_STARTED"}),
+    (vehicle(current_team=""), (MANAGER, "STARTED", None), {"current_team": MANAGER, "status": "STARTED"}),
+])
+def test_update_filter_matches_allowed_requests(database, stored, request_args, expected):
+    database.vehicles.insert_one(stored)
+    conditions, update = build_vehicle_update(MANAGER, *request_args)
+
+    assert database.vehicles.find_one({"$and": [{"_id": VEHICLE_ID}] + conditions}) is not None
+    assert update == {"$set": expected, "$inc": {"version": 1}}
+
+
+def run_concurrently(calls):
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(index, call):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def put_vehicle(client, manager, vehicle_id, payload):
+    return client.put(f"/api/v1/vehicle/manager?vehicle={vehicle_id}",
+                      headers=auth_headers(manager, Roles.MANAGER.value), json=payload).status_code
+
+
+def test_concurrent_claims_assign_each_vehicle_once(client, atomic_database):
+    managers = [f"{number:024x}" for number in range(1, 5)]
+    vehicle_ids = atomic_database["vehicles"].insert_many([
+        {"vehicle_number": f"AB{number} CDE", "current_team": "", "current_route": ROUTE, "status": "NOT_STARTED",
+         "version": 0} for number in range(10)]).inserted_ids
+    atomic_database["record_counts"].insert_many([{"_id": "vehicles:unassigned", "count": 10}] + [
+        {"_id": f"vehicles:team:{manager}", "count": 0} for manager in managers])
+    rebuild_fleet_summary(atomic_database)
+
+    codes = run_concurrently([
+        lambda manager=manager, vehicle_id=vehicle_id: put_vehicle(client, manager, vehicle_id,
+                                                                   {"current_team": manager})
+        for vehicle_id in vehicle_ids for manager in managers])
+
+    assert codes.count(200) == len(vehicle_ids)
+    assert set(codes) == {200, 401}
+    vehicles = list(atomic_database["vehicles"].find())
+    assert all(vehicle["version"] == 1 and vehicle["current_team"] in managers for vehicle in vehicles)
+    counts = {counter["_id"]: counter["count"] for counter in atomic_database["record_counts"].find()}
+    assert counts["vehicles:unassigned"] == 0
+    for manager in managers:
+        assert counts[f"vehicles:team:{manager}"] == sum(vehicle["current_team"] == manager for vehicle in vehicles)
+    summary = atomic_database["fleet_summary"].find_one({"_id": "fleet"})
+    assert summary["by_team"].get("unassigned", 0) == 0
+    assert sum(summary["by_team"].values()) == 10
+
+
+def test_concurrent_status_changes_lose_no_update(client, atomic_database):
+    atomic_database["vehicles"].insert_one(vehicle(version=0))
+    rebuild_fleet_summary(atomic_database)
+    next_status = {"NOT_STARTED": "STARTED", "STARTED": "ON_THE_WAY", "ON_THE_WAY": "NOT_STARTED"}
+    def advance():
+        applied = 0
+        for _ in range(20):
+            current = atomic_database["vehicles"].find_one({"_id": VEHICLE_ID})
+            code = put_vehicle(client, MANAGER, VEHICLE_ID, {"status": next_status[current["status"]],
+                                                              "version": current["version"]})
+            assert code in (200, 400, 409)
+            applied += code == 200
+        return applied
+
+    successes = run_concurrently([advance] * 6)
+
+    stored = atomic_database["vehicles"].find_one({"_id": VEHICLE_ID})
+    assert stored["version"] == sum(successes)
+    by_status = atomic_database["fleet_summary"].find_one({"_id": "fleet"})["by_status"]
+    assert {status: count for status, count in by_status.items() if count} == {stored["status"]: 1}
@@ -0,0 +1,47 @@
+import pytest
+
+from app.enums.roles import Roles
+from app.enums.vehicle_route_status import VehicleRouteStatus
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def roster(database):
+    admin_id = database.users.insert_one({"name": "Admin", "email": "admin@example.com",
+                                          "role": Roles.ADMIN.value}).inserted_id
+    managers = {}
+    for name in ("Ada", "Bea", "Cy", "Dee"):
+        managers[name] = str(database.users.insert_one({"name": name, "email": f"{name}@example.com",
+                                                         "role": Roles.MANAGER.value}).inserted_id)
+    database.vehicles.insert_many([
+        {"vehicle_number": "AB10 CDE", "current_team": managers["Ada"], "current_route": "r1",
+         "status": VehicleRouteStatus.ON_THE_WAY.name},
+        {"vehicle_number": "AB11 CDE", "current_team": managers["Ada"], "current_route": "",
+         "status": VehicleRouteStatus.NOT_STARTED.name},
+        {"vehicle_number": "AB12 CDE", "current_team": managers["Bea"], "current_route": "r2",
+         "status": VehicleRouteStatus.ON_THE_WAY.name},
+        {"vehicle_number": "AB13 CDE", "current_team": managers["Cy"], "current_route": "",
+         "status": VehicleRouteStatus.NOT_STARTED.name},
+        {"vehicle_number": "AB14 CDE", "current_team": "", "current_route": "r3",
+         "status": VehicleRouteStatus.STARTED.name},
+    ])
+    return admin_id, managers
+
+
+@pytest.mark.parametrize("route_status, names", [
+    ("ON_THE_WAY", ["Ada", "Bea"]),
+    ("NOT_STARTED", ["Cy", "Dee"]),
+    ("STARTED", []),
+    (None, ["Ada", "Bea", "Cy", "Dee"]),
+])
+def test_roster_filtered_by_route_status(client, roster, route_status, names):
+    admin_id, managers = roster
+    # mongomock does not implement the $lookup of the vehicle fields.
+    query = "?fields=id,name" + (f"&route_status={route_status}" if route_status else "")
+
+    response = client.get(f"/api/v1/user/managers{query}", headers=auth_headers(admin_id, Roles.ADMIN.value))
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["managers"] == [{"id": managers[name], "name": name} for name in names]
+    assert data["total_records"] == len(names)
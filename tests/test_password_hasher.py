@@ -0,0 +1,47 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.utils.password_hasher import PasswordHasher, HasherBusyError
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(4, 1, 1, timeout=5)
+    yield hasher
+    if hasher._executor is not None:
+        hasher._executor.shutdown()
+
+
+def test_hash_round_trip(hasher):
+    pw_hash = hasher.generate_password_hash("secret")
+
+    assert hasher.check_password_hash(pw_hash, "secret")
+    assert not hasher.check_password_hash(pw_hash, "other")
+
+
+def test_timeout_keeps_slot_until_job_completes(hasher):
+    hasher.timeout = 0.2
+    hasher.generate_password_hash("warm up")
+
+    with pytest.raises(HasherBusyError, match="timed out"):
+        hasher._run(time.sleep, 1)
+    with pytest.raises(HasherBusyError, match="Too many"):
+        hasher.generate_password_hash("secret")
+
+    time.sleep(1.5)
+    hasher.timeout = 5
+    assert hasher.check_password_hash(hasher.generate_password_hash("secret"), "secret")
+
+
+def test_broken_pool_is_replaced(hasher):
+    hasher.generate_password_hash("warm up")
+    broken = hasher._executor
+
+    with pytest.raises(BrokenProcessPool):
+        hasher._run(os._exit, 1)
+
+    assert hasher.check_password_hash(hasher.generate_password_hash("secret"), "secret")
+    assert hasher._executor is not broken
@@ -0,0 +1,124 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.schemas.managers import manager_entity
+from app.schemas.routes import route_entity
+from app.schemas.users import user_entity
+from app.schemas.vehicles import vehicle_entity, create_vehicle_entity
+from app.utils.json_provider import OrjsonProvider
+from tests import legacy_entities
+
+CREATED_ON = datetime(2023, 3, 14, 9, 26, 53)
+VEHICLES = [
+    {"_id": ObjectId("64105f3e1c9d440000a1b2c3"), "vehicle_number": "AB12 CDE", "current_team": "", "status":
+        "NOT_STARTED", "created_on": CREATED_ON, "current_route": "", "version": 3, "plate_key": "AB12CDE"},
+    {"_id": ObjectId("64105f3e1c9d440000a1b2c4"), "vehicle_number": "XY34 ZZZ", "current_team": "64105f3e1c9d44",
+     "status": "ON_THE_WAY", "created_on": CREATED_ON, "current_route": "64105f3e1c9d45",
+     "manager_info": {"name": "Mia"}, "route_info": {"name": "North loop"}},
+    {"_id": ObjectId("64105f3e1c9d440000a1b2c5"), "status_name": "ON_DESTINATION", "manager_info": {},
+     "route_info": {"name": "Harbour"}},
+    {"vehicle_number": "ZZ99 ZZZ"},
+    {},
+]
+ROUTES = [
+    {"_id": ObjectId("64105f3e1c9d440000b1b2c3"), "name": "North loop", "start_loc": "Depot", "end_loc": "Harbour",
+     "created_on": CREATED_ON, "name_key": "northloop"},
+    {"_id": ObjectId("64105f3e1c9d440000b1b2c4"), "name": "Ŝouth", "start_loc": "", "end_loc": "Ŝ",
+     "created_on": CREATED_ON},
+]
+USERS = [
+    {"_id": ObjectId("64105f3e1c9d440000c1b2c3"), "name": "Mia", "email": "mia@example.com", "role": "MANAGER",
+     "created_on": CREATED_ON},
+    {"_id": ObjectId("64105f3e1c9d440000c1b2c4"), "name": "Admin", "email": "admin@example.com", "role": "ADMIN",
+     "created_on": CREATED_ON, "password": "hash"},
+]
+MANAGERS = [
+    dict(USERS[0], assigned_vehicles=[{"id": "1", "vehicle_number": "AB12 CDE"}], current_route="North loop"),
+    dict(USERS[0], current_vehicle={"id": "1"}),
+    USERS[0],
+]
+
+
+@pytest.mark.parametrize("document", VEHICLES)
+def test_vehicle_entity_matches_the_legacy_output(document):
+    assert vehicle_entity(document) == legacy_entities.vehicle_entity(document)
+
+
+@pytest.mark.parametrize("document", VEHICLES)
+def test_create_vehicle_entity_matches_the_legacy_output(document):
+    document = {key: value for key, value in document.items() if key != "plate_key"}
+    assert create_vehicle_entity(document) == legacy_entities.create_vehicle_entity(document)
+
+
+@pytest.mark.parametrize("fields", [None, ["id"], ["name", "created_on"], ["id", "end_loc", "start_loc"], []])
+@pytest.mark.parametrize("document", ROUTES)
+def test_route_entity_matches_the_legacy_output(document, fields):
+    assert route_entity(document, fields) == legacy_entities.route_entity(document, fields)
+
+
+@pytest.mark.parametrize("fields", [None, ["id"], ["email", "role"], ["id", "name", "created_on"]])
+@pytest.mark.parametrize("document", USERS)
+def test_user_entity_matches_the_legacy_output(document, fields):
+    assert user_entity(document, fields) == legacy_entities.user_entity(document, fields)
+
+
+@pytest.mark.parametrize("document", MANAGERS)
+def test_manager_entity_matches_the_legacy_output(document):
+    assert manager_entity(document) == legacy_entities.manager_entity(document)
+
+
+@pytest.mark.parametrize("serializer, legacy, document", [
+    (route_entity, legacy_entities.route_entity, {"_id": ObjectId(), "name": "No locations"}),
+    (user_entity, legacy_entities.user_entity, {"_id": ObjectId(), "name": "No email"}),
+    (manager_entity, legacy_entities.manager_entity, {"_id": ObjectId(), "name": "No email"}),
+])
+def test_missing_required_keys_raise_like_the_legacy_functions(serializer, legacy, document):
+    with pytest.raises(KeyError):
+        legacy(document)
+    with pytest.raises(KeyError):
+        serializer(document)
+
+
+PAYLOADS = [
+    {"status": "success", "message": "ok", "data": {"vehicles": [vehicle_entity(vehicle) for vehicle in VEHICLES],
+                                                     "total_records": 5, "next_cursor": None}},
+    {"data": [route_entity(route) for route in ROUTES[:1]], "b": [1, 2.5, True, False, None], "a": {"z": 1, "y": 2}},
+    {"created_on": CREATED_ON, "day": CREATED_ON.date(), "amount": Decimal("12.30"), "big": 2 ** 70},
+    [],
+    "text",
+]
+
+
+@pytest.fixture
+def providers():
+    flask_app = Flask(__name__)
+    return DefaultJSONProvider(flask_app), OrjsonProvider(flask_app), flask_app
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_json_provider_matches_the_default_provider(providers, payload):
+    default, orjson_provider, flask_app = providers
+    with flask_app.app_context():
+        assert orjson_provider.response(payload).data == default.response(payload).data
+
+
+def test_json_provider_keeps_non_ascii_text_unescaped(providers):
+    default, orjson_provider, flask_app = providers
+    payload = {"data": [route_entity(route) for route in ROUTES]}
+    with flask_app.app_context():
+        encoded = orjson_provider.response(payload).data
+        assert json.loads(encoded) == json.loads(default.response(payload).data)
+        assert "Ŝouth".encode("utf-8") in encoded
+
+
+def test_json_provider_encodes_nan_as_null(providers):
+    # The default provider writes NaN, which JSON.parse rejects; orjson writes null.
+    default, orjson_provider, flask_app = providers
+    with flask_app.app_context():
+        assert orjson_provider.response({"speed": float("nan")}).data == b'{"speed":null}\n'
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pytest
+
+from app.enums.roles import Roles
+from app.schemas.telemetry import create_telemetry_entity
+from app.utils.telemetry_buffer import TelemetryBuffer
+from tests.conftest import auth_headers
+
+VEHICLE_ID = "0123456789abcdef01234567"
+RECEIVED_ON = datetime(2023, 3, 1)
+
+
+def ping(**values):
+    return dict({"vehicle": VEHICLE_ID, "lat": 51.5, "lng": -0.1}, **values)
+
+
+def test_telemetry_entity_converts_the_timestamp():
+    telemetry = create_telemetry_entity(ping(ts=1677628800), RECEIVED_ON)
+    assert telemetry["ts"] == datetime(2023, 3, 1)
+    assert telemetry["loc"] == {"type": "Point", "coordinates": [-0.1, 51.5]}
+
+
+def test_telemetry_entity_defaults_to_the_received_time():
+    assert create_telemetry_entity(ping(), RECEIVED_ON)["ts"] == RECEIVED_ON
+
+
+@pytest.mark.parametrize("ts", [1e20, -1e20, float("nan"), float("inf"), "1677628800", True])
+def test_telemetry_entity_rejects_invalid_timestamps(ts):
+    with pytest.raises(ValueError, match="Invalid timestamp"):
+        create_telemetry_entity(ping(ts=ts), RECEIVED_ON)
+
+
+def test_invalid_timestamp_rejects_only_its_ping(client, database, monkeypatch):
+    buffered = []
+    monkeypatch.setattr(TelemetryBuffer, "add", lambda buffer, pings: buffered.extend(pings))
+
+    response = client.post("/api/v1/vehicle/telemetry", headers=auth_headers(VEHICLE_ID, Roles.MANAGER.value),
+                           json=[ping(ts=1e20), ping(ts=1677628800)])
+
+    assert response.status_code == 202
+    assert response.get_json()["data"] == {"accepted": 1, "rejected": [{"index": 0, "message": "Invalid timestamp"}]}
+    assert [telemetry["ts"] for telemetry in buffered] == [datetime(2023, 3, 1)]
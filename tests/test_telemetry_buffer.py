@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import mongomock
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from app.utils.telemetry_buffer import TelemetryBuffer
+
+VEHICLE_ID = "0123456789abcdef01234567"
+
+
+class FailingTelemetryCollection:
+    """
+    Records inserted pings, failing the given chunk indexes once with the given errors.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.inserted = []
+        self.calls = 0
+
+    def insert_many(self, documents, ordered=True):
+        failure = self.failures.pop(self.calls, None)
+        self.calls += 1
+        if failure is None:
+            self.inserted.extend(document["n"] for document in documents)
+        elif isinstance(failure, set):
+            self.inserted.extend(document["n"] for index, document in enumerate(documents)
+                                 if index not in failure)
+            raise BulkWriteError({"writeErrors": [{"index": index, "code": 11000} for index in sorted(failure)],
+                                  "nInserted": len(documents) - len(failure)})
+        else:
+            raise failure
+
+
+def buffered(count):
+    return [{"n": number, "vehicle": VEHICLE_ID, "ts": datetime(2023, 3, 1, 0, 0, number),
+             "loc": {"type": "Point", "coordinates": [0, 0]}} for number in range(count)]
+
+
+def make_buffer(telemetry_collection, pings):
+    buffer = TelemetryBuffer(telemetry_collection, mongomock.MongoClient().db.vehicles, flush_size=2)
+    buffer._pings = pings
+    return buffer
+
+
+def test_flush_puts_back_only_the_pings_that_failed():
+    telemetry = FailingTelemetryCollection({1: {1}})
+    buffer = make_buffer(telemetry, buffered(5))
+
+    assert buffer.flush() == 3
+    assert telemetry.inserted == [0, 1, 2]
+    assert buffer.flush() == 2
+    assert sorted(telemetry.inserted) == [0, 1, 2, 3, 4]
+
+
+def test_flush_puts_back_the_chunks_that_were_not_sent():
+    telemetry = FailingTelemetryCollection({1: AutoReconnect("connection lost")})
+    buffer = make_buffer(telemetry, buffered(5))
+
+    assert buffer.flush() == 2
+    assert buffer.flush() == 3
+    assert telemetry.inserted == [0, 1, 2, 3, 4]
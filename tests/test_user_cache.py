@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import bcrypt
+
+from app.enums.roles import Roles
+from app.utils.user_cache import UserProfileCache, user_profile_cache
+from tests.conftest import auth_headers
+
+
+def test_invalidate_drops_the_cached_profile(database):
+    cache = UserProfileCache(60, 10)
+    user_id = str(database.users.insert_one({"name": "Ada", "password": "hash"}).inserted_id)
+
+    assert cache.get(database.users, user_id) == {"_id": database.users.find_one()["_id"], "name": "Ada"}
+    database.users.update_one({}, {"$set": {"name": "Bea"}})
+    assert cache.get(database.users, user_id)["name"] == "Ada"
+
+    cache.invalidate(user_id)
+    assert cache.get(database.users, user_id)["name"] == "Bea"
+
+
+def test_password_rehash_on_login_invalidates_the_profile(client, database):
+    pw_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(5)).decode("utf-8")
+    user_id = str(database.users.insert_one({"name": "Ada", "email": "ada@example.com", "password": pw_hash,
+                                             "role": Roles.ADMIN.value,
+                                             "created_on": datetime(2023, 3, 14)}).inserted_id)
+    assert client.get("/api/v1/user", headers=auth_headers(user_id, Roles.ADMIN.value)).status_code == 200
+    assert user_profile_cache.cached(user_id) is not None
+
+    response = client.post("/api/v1/login", json={"email": "ada@example.com", "password": "secret"})
+
+    assert response.status_code == 200
+    assert database.users.find_one()["password"] != pw_hash
+    assert user_profile_cache.cached(user_id) is None
@@ -0,0 +1,127 @@
+import os
+
+import mongomock
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.utils.vehicle_events import VehicleEventHub, WATCH_PIPELINE
+
+
+def watched(*changes):
+    collection = mongomock.MongoClient().db.changes
+    collection.insert_many([dict(change, _id=index) for index, change in enumerate(changes)])
+    return [change["_id"] for change in collection.aggregate(WATCH_PIPELINE)]
+
+
+def update(updated_fields, removed_fields=()):
+    return {"operationType": "update",
+            "updateDescription": {"updatedFields": updated_fields, "removedFields": list(removed_fields)}}
+
+
+def test_watch_pipeline_skips_position_reports():
+    assert watched(update({"last_loc": {"type": "Point", "coordinates": [0, 0]}, "last_seen": 1}),
+                   update({"last_seen": 2})) == []
+
+
+def test_watch_pipeline_skips_bulk_marker_cleanup():
+    assert watched(update({"bulk_writes": []}), update({"last_seen": 1, "bulk_writes": [ObjectId()]}),
+                   update({}, removed_fields=["bulk_writes"])) == []
+
+
+def test_watch_pipeline_keeps_vehicle_changes():
+    assert watched({"operationType": "insert"}, {"operationType": "delete"}, {"operationType": "replace"},
+                   update({"status": "ON_THE_WAY", "version": 2}),
+                   update({"last_seen": 3, "current_team": ""}),
+                   update({"last_seen": 4}, removed_fields=["current_route"]),
+                   update({"current_route": "", "bulk_writes": [ObjectId()]})) == [0, 1, 2, 3, 4, 5, 6]
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def try_next(self):
+        return self.changes.pop(0) if self.changes else None
+
+
+class FakeVehicleCollection:
+    """
+    Serves a fixed history of changes to change streams resumed after one of them.
+    """
+
+    def __init__(self, changes):
+        self.changes = changes
+
+    def watch(self, pipeline, full_document=None, resume_after=None, max_await_time_ms=None):
+        tokens = [change["_id"]["_data"] for change in self.changes]
+        if resume_after["_data"] not in tokens:
+            raise OperationFailure("resume token was not found", code=286)
+        return FakeChangeStream(self.changes[tokens.index(resume_after["_data"]) + 1:])
+
+
+def change(number, operation, team=None):
+    vehicle_id = ObjectId(f"{number:024x}")
+    document = {"_id": vehicle_id, "vehicle_number": f"AB{number}", "current_team": team}
+    return {"_id": {"_data": f"{number:08x}"}, "operationType": operation, "documentKey": {"_id": vehicle_id},
+            "fullDocument": None if operation == "delete" else document}
+
+
+def make_hub(changes):
+    hub = VehicleEventHub(FakeVehicleCollection(changes))
+    # The watcher thread is not needed: events are published by the tests.
+    hub._pid = os.getpid()
+    return hub
+
+
+def test_delete_of_a_vehicle_with_unknown_team_is_only_sent_to_admins():
+    hub = make_hub([])
+    manager, _ = hub.subscribe({"team-a", ""})
+    admin, _ = hub.subscribe(None)
+
+    hub._publish(change(1, "delete"))
+
+    assert manager.queue.empty()
+    assert admin.queue.get_nowait()["vehicle"] == {"id": f"{1:024x}"}
+
+
+def test_delete_is_sent_to_the_team_of_the_vehicle():
+    hub = make_hub([])
+    hub._publish(change(1, "insert", "team-a"))
+    manager, _ = hub.subscribe({"team-a", ""})
+    other_manager, _ = hub.subscribe({"team-b", ""})
+
+    hub._publish(change(1, "delete"))
+
+    assert manager.queue.get_nowait()["operation"] == "delete"
+    assert other_manager.queue.empty()
+
+
+def test_reconnecting_client_replays_changes_missing_from_the_buffer():
+    history = [change(1, "insert", "team-a"), change(2, "update", "team-a"), change(3, "insert", "team-b"),
+               change(4, "update", "team-a")]
+    hub = make_hub(history)
+    subscription, backlog = hub.subscribe({"team-a", ""}, last_event_id=history[0]["_id"]["_data"])
+    # A change made while the missed ones are replayed is both replayed and published live.
+    hub._publish(history[3])
+
+    replayed = [event["id"] for event in hub.replay(subscription)]
+    live = [event["id"] for event in [subscription.queue.get_nowait()] if subscription.is_new(event)]
+
+    assert backlog == []
+    assert replayed == ["00000002", "00000004"]
+    assert live == []
+    assert not subscription.missed
+
+
+def test_unknown_resume_token_resets_the_client():
+    hub = make_hub([change(1, "insert", "team-a")])
+    subscription, _ = hub.subscribe(None, last_event_id="not-a-token")
+
+    assert list(hub.replay(subscription)) == []
+    assert subscription.missed
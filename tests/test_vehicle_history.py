@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from app.db.history import migrate_vehicle_history, record_trip, HISTORY_BUCKET_SIZE
+from app.enums.roles import Roles
+from tests.conftest import auth_headers
+
+
+def test_migration_can_be_run_again_after_a_failure(database):
+    vehicle_id = database.vehicles.insert_one({"former_routes": [f"r{number}" for number in range(60)],
+                                               "former_teams": ["a"] * 60}).inserted_id
+    assert migrate_vehicle_history(database) == 1
+
+    # The arrays are still there when the previous run failed before removing them.
+    database.vehicles.update_one({"_id": vehicle_id}, {"$set": {"former_routes": [f"r{number}" for number in range(60)],
+                                                                "former_teams": ["a"] * 60}})
+    assert migrate_vehicle_history(database) == 1
+    assert migrate_vehicle_history(database) == 0
+
+    buckets = list(database.vehicle_history.find({"vehicle": str(vehicle_id)}).sort("legacy_bucket", 1))
+    assert [bucket["count"] for bucket in buckets] == [HISTORY_BUCKET_SIZE, 10]
+    assert buckets[1]["trips"][-1] == {"route": "r59", "team": "a"}
+    assert "former_routes" not in database.vehicles.find_one({"_id": vehicle_id})
+
+
+def test_history_is_sorted_by_trip_time(client, database):
+    user_id = database.users.insert_one({"name": "Manager", "email": "manager@example.com",
+                                         "role": Roles.MANAGER.value}).inserted_id
+    vehicle_id = database.vehicles.insert_one({"former_routes": ["old1", "old2"],
+                                               "former_teams": ["a", "a"]}).inserted_id
+    record_trip(str(vehicle_id), "new1", "a", datetime(2023, 3, 1))
+    record_trip(str(vehicle_id), "new2", "a", datetime(2023, 3, 2))
+    migrate_vehicle_history(database)
+    # A trip recorded late with an earlier completion time.
+    record_trip(str(vehicle_id), "new0", "a", datetime(2023, 2, 1))
+
+    response = client.get(f"/api/v1/vehicle/history?vehicle={vehicle_id}",
+                          headers=auth_headers(user_id, Roles.MANAGER.value))
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert [trip["route"] for trip in data["trips"]] == ["new2", "new1", "new0", "old2", "old1"]
+    assert data["total_records"] == 5